@@ -1,14 +1,19 @@
 import os
 import sqlite3
+import threading
 import traceback
 from threading import Timer
 import webbrowser
 import csv
+import bisect
+import functools
+import heapq
 import io
-from collections import defaultdict
-from datetime import datetime, timedelta
+import json
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta, time as dtime
 
-from flask import Flask, config, render_template, request, redirect, url_for, jsonify, send_file
+from flask import Flask, config, render_template, request, redirect, url_for, jsonify, send_file, g, has_app_context
 
 # ============================================================================
 # FLASK-APP INITIALISIERUNG
@@ -27,78 +32,229 @@ os.makedirs(TOURNAMENT_FOLDER, exist_ok=True)
 # KONSTANTEN & MAPPING-SYSTEME
 # ============================================================================
 
-# BRACKET A MAPPINGS — Korrekte 16-Team DE Struktur
-# WB: R1=8, R2=4, R3=2, R4=1 (WB Final)
-# LB: R1=8, R2=8, R3=4, R4=4, R5=2, R6=2, R7=1, R8=1 (LB Final)
-
-WINNER_MAPPING_A = {
-    # WB R1 (8 Spiele) → WB R2 (4 Spiele): Sieger-Paare
-    (1, 0): (2, 0, 'team1'), (1, 1): (2, 0, 'team2'),
-    (1, 2): (2, 1, 'team1'), (1, 3): (2, 1, 'team2'),
-    (1, 4): (2, 2, 'team1'), (1, 5): (2, 2, 'team2'),
-    (1, 6): (2, 3, 'team1'), (1, 7): (2, 3, 'team2'),
-
-    # WB R2 (4 Spiele) → WB R3 (2 Spiele)
-    (2, 0): (3, 0, 'team1'), (2, 1): (3, 0, 'team2'),
-    (2, 2): (3, 1, 'team1'), (2, 3): (3, 1, 'team2'),
-
-    # WB R3 (2 Spiele) → WB R4 (WB Final, 1 Spiel)
-    (3, 0): (4, 0, 'team1'), (3, 1): (4, 0, 'team2'),
-}
+# ── DOUBLE-ELIMINATION-LAYOUT ────────────────────────────────────────────────
+# Struktur für n = 2^k Teams pro Bracket (4 … 128):
+#   WB: k Runden, Runde r hat n / 2^r Spiele (Runde k = WB Final)
+#   LB: 2·(k−1) Runden. LB R1 paart die WB-R1-Verlierer, gerade LB-Runden
+#       nehmen die Verlierer der nächsten WB-Runde als team2 auf, ungerade
+#       LB-Runden paaren die LB-Sieger untereinander. Letzte LB-Runde = LB Final.
+# Beispiel 16 Teams: WB 8/4/2/1, LB 4/4/2/2/1/1
+# Die Weiterleitung wird einmal pro Bracket-Größe berechnet und als Arrays
+# [runde][match_index] abgelegt — das Weiterleiten ist ein reiner Indexzugriff.
 
-LOSER_MAPPING_A = {
-    # WB R1 Verlierer → LB R1 (8 Spiele)
-    # Seeding-Kreuztabelle: Verlierer des stärkeren Matches gegen Verlierer des schwächeren
-    (1, 0): (1, 0, 'team1'), (1, 1): (1, 0, 'team2'),
-    (1, 2): (1, 1, 'team1'), (1, 3): (1, 1, 'team2'),
-    (1, 4): (1, 2, 'team1'), (1, 5): (1, 2, 'team2'),
-    (1, 6): (1, 3, 'team1'), (1, 7): (1, 3, 'team2'),
+DE_MIN_TEAMS = 4
+DE_MAX_TEAMS = 128
+DE_BRACKET_SIZE = 16   # Teams pro Bracket (A und B)
+DE_BRACKETS = {'A': (1, 5), 'B': (6, 10)}   # bracket_id → Gruppen (von, bis) der Qualifikation
 
-    # WB R2 Verlierer → LB R3 (als team2, 4 Spiele)
-    (2, 0): (3, 0, 'team2'), (2, 1): (3, 1, 'team2'),
-    (2, 2): (3, 2, 'team2'), (2, 3): (3, 3, 'team2'),
 
-    # WB R3 Verlierer → LB R5 (als team2, 2 Spiele)
-    (3, 0): (5, 0, 'team2'), (3, 1): (5, 1, 'team2'),
+class ForwardingTable:
+    """
+    Weiterleitungsziele (runde, match_index, slot) als Array je Runde.
+    Liest sich wie das frühere Mapping-Dict mit Schlüssel (runde, match_index).
+    """
+    __slots__ = ('rounds',)
+
+    def __init__(self, rounds):
+        # rounds[0] bleibt leer, damit die Runde direkt als Index dient
+        self.rounds = tuple(tuple(targets) for targets in rounds)
+
+    def get(self, key, default=None):
+        round_num, match_index = key
+        if 0 < round_num < len(self.rounds):
+            targets = self.rounds[round_num]
+            if 0 <= match_index < len(targets) and targets[match_index] is not None:
+                return targets[match_index]
+        return default
+
+    def __getitem__(self, key):
+        target = self.get(key)
+        if target is None:
+            raise KeyError(key)
+        return target
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def items(self):
+        for round_num, targets in enumerate(self.rounds):
+            for match_index, target in enumerate(targets):
+                if target is not None:
+                    yield (round_num, match_index), target
+
+    def __len__(self):
+        return sum(1 for _ in self.items())
+
+
+class DoubleElimLayout(namedtuple('DoubleElimLayout', [
+        'size', 'wb_rounds', 'lb_rounds', 'wb_matches', 'lb_matches', 'pairings',
+        'winner_mapping', 'loser_mapping', 'loser_winner_mapping'])):
+    """Vorberechnete Struktur eines DE-Brackets (wb/lb_matches: Spiele je Runde, Index = Runde)"""
+    __slots__ = ()
+
+    @property
+    def slots(self):
+        """Alle Spiele als (bracket, round, match_index) in Spielreihenfolge"""
+        for bracket, counts in (('Winners', self.wb_matches), ('Losers', self.lb_matches)):
+            for round_num in range(1, len(counts)):
+                for match_index in range(counts[round_num]):
+                    yield bracket, round_num, match_index
+
+    @property
+    def match_count(self):
+        return sum(self.wb_matches) + sum(self.lb_matches)
+
+
+def seeding_order(size):
+    """Setzliste in Bracket-Reihenfolge: 16 → 1,16,8,9,4,13,5,12,2,15,7,10,3,14,6,11"""
+    order = [1]
+    while len(order) < size:
+        mirror = 2 * len(order) + 1
+        order = [seed for s in order for seed in (s, mirror - s)]
+    return order
+
+
+@functools.lru_cache(maxsize=None)
+def get_double_elim_layout(size):
+    """DE-Struktur für `size` Teams (Zweierpotenz 4 … 128), einmal berechnet und gecacht"""
+    if size < DE_MIN_TEAMS or size > DE_MAX_TEAMS or size & (size - 1):
+        raise ValueError(f"Double Elimination braucht 2^k Teams zwischen "
+                         f"{DE_MIN_TEAMS} und {DE_MAX_TEAMS}, nicht {size}")
+
+    k = size.bit_length() - 1
+    wb_rounds, lb_rounds = k, 2 * (k - 1)
+    wb_matches = [0] + [size >> r for r in range(1, wb_rounds + 1)]
+    # LB R(2j−1) und R(2j) haben je n / 2^(j+1) Spiele
+    lb_matches = [0] + [size >> ((r + 1) // 2 + 1) for r in range(1, lb_rounds + 1)]
+
+    winner = [[None] * n for n in wb_matches]
+    loser = [[None] * n for n in wb_matches]
+    loser_winner = [[None] * n for n in lb_matches]
+
+    def slot(i):
+        return 'team1' if i % 2 == 0 else 'team2'
+
+    # WB: Sieger paarweise in die nächste Runde, WB Final geht in die Super Finals
+    for r in range(1, wb_rounds):
+        for i in range(wb_matches[r]):
+            winner[r][i] = (r + 1, i // 2, slot(i))
+
+    # WB R1 Verlierer paarweise in LB R1
+    for i in range(wb_matches[1]):
+        loser[1][i] = (1, i // 2, slot(i))
+
+    # WB R(j+1) Verlierer als team2 in LB R(2j); jede zweite Runde gespiegelt,
+    # damit Teams aus derselben WB-Hälfte sich nicht sofort wieder treffen
+    for j in range(1, wb_rounds):
+        n = wb_matches[j + 1]
+        for i in range(n):
+            target = n - 1 - i if j % 2 else i
+            loser[j + 1][i] = (2 * j, target, 'team2')
+
+    for r in range(1, lb_rounds):
+        for i in range(lb_matches[r]):
+            if r % 2:
+                # ungerade Runde → gleicher Index, trifft dort den WB-Verlierer
+                loser_winner[r][i] = (r + 1, i, 'team1')
+            else:
+                loser_winner[r][i] = (r + 1, i // 2, slot(i))
 
-    # WB Final Verlierer → LB R7 (als team2, 1 Spiel)
-    (4, 0): (7, 0, 'team2'),
-}
+    order = [seed - 1 for seed in seeding_order(size)]
+    pairings = tuple(zip(order[0::2], order[1::2]))
 
-LOSER_WINNER_MAPPING_A = {
-    # LB R1 Sieger → LB R2 (8 Spiele, als team1)
-    (1, 0): (2, 0, 'team1'), (1, 1): (2, 1, 'team1'),
-    (1, 2): (2, 2, 'team1'), (1, 3): (2, 3, 'team1'),
+    return DoubleElimLayout(
+        size=size, wb_rounds=wb_rounds, lb_rounds=lb_rounds,
+        wb_matches=tuple(wb_matches), lb_matches=tuple(lb_matches), pairings=pairings,
+        winner_mapping=ForwardingTable(winner),
+        loser_mapping=ForwardingTable(loser),
+        loser_winner_mapping=ForwardingTable(loser_winner),
+    )
 
-    # LB R2 Sieger → LB R3 (4 Spiele)
-    (2, 0): (3, 0, 'team1'), (2, 1): (3, 1, 'team1'),
-    (2, 2): (3, 2, 'team1'), (2, 3): (3, 3, 'team1'),
-    # LB R2 hat 8 Spiele (R1-Sieger + WB-R2-Verlierer), daher 4-7 auch
-    (2, 4): (4, 0, 'team1'), (2, 5): (4, 1, 'team1'),
-    (2, 6): (4, 2, 'team1'), (2, 7): (4, 3, 'team1'),
 
-    # LB R3 Sieger → LB R4 (4 Spiele)
-    (3, 0): (4, 0, 'team2'), (3, 1): (4, 1, 'team2'),
-    (3, 2): (4, 2, 'team2'), (3, 3): (4, 3, 'team2'),
+# Standard-Brackets A und B (je 16 Teams) teilen sich dieselben Lookup-Arrays
+WINNER_MAPPING_A = get_double_elim_layout(DE_BRACKET_SIZE).winner_mapping
+LOSER_MAPPING_A = get_double_elim_layout(DE_BRACKET_SIZE).loser_mapping
+LOSER_WINNER_MAPPING_A = get_double_elim_layout(DE_BRACKET_SIZE).loser_winner_mapping
+WINNER_MAPPING_B = WINNER_MAPPING_A
+LOSER_MAPPING_B = LOSER_MAPPING_A
+LOSER_WINNER_MAPPING_B = LOSER_WINNER_MAPPING_A
+
+# ── Alte DE-Layouts ──────────────────────────────────────────────────────────
+# Vor der Layout-Engine hatte das 16er-Bracket 8 LB-Runden (8/8/4/4/2/2/1/1)
+# mit fester Weiterleitung. Bestehende Turniere mit dieser Struktur werden mit
+# ihrem ursprünglichen Mapping weitergeführt (erkannt an den Spielen je Runde).
+
+def _forwarding_from_mapping(mapping, matches):
+    """Mapping-Dict {(runde, index): ziel} → ForwardingTable mit matches Spielen je Runde"""
+    rounds = [[None] * n for n in matches]
+    for (round_num, match_index), target in mapping.items():
+        rounds[round_num][match_index] = target
+    return ForwardingTable(rounds)
+
+
+def _legacy_double_elim_layout_16():
+    wb_matches, lb_matches = (0, 8, 4, 2, 1), (0, 8, 8, 4, 4, 2, 2, 1, 1)
+    winner = {
+        (1, 0): (2, 0, 'team1'), (1, 1): (2, 0, 'team2'), (1, 2): (2, 1, 'team1'), (1, 3): (2, 1, 'team2'),
+        (1, 4): (2, 2, 'team1'), (1, 5): (2, 2, 'team2'), (1, 6): (2, 3, 'team1'), (1, 7): (2, 3, 'team2'),
+        (2, 0): (3, 0, 'team1'), (2, 1): (3, 0, 'team2'), (2, 2): (3, 1, 'team1'), (2, 3): (3, 1, 'team2'),
+        (3, 0): (4, 0, 'team1'), (3, 1): (4, 0, 'team2'),
+    }
+    loser = {
+        # WB R1 → LB R1, WB R2 → LB R3, WB R3 → LB R5, WB Final → LB R7 (je als team2)
+        (1, 0): (1, 0, 'team1'), (1, 1): (1, 0, 'team2'), (1, 2): (1, 1, 'team1'), (1, 3): (1, 1, 'team2'),
+        (1, 4): (1, 2, 'team1'), (1, 5): (1, 2, 'team2'), (1, 6): (1, 3, 'team1'), (1, 7): (1, 3, 'team2'),
+        (2, 0): (3, 0, 'team2'), (2, 1): (3, 1, 'team2'), (2, 2): (3, 2, 'team2'), (2, 3): (3, 3, 'team2'),
+        (3, 0): (5, 0, 'team2'), (3, 1): (5, 1, 'team2'),
+        (4, 0): (7, 0, 'team2'),
+    }
+    loser_winner = {
+        (1, 0): (2, 0, 'team1'), (1, 1): (2, 1, 'team1'), (1, 2): (2, 2, 'team1'), (1, 3): (2, 3, 'team1'),
+        (2, 0): (3, 0, 'team1'), (2, 1): (3, 1, 'team1'), (2, 2): (3, 2, 'team1'), (2, 3): (3, 3, 'team1'),
+        (2, 4): (4, 0, 'team1'), (2, 5): (4, 1, 'team1'), (2, 6): (4, 2, 'team1'), (2, 7): (4, 3, 'team1'),
+        (3, 0): (4, 0, 'team2'), (3, 1): (4, 1, 'team2'), (3, 2): (4, 2, 'team2'), (3, 3): (4, 3, 'team2'),
+        (4, 0): (5, 0, 'team1'), (4, 1): (5, 0, 'team2'), (4, 2): (5, 1, 'team1'), (4, 3): (5, 1, 'team2'),
+        (5, 0): (6, 0, 'team1'), (5, 1): (6, 0, 'team2'),
+        (6, 0): (7, 0, 'team1'),
+        (7, 0): (8, 0, 'team1'),
+    }
+    return DoubleElimLayout(
+        size=16, wb_rounds=4, lb_rounds=8, wb_matches=wb_matches, lb_matches=lb_matches,
+        pairings=get_double_elim_layout(16).pairings,
+        winner_mapping=_forwarding_from_mapping(winner, wb_matches),
+        loser_mapping=_forwarding_from_mapping(loser, wb_matches),
+        loser_winner_mapping=_forwarding_from_mapping(loser_winner, lb_matches),
+    )
 
-    # LB R4 Sieger → LB R5 (2 Spiele)
-    (4, 0): (5, 0, 'team1'), (4, 1): (5, 0, 'team2'),
-    (4, 2): (5, 1, 'team1'), (4, 3): (5, 1, 'team2'),
 
-    # LB R5 Sieger → LB R6 (2 Spiele)
-    (5, 0): (6, 0, 'team1'), (5, 1): (6, 0, 'team2'),
+LEGACY_DOUBLE_ELIM_LAYOUTS = {
+    (layout.wb_matches, layout.lb_matches): layout
+    for layout in (_legacy_double_elim_layout_16(),)
+}
 
-    # LB R6 Sieger → LB R7 (1 Spiel, als team1)
-    (6, 0): (7, 0, 'team1'),
 
-    # LB R7 Sieger → LB R8 (LB Final, als team1)
-    (7, 0): (8, 0, 'team1'),
-}
+@functools.lru_cache(maxsize=None)
+def double_elim_layout_for_counts(wb_matches, lb_matches):
+    """
+    Layout eines gespeicherten Brackets aus seinen Spielen je Runde (Index = Runde):
+    aktuelles Layout, altes Layout mit seinem Mapping oder — bei unbekannter
+    Struktur — ein Layout ohne Weiterleitung (Mappings None).
+    """
+    try:
+        layout = get_double_elim_layout(2 * wb_matches[1])
+        if (layout.wb_matches, layout.lb_matches) == (wb_matches, lb_matches):
+            return layout
+    except (IndexError, ValueError):
+        pass
+    if (wb_matches, lb_matches) in LEGACY_DOUBLE_ELIM_LAYOUTS:
+        return LEGACY_DOUBLE_ELIM_LAYOUTS[(wb_matches, lb_matches)]
+    return DoubleElimLayout(
+        size=2 * wb_matches[1] if len(wb_matches) > 1 else 0,
+        wb_rounds=len(wb_matches) - 1, lb_rounds=len(lb_matches) - 1,
+        wb_matches=wb_matches, lb_matches=lb_matches, pairings=(),
+        winner_mapping=None, loser_mapping=None, loser_winner_mapping=None,
+    )
 
-# BRACKET B MAPPINGS (identisch zu A)
-WINNER_MAPPING_B = WINNER_MAPPING_A.copy()
-LOSER_MAPPING_B = LOSER_MAPPING_A.copy()
-LOSER_WINNER_MAPPING_B = LOSER_WINNER_MAPPING_A.copy()
 
 # SUPER FINALS MAPPINGS
 SUPER_FINALS_QUALIFICATION = {
@@ -139,18 +295,156 @@ GHOST_TEAM_NAMES = [
 # DATENBANK-FUNKTIONEN
 # ============================================================================
 
-def get_db_connection(db_path):
-    """Stellt eine Verbindung zur SQLite-Datenbank her"""
-    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+# ── Verbindungs-Pool ─────────────────────────────────────────────────────────
+# Ein Pool pro Turnier-Datei (Schlüssel = db_path). Die Beamer pollen alle 5 s,
+# darum werden Verbindungen wiederverwendet statt bei jedem Request neu geöffnet.
+# WAL-Modus: Leser (Display) blockieren die Resultat-Eingabe nie.
+
+DB_POOL_SIZE = 8   # max. gepufferte Verbindungen pro Turnier
+
+DB_PRAGMAS = [
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",     # in WAL sicher, spart fsyncs
+    "PRAGMA cache_size = -16000",      # 16 MB Page-Cache
+    "PRAGMA mmap_size = 268435456",    # 256 MB Memory-Mapped I/O
+    "PRAGMA temp_store = MEMORY",
+]
+
+_db_pools = {}
+_db_pools_lock = threading.Lock()
+_schema_checked = set()
+
+
+class PooledConnection(sqlite3.Connection):
+    """SQLite-Verbindung, die bei close() in den Pool zurückgeht"""
+
+    db_path = None
+    in_app_context = False
+    _notified_changes = 0
+
+    def commit(self):
+        super().commit()
+        # Display-Streams (SSE) sofort über geschriebene Änderungen informieren
+        if self.total_changes != self._notified_changes:
+            self._notified_changes = self.total_changes
+            notify_data_changed(self.db_path)
+
+    def close(self):
+        # Innerhalb eines App-Contexts gibt der Teardown die Verbindung frei
+        if self.in_app_context:
+            return
+        release_db_connection(self)
+
+    def close_for_real(self):
+        super().close()
+
+
+def _open_db_connection(db_path):
+    """Öffnet eine neue Verbindung und setzt die Performance-Pragmas"""
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False,
+                           factory=PooledConnection)
     conn.row_factory = sqlite3.Row
+    for pragma in DB_PRAGMAS:
+        conn.execute(pragma)
+    conn.db_path = db_path
+
+    # Bestehende Turnier-Dateien beim ersten Öffnen auf den aktuellen Stand bringen
+    # (leere Dateien legt initialize_db an)
+    if db_path not in _schema_checked:
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='teams'").fetchone():
+            migrate_database(conn)
+        _schema_checked.add(db_path)
     return conn
 
 
-def initialize_db(db_path):
-    """Initialisiert alle Datenbanktabellen für ein neues Turnier"""
-    conn = get_db_connection(db_path)
-    cursor = conn.cursor()
+def _acquire_db_connection(db_path):
+    with _db_pools_lock:
+        pool = _db_pools.get(db_path)
+        if pool:
+            return pool.pop()
+    return _open_db_connection(db_path)
+
+
+def release_db_connection(conn):
+    """Gibt eine Verbindung an den Pool zurück (offene Transaktion wird verworfen)"""
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+    except sqlite3.ProgrammingError:
+        return  # bereits geschlossen
+    conn.in_app_context = False
+    with _db_pools_lock:
+        pool = _db_pools.setdefault(conn.db_path, [])
+        if len(pool) < DB_POOL_SIZE and conn not in pool:
+            pool.append(conn)
+            return
+    conn.close_for_real()
+
+
+def close_db_pool(db_path=None):
+    """Schliesst alle freien Verbindungen (eines Turniers oder aller Turniere)"""
+    with _db_pools_lock:
+        if db_path is None:
+            pools = list(_db_pools.values())
+            _db_pools.clear()
+        else:
+            pools = [_db_pools.pop(os.path.abspath(db_path), [])]
+    for pool in pools:
+        for conn in pool:
+            conn.close_for_real()
+
+
+# ── Änderungs-Benachrichtigung (für SSE) ─────────────────────────────────────
+# Zähler pro Turnier-Datei; wartende Display-Streams werden bei jedem Commit
+# mit Änderungen geweckt.
+
+_data_changes = defaultdict(int)
+_data_changed = threading.Condition()
+
+
+def notify_data_changed(db_path):
+    with _data_changed:
+        _data_changes[db_path] += 1
+        _data_changed.notify_all()
+
 
+def wait_for_data_change(db_path, seen, timeout):
+    """Wartet bis zu timeout Sekunden auf eine Änderung; liefert den neuen Zählerstand"""
+    with _data_changed:
+        _data_changed.wait_for(lambda: _data_changes[db_path] != seen, timeout=timeout)
+        return _data_changes[db_path]
+
+
+def get_db_connection(db_path):
+    """Liefert eine gepoolte Verbindung zur SQLite-Datenbank.
+
+    Innerhalb eines Flask-App-Contexts gibt es pro Turnier genau eine
+    Verbindung; sie wird im Teardown an den Pool zurückgegeben.
+    """
+    db_path = os.path.abspath(db_path)
+    if not has_app_context():
+        return _acquire_db_connection(db_path)
+
+    conns = g.setdefault('_db_connections', {})
+    conn = conns.get(db_path)
+    if conn is None:
+        conn = _acquire_db_connection(db_path)
+        conn.in_app_context = True
+        conns[db_path] = conn
+    return conn
+
+
+@app.teardown_appcontext
+def release_app_db_connections(exc):
+    """Gibt alle im Request benutzten Verbindungen an den Pool zurück"""
+    conns = g.pop('_db_connections', None)
+    if conns:
+        for conn in conns.values():
+            release_db_connection(conn)
+
+
+def _create_base_tables(cursor):
+    """Legt alle Turnier-Tabellen an (falls nicht vorhanden)"""
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS teams (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -293,6 +587,7 @@ def initialize_db(db_path):
         game_name TEXT UNIQUE,
         match_duration INTEGER DEFAULT 12,
         break_between_games INTEGER DEFAULT 3,
+        break_between_rounds INTEGER DEFAULT 5,
         start_time TEXT DEFAULT '09:00',
         lunch_break_enabled INTEGER DEFAULT 0,
         lunch_break_start TEXT DEFAULT '12:00',
@@ -301,137 +596,551 @@ def initialize_db(db_path):
     )
     """)
 
-    conn.commit()
+
+def initialize_db(db_path):
+    """Initialisiert alle Datenbanktabellen für ein neues Turnier"""
+    conn = get_db_connection(db_path)
+    migrate_database(conn)
     conn.close()
     print(f"✅ Datenbank initialisiert: {db_path}")
 
 
+# ============================================================================
+# SCHEMA-MIGRATIONEN
+# ============================================================================
+# Die Schema-Version steht in PRAGMA user_version. Jede Migration läuft genau
+# einmal in einer eigenen Transaktion; ist die Datenbank aktuell, kostet
+# migrate_database() nur ein einziges PRAGMA.
+
+def _table_columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [col[1] for col in cursor.fetchall()]
+
+
+def _migration_001_legacy_schema(cursor):
+    """Alte Turnier-Dateien: fehlende Tabellen und Spalten ergänzen"""
+    _create_base_tables(cursor)
+
+    if 'is_ghost' not in _table_columns(cursor, 'teams'):
+        cursor.execute("ALTER TABLE teams ADD COLUMN is_ghost INTEGER DEFAULT 0")
+        print("✅ Spalte 'is_ghost' hinzugefügt")
+
+    if 'match_number' not in _table_columns(cursor, 'matches'):
+        # ADD COLUMN erlaubt kein UNIQUE → eindeutiger Index stattdessen
+        cursor.execute("ALTER TABLE matches ADD COLUMN match_number INTEGER")
+        cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_matches_match_number ON matches(match_number)")
+        print("✅ Spalte 'match_number' hinzugefügt")
+
+    columns = _table_columns(cursor, 'tournament_config')
+    config_columns = [
+        ('break_between_rounds', "INTEGER DEFAULT 5"),
+        ('lunch_break_enabled', "INTEGER DEFAULT 0"),
+        ('lunch_break_start', "TEXT DEFAULT '12:00'"),
+        ('lunch_break_end', "TEXT DEFAULT '13:00'"),
+    ]
+    for name, definition in config_columns:
+        if name not in columns:
+            cursor.execute(f"ALTER TABLE tournament_config ADD COLUMN {name} {definition}")
+            print(f"✅ Spalte '{name}' hinzugefügt")
+
+
+def _migration_002_lookup_indexes(cursor):
+    """Indizes auf allen Spalten, nach denen die Routen filtern/sortieren"""
+    statements = [
+        # Gruppenphase
+        "CREATE INDEX IF NOT EXISTS idx_matches_round_group ON matches(round, group_number, field)",
+        "CREATE INDEX IF NOT EXISTS idx_matches_group_round ON matches(group_number, round)",
+        "CREATE INDEX IF NOT EXISTS idx_matches_team1 ON matches(team1)",
+        "CREATE INDEX IF NOT EXISTS idx_matches_team2 ON matches(team2)",
+        "CREATE INDEX IF NOT EXISTS idx_rankings_group ON rankings(group_number, goals_for, goal_difference)",
+        "CREATE INDEX IF NOT EXISTS idx_rankings_team ON rankings(team)",
+        "CREATE INDEX IF NOT EXISTS idx_teams_name ON teams(name)",
+        "CREATE INDEX IF NOT EXISTS idx_teams_group ON teams(group_number, name)",
+        # K.O.-Phasen
+        "CREATE INDEX IF NOT EXISTS idx_de_a_slot ON double_elim_matches_a(bracket, round, match_index)",
+        "CREATE INDEX IF NOT EXISTS idx_de_b_slot ON double_elim_matches_b(bracket, round, match_index)",
+        "CREATE INDEX IF NOT EXISTS idx_follower_cup_slot ON follower_cup_matches(round, match_index)",
+        "CREATE INDEX IF NOT EXISTS idx_placement_slot ON placement_matches(placement)",
+    ]
+    for sql in statements:
+        cursor.execute(sql)
+
+
+# Alle Tabellen mit Resultaten (team1/team2/score1/score2) über alle Phasen
+MATCH_TABLES = [
+    ('matches',               'Round Robin'),
+    ('double_elim_matches',   'Double Elimination'),
+    ('super_finals_matches',  'Super Finals'),
+    ('follower_quali_matches', 'Follower Quali'),
+    ('follower_cup_matches',  'Follower Cup'),
+    ('placement_matches',     'Platzierungsrunde'),
+]
+
+# Match-Tabellen vor Migration 11 (DE-Brackets in je einer Tabelle) — die
+# älteren Migrationen laufen auf diesem Stand, egal wie alt die Datei ist
+_SPLIT_MATCH_TABLES = ['matches', 'double_elim_matches_a', 'double_elim_matches_b',
+                       'super_finals_matches', 'follower_quali_matches',
+                       'follower_cup_matches', 'placement_matches']
+
+# Spalte mit der Feldnummer (Round Robin heißt historisch 'field')
+COURT_COLUMNS = {'matches': 'field'}
+
+
+def _team_totals_upsert_sql(ref, team, own, other, sign):
+    """Addiert (sign='') bzw. subtrahiert (sign='-') eine Match-Seite in team_totals"""
+    return f"""
+        INSERT INTO team_totals (team, games, wins, goals_for, goals_against)
+        SELECT {ref}.{team}, {sign}1, {sign}({ref}.{own} > {ref}.{other}),
+               {sign}{ref}.{own}, {sign}{ref}.{other}
+        WHERE {ref}.{team} IS NOT NULL AND {ref}.{own} IS NOT NULL AND {ref}.{other} IS NOT NULL
+        ON CONFLICT(team) DO UPDATE SET
+            games         = games + excluded.games,
+            wins          = wins + excluded.wins,
+            goals_for     = goals_for + excluded.goals_for,
+            goals_against = goals_against + excluded.goals_against;"""
+
+
+def _create_team_totals_triggers(cursor, table):
+    """Hält team_totals bei jedem INSERT/UPDATE/DELETE auf einer Match-Tabelle aktuell"""
+    add_new = (_team_totals_upsert_sql('NEW', 'team1', 'score1', 'score2', '') +
+               _team_totals_upsert_sql('NEW', 'team2', 'score2', 'score1', ''))
+    sub_old = (_team_totals_upsert_sql('OLD', 'team1', 'score1', 'score2', '-') +
+               _team_totals_upsert_sql('OLD', 'team2', 'score2', 'score1', '-'))
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_totals_ins AFTER INSERT ON {table} "
+                   f"BEGIN {add_new} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_totals_del AFTER DELETE ON {table} "
+                   f"BEGIN {sub_old} END")
+    cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_totals_upd "
+                   f"AFTER UPDATE OF team1, team2, score1, score2 ON {table} "
+                   f"BEGIN {sub_old} {add_new} END")
+
+
+def _migration_003_team_totals(cursor):
+    """Materialisierte Gesamtstatistik pro Team über alle Phasen"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS team_totals (
+            team TEXT PRIMARY KEY,
+            games INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            goals_for INTEGER NOT NULL DEFAULT 0,
+            goals_against INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    for table in _SPLIT_MATCH_TABLES:
+        _create_team_totals_triggers(cursor, table)
+
+
+# Tabellen, deren Änderungen die Daten-Version erhöhen (Cache-Invalidierung)
+_VERSIONED_BASE_TABLES = ['teams', 'rankings', 'wildcard_override', 'tournament_config']
+VERSIONED_TABLES = _VERSIONED_BASE_TABLES + [table for table, _phase in MATCH_TABLES]
+
+
+def _create_data_version_triggers(cursor, table):
+    """Jede Zeilenänderung auf table erhöht data_version.version"""
+    bump = "UPDATE data_version SET version = version + 1 WHERE id = 1;"
+    for event in ('INSERT', 'UPDATE', 'DELETE'):
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()} "
+                       f"AFTER {event} ON {table} BEGIN {bump} END")
+
+
+def _migration_004_data_version(cursor):
+    """Monotoner Zähler für alle turnierrelevanten Daten"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS wildcard_override (
+            id INTEGER PRIMARY KEY,
+            wildcard2_team TEXT NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    """)
+    # Start bei Epoch-Millisekunden: eine neu angelegte Datei mit gleichem Pfad
+    # trifft so nie einen alten Cache-Eintrag
+    cursor.execute("""
+        INSERT OR IGNORE INTO data_version (id, version)
+        VALUES (1, CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER))
+    """)
+    for table in _VERSIONED_BASE_TABLES + _SPLIT_MATCH_TABLES:
+        _create_data_version_triggers(cursor, table)
+
+
+def _migration_005_ranked_view(cursor):
+    """Gruppenrang per Window-Funktion: ein Scan statt COUNT(*)-Subquery pro Team"""
+    cursor.execute("""
+        CREATE VIEW IF NOT EXISTS ranked_rankings AS
+        SELECT r.*,
+               COALESCE(t.is_ghost, 0) AS is_ghost,
+               RANK() OVER (
+                   PARTITION BY r.group_number
+                   ORDER BY COALESCE(t.is_ghost, 0), r.goals_for DESC, r.goal_difference DESC
+               ) AS group_rank
+        FROM rankings r
+        LEFT JOIN teams t ON r.team = t.name
+    """)
+
+
+def _migration_006_single_elim(cursor):
+    """Layout-Parameter der K.o.-Phasen; Platzierungsrunde bekommt Runde + Index"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS bracket_config (
+            phase TEXT PRIMARY KEY,
+            entrants INTEGER NOT NULL,
+            third_place INTEGER NOT NULL DEFAULT 1,
+            consolation INTEGER NOT NULL DEFAULT 0,
+            first_place INTEGER NOT NULL DEFAULT 1
+        )
+    """)
+    columns = _table_columns(cursor, 'placement_matches')
+    if 'round' not in columns:
+        cursor.execute("ALTER TABLE placement_matches ADD COLUMN round TEXT")
+    if 'match_index' not in columns:
+        cursor.execute("ALTER TABLE placement_matches ADD COLUMN match_index INTEGER")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_placement_round ON placement_matches(round, match_index)")
+
+
+def _migration_007_courts(cursor):
+    """Anzahl Felder für die Spielplan-Engine"""
+    if 'courts' not in _table_columns(cursor, 'tournament_config'):
+        cursor.execute("ALTER TABLE tournament_config ADD COLUMN courts INTEGER DEFAULT 15")
+
+
+def _backfill_start_minutes(cursor, table):
+    """Fehlende start_min/end_min aus dem Anzeige-Text time ('HH:MM') nachtragen"""
+    row = cursor.execute("SELECT match_duration FROM tournament_config LIMIT 1").fetchone()
+    duration = row[0] if row and row[0] else 12
+    cursor.execute(f"""
+        UPDATE {table}
+        SET start_min = CAST(substr(time, 1, instr(time, ':') - 1) AS INTEGER) * 60
+                      + CAST(substr(time, instr(time, ':') + 1) AS INTEGER)
+        WHERE time LIKE '%:%' AND start_min IS NULL
+    """)
+    cursor.execute(f"UPDATE {table} SET end_min = start_min + ? "
+                   f"WHERE start_min IS NOT NULL AND end_min IS NULL", (duration,))
+
+
+def _migration_008_minute_times(cursor):
+    """
+    Start/Ende als ganze Minuten ab Mitternacht des Turniertags (über 1440
+    hinaus für Spiele nach Mitternacht) mit Index (Feld, Start). time bleibt
+    als Anzeige-Text erhalten.
+    """
+    for table in _SPLIT_MATCH_TABLES:
+        columns = _table_columns(cursor, table)
+        for column in ('start_min', 'end_min'):
+            if column not in columns:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER")
+        _backfill_start_minutes(cursor, table)
+        court = COURT_COLUMNS.get(table, 'court')
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_court_start ON {table}({court}, start_min)")
+
+
+def _migration_009_match_number_sequence(cursor):
+    """Sequenz für Spielnummern und Reihenfolge aller Spiele für die Neunummerierung"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS match_number_sequence (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            next_number INTEGER NOT NULL
+        )
+    """)
+    highest = " UNION ALL ".join(f"SELECT MAX(match_number) AS n FROM {table}"
+                                 for table in _SPLIT_MATCH_TABLES)
+    cursor.execute(f"""
+        INSERT OR IGNORE INTO match_number_sequence (id, next_number)
+        SELECT 1, COALESCE(MAX(n), 0) + 1 FROM ({highest})
+    """)
+    # Phase, dann Reihenfolge innerhalb der Phase wie in den assign_*-Funktionen;
+    # Follower-Cup-Runden (Namen) ordnet die Abfrage nach dem gespeicherten Layout
+    cursor.execute("""
+        CREATE VIEW IF NOT EXISTS match_number_order AS
+        SELECT 'matches' AS source, 0 AS phase_order, id, match_number,
+               round AS sort1, group_number AS sort2, id AS sort3 FROM matches
+        UNION ALL
+        SELECT 'double_elim_matches_a', 1, id, match_number,
+               (bracket = 'Losers') * 1000 + round, match_index, id FROM double_elim_matches_a
+        UNION ALL
+        SELECT 'double_elim_matches_b', 2, id, match_number,
+               (bracket = 'Losers') * 1000 + round, match_index, id FROM double_elim_matches_b
+        UNION ALL
+        SELECT 'super_finals_matches', 3, id, match_number,
+               CASE match_id WHEN 'HF1' THEN 0 WHEN 'HF2' THEN 1 WHEN 'THIRD' THEN 2 ELSE 3 END,
+               0, id FROM super_finals_matches
+        UNION ALL
+        SELECT 'follower_quali_matches', 4, id, match_number, 0, 0, id FROM follower_quali_matches
+        UNION ALL
+        SELECT 'follower_cup_matches', 5, id, match_number, round, match_index, id
+        FROM follower_cup_matches
+        UNION ALL
+        SELECT 'placement_matches', 6, id, match_number, 0, 0, id FROM placement_matches
+    """)
+
+
+def _migration_010_all_matches_view(cursor):
+    """
+    Alle Spiele aller Phasen in einer Sicht; Team- und Nummern-Abfragen laufen
+    über die Indizes der einzelnen Tabellen (SQLite reicht WHERE in jeden
+    UNION-ALL-Zweig weiter).
+    """
+    for table in _SPLIT_MATCH_TABLES:
+        for column in ('team1', 'team2'):
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column})")
+    cursor.execute("""
+        CREATE VIEW IF NOT EXISTS all_matches AS
+        SELECT 'matches' AS source, 0 AS phase_order, 'Round Robin' AS phase,
+               NULL AS bracket_id, NULL AS bracket, round, NULL AS match_index,
+               id, match_number, team1, team2, score1, score2,
+               CASE WHEN score1 > score2 THEN team1 WHEN score2 > score1 THEN team2 END AS winner,
+               field AS court, time, start_min, end_min
+        FROM matches
+        UNION ALL
+        SELECT 'double_elim_matches_a', 1, 'Double Elimination A', 'A', bracket, round, match_index,
+               id, match_number, team1, team2, score1, score2, winner, court, time, start_min, end_min
+        FROM double_elim_matches_a
+        UNION ALL
+        SELECT 'double_elim_matches_b', 2, 'Double Elimination B', 'B', bracket, round, match_index,
+               id, match_number, team1, team2, score1, score2, winner, court, time, start_min, end_min
+        FROM double_elim_matches_b
+        UNION ALL
+        SELECT 'super_finals_matches', 3, 'Super Finals', NULL, NULL, match_id, NULL,
+               id, match_number, team1, team2, score1, score2, winner, court, time, start_min, end_min
+        FROM super_finals_matches
+        UNION ALL
+        SELECT 'follower_quali_matches', 4, 'Follower Quali', NULL, NULL, NULL, NULL,
+               id, match_number, team1, team2, score1, score2, winner, court, time, start_min, end_min
+        FROM follower_quali_matches
+        UNION ALL
+        SELECT 'follower_cup_matches', 5, 'Follower Cup', NULL, NULL, round, match_index,
+               id, match_number, team1, team2, score1, score2, winner, court, time, start_min, end_min
+        FROM follower_cup_matches
+        UNION ALL
+        SELECT 'placement_matches', 6, 'Platzierungsrunde', NULL, NULL, COALESCE(round, placement),
+               match_index, id, match_number, team1, team2, score1, score2, winner, court, time,
+               start_min, end_min
+        FROM placement_matches
+    """)
+    # team_totals erst hier aufbauen: rebuild_team_totals liest aus all_matches
+    rebuild_team_totals(cursor)
+
+
+def _migration_011_merge_double_elim(cursor):
+    """
+    DE-Brackets in einer Tabelle mit bracket_id statt double_elim_matches_a/_b.
+    Die Zeilen werden vor dem Anlegen der Trigger kopiert — team_totals zählt
+    sie schon; DROP TABLE löst keine DELETE-Trigger aus.
+
+    Ganz alte Dateien haben noch eine einzelne double_elim_matches ohne
+    bracket_id (ein Bracket, ohne Trigger). Sie wird umbenannt und in das erste
+    leere Bracket übernommen; team_totals wird danach neu aufgebaut.
+    """
+    legacy_columns = _table_columns(cursor, 'double_elim_matches')
+    if legacy_columns and 'bracket_id' not in legacy_columns:
+        cursor.execute("ALTER TABLE double_elim_matches RENAME TO double_elim_matches_legacy")
+
+    cursor.execute("""
+        CREATE TABLE double_elim_matches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            bracket_id TEXT NOT NULL,
+            match_number INTEGER UNIQUE,
+            round INTEGER NOT NULL,
+            bracket TEXT NOT NULL,
+            match_index INTEGER NOT NULL,
+            team1 TEXT,
+            team2 TEXT,
+            score1 INTEGER DEFAULT NULL,
+            score2 INTEGER DEFAULT NULL,
+            winner TEXT DEFAULT NULL,
+            loser TEXT DEFAULT NULL,
+            court INTEGER DEFAULT NULL,
+            time TEXT DEFAULT NULL,
+            start_min INTEGER,
+            end_min INTEGER
+        )
+    """)
+    columns = ("match_number, round, bracket, match_index, team1, team2, score1, score2, "
+               "winner, loser, court, time, start_min, end_min")
+    for bracket_id in ('A', 'B'):
+        cursor.execute(f"""
+            INSERT INTO double_elim_matches (bracket_id, {columns})
+            SELECT ?, {columns} FROM double_elim_matches_{bracket_id.lower()} ORDER BY id
+        """, (bracket_id,))
+
+    if legacy_columns and 'bracket_id' not in legacy_columns:
+        used = {r[0] for r in cursor.execute("SELECT DISTINCT bracket_id FROM double_elim_matches")}
+        bracket_id = next((b for b in DE_BRACKETS if b not in used), 'Alt')
+        shared = [c for c in columns.split(', ') if c in legacy_columns]
+        # Spielnummern, die schon ein A/B-Spiel trägt, werden neu vergeben
+        select = ", ".join(
+            "CASE WHEN match_number IN (SELECT match_number FROM double_elim_matches "
+            "WHERE match_number IS NOT NULL) THEN NULL ELSE match_number END"
+            if c == 'match_number' else c for c in shared)
+        cursor.execute(f"""
+            INSERT INTO double_elim_matches (bracket_id, {', '.join(shared)})
+            SELECT ?, {select} FROM double_elim_matches_legacy ORDER BY id
+        """, (bracket_id,))
+        _backfill_start_minutes(cursor, 'double_elim_matches')
+        cursor.execute("""
+            UPDATE match_number_sequence
+            SET next_number = MAX(next_number,
+                                  (SELECT COALESCE(MAX(match_number), 0) + 1 FROM double_elim_matches))
+            WHERE id = 1
+        """)
+        cursor.execute("DROP TABLE double_elim_matches_legacy")
+        print(f"✅ Alte Tabelle double_elim_matches als Bracket {bracket_id} übernommen")
+
+    cursor.execute("DROP VIEW IF EXISTS all_matches")
+    cursor.execute("DROP VIEW IF EXISTS match_number_order")
+    cursor.execute("DROP TABLE double_elim_matches_a")
+    cursor.execute("DROP TABLE double_elim_matches_b")
+
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_double_elim_slot "
+                   "ON double_elim_matches(bracket_id, bracket, round, match_index)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_double_elim_matches_court_start "
+                   "ON double_elim_matches(court, start_min)")
+    for column in ('team1', 'team2'):
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_double_elim_matches_{column} "
+                       f"ON double_elim_matches({column})")
+    _create_team_totals_triggers(cursor, 'double_elim_matches')
+    _create_data_version_triggers(cursor, 'double_elim_matches')
+    # IDs der DE-Spiele haben sich geändert → gecachte Snapshots verwerfen
+    cursor.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+
+    cursor.execute("""
+        CREATE VIEW match_number_order AS
+        SELECT 'matches' AS source, 0 AS phase_order, id, match_number,
+               round AS sort1, group_number AS sort2, id AS sort3 FROM matches
+        UNION ALL
+        SELECT 'double_elim_matches', 1, id, match_number,
+               bracket_id, (bracket = 'Losers') * 1000 + round, match_index FROM double_elim_matches
+        UNION ALL
+        SELECT 'super_finals_matches', 3, id, match_number,
+               CASE match_id WHEN 'HF1' THEN 0 WHEN 'HF2' THEN 1 WHEN 'THIRD' THEN 2 ELSE 3 END,
+               0, id FROM super_finals_matches
+        UNION ALL
+        SELECT 'follower_quali_matches', 4, id, match_number, 0, 0, id FROM follower_quali_matches
+        UNION ALL
+        SELECT 'follower_cup_matches', 5, id, match_number, round, match_index, id
+        FROM follower_cup_matches
+        UNION ALL
+        SELECT 'placement_matches', 6, id, match_number, 0, 0, id FROM placement_matches
+    """)
+    cursor.execute("""
+        CREATE VIEW all_matches AS
+        SELECT 'matches' AS source, 0 AS phase_order, 'Round Robin' AS phase,
+               NULL AS bracket_id, NULL AS bracket, round, NULL AS match_index,
+               id, match_number, team1, team2, score1, score2,
+               CASE WHEN score1 > score2 THEN team1 WHEN score2 > score1 THEN team2 END AS winner,
+               field AS court, time, start_min, end_min
+        FROM matches
+        UNION ALL
+        SELECT 'double_elim_matches', 1, 'Double Elimination ' || bracket_id, bracket_id, bracket,
+               round, match_index, id, match_number, team1, team2, score1, score2, winner, court,
+               time, start_min, end_min
+        FROM double_elim_matches
+        UNION ALL
+        SELECT 'super_finals_matches', 3, 'Super Finals', NULL, NULL, match_id, NULL,
+               id, match_number, team1, team2, score1, score2, winner, court, time, start_min, end_min
+        FROM super_finals_matches
+        UNION ALL
+        SELECT 'follower_quali_matches', 4, 'Follower Quali', NULL, NULL, NULL, NULL,
+               id, match_number, team1, team2, score1, score2, winner, court, time, start_min, end_min
+        FROM follower_quali_matches
+        UNION ALL
+        SELECT 'follower_cup_matches', 5, 'Follower Cup', NULL, NULL, round, match_index,
+               id, match_number, team1, team2, score1, score2, winner, court, time, start_min, end_min
+        FROM follower_cup_matches
+        UNION ALL
+        SELECT 'placement_matches', 6, 'Platzierungsrunde', NULL, NULL, COALESCE(round, placement),
+               match_index, id, match_number, team1, team2, score1, score2, winner, court, time,
+               start_min, end_min
+        FROM placement_matches
+    """)
+    if legacy_columns and 'bracket_id' not in legacy_columns:
+        # Die alten Spiele waren in team_totals nie gezählt
+        rebuild_team_totals(cursor)
+
+
+SCHEMA_MIGRATIONS = [
+    (1, _migration_001_legacy_schema),
+    (2, _migration_002_lookup_indexes),
+    (3, _migration_003_team_totals),
+    (4, _migration_004_data_version),
+    (5, _migration_005_ranked_view),
+    (6, _migration_006_single_elim),
+    (7, _migration_007_courts),
+    (8, _migration_008_minute_times),
+    (9, _migration_009_match_number_sequence),
+    (10, _migration_010_all_matches_view),
+    (11, _migration_011_merge_double_elim),
+]
+
+SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate_database(conn):
+    """Bringt eine Turnier-Datenbank auf SCHEMA_VERSION. Gibt die Version zurück."""
+    if get_schema_version(conn) >= SCHEMA_VERSION:
+        return SCHEMA_VERSION
+
+    if conn.in_transaction:
+        conn.commit()
+
+    cursor = conn.cursor()
+    for version, migration in SCHEMA_MIGRATIONS:
+        # BEGIN IMMEDIATE serialisiert parallele Migrationen (mehrere Worker)
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            if get_schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+            print(f"✅ Schema-Migration {version} ({migration.__name__}) angewendet")
+        except Exception:
+            conn.rollback()
+            raise
+    return SCHEMA_VERSION
+
+
+def get_data_version(conn):
+    """Aktuelle Daten-Version; ändert sich bei jeder Änderung an Teams, Rankings oder Matches"""
+    row = conn.execute("SELECT version FROM data_version WHERE id = 1").fetchone()
+    return row[0] if row else 0
+
+
+def batch_update(conn, table, columns, rows, key='id'):
+    """
+    Ein executemany-UPDATE für viele Zeilen: rows = [(wert, …, schlüssel)]
+    passend zu columns. Committet nicht — der Aufrufer schreibt eine Phase
+    in einer Transaktion.
+    """
+    assignments = ", ".join(f"{c} = ?" for c in columns)
+    conn.executemany(f"UPDATE {table} SET {assignments} WHERE {key} = ?", rows)
+
+
+def write_match_numbers(conn, table, ids, start_number, key='id'):
+    """Fortlaufende Spielnummern ab start_number in der Reihenfolge von ids; gibt die nächste zurück"""
+    batch_update(conn, table, ('match_number',),
+                 [(start_number + i, match_id) for i, match_id in enumerate(ids)], key)
+    # Sequenz bleibt hinter der höchsten vergebenen Nummer
+    conn.execute("UPDATE match_number_sequence SET next_number = MAX(next_number, ?) WHERE id = 1",
+                 (start_number + len(ids),))
+    return start_number + len(ids)
+
+
 def upgrade_database(db_path):
     """Datenbank-Migration für bestehende Datenbanken"""
     conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("PRAGMA table_info(teams)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'is_ghost' not in columns:
-            cursor.execute("ALTER TABLE teams ADD COLUMN is_ghost INTEGER DEFAULT 0")
-            print("✅ Spalte 'is_ghost' hinzugefügt")
-        
-        cursor.execute("PRAGMA table_info(matches)")
-        columns = [col[1] for col in cursor.fetchall()]
-        if 'match_number' not in columns:
-            cursor.execute("ALTER TABLE matches ADD COLUMN match_number INTEGER UNIQUE")
-            print("✅ Spalte 'match_number' hinzugefügt")
-        
-        # Alle anderen Tabellen erstellen (falls nicht vorhanden)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS double_elim_matches_a (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                match_number INTEGER UNIQUE,
-                round INTEGER NOT NULL,
-                bracket TEXT NOT NULL,
-                match_index INTEGER NOT NULL,
-                team1 TEXT, team2 TEXT,
-                score1 INTEGER, score2 INTEGER,
-                winner TEXT, loser TEXT,
-                court INTEGER, time TEXT
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS double_elim_matches_b (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                match_number INTEGER UNIQUE,
-                round INTEGER NOT NULL,
-                bracket TEXT NOT NULL,
-                match_index INTEGER NOT NULL,
-                team1 TEXT, team2 TEXT,
-                score1 INTEGER, score2 INTEGER,
-                winner TEXT, loser TEXT,
-                court INTEGER, time TEXT
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS super_finals_matches (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                match_number INTEGER UNIQUE,
-                match_id TEXT NOT NULL UNIQUE,
-                team1 TEXT, team2 TEXT,
-                score1 INTEGER, score2 INTEGER,
-                winner TEXT, court INTEGER, time TEXT
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS follower_quali_matches (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                match_number INTEGER UNIQUE,
-                team1 TEXT, team2 TEXT,
-                score1 INTEGER, score2 INTEGER,
-                winner TEXT, court INTEGER, time TEXT
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS follower_cup_matches (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                match_number INTEGER UNIQUE,
-                round TEXT NOT NULL,
-                match_index INTEGER NOT NULL,
-                team1 TEXT, team2 TEXT,
-                score1 INTEGER, score2 INTEGER,
-                winner TEXT, court INTEGER, time TEXT
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS placement_matches (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                match_number INTEGER UNIQUE,
-                placement TEXT NOT NULL,
-                team1 TEXT, team2 TEXT,
-                score1 INTEGER, score2 INTEGER,
-                winner TEXT, court INTEGER, time TEXT
-            )
-        """)
-        
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS tournament_config (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                game_name TEXT UNIQUE,
-                match_duration INTEGER DEFAULT 12,
-                break_between_games INTEGER DEFAULT 3,
-                break_between_rounds INTEGER DEFAULT 5,
-                start_time TEXT DEFAULT '09:00',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # MITTAGSPAUSE-SPALTEN HINZUFÜGEN
-        cursor.execute("PRAGMA table_info(tournament_config)")
-        columns = [col[1] for col in cursor.fetchall()]
-        
-        if 'lunch_break_enabled' not in columns:
-            cursor.execute("ALTER TABLE tournament_config ADD COLUMN lunch_break_enabled INTEGER DEFAULT 0")
-            print("✅ Spalte 'lunch_break_enabled' hinzugefügt")
-        
-        if 'lunch_break_start' not in columns:
-            cursor.execute("ALTER TABLE tournament_config ADD COLUMN lunch_break_start TEXT DEFAULT '12:00'")
-            print("✅ Spalte 'lunch_break_start' hinzugefügt")
-        
-        if 'lunch_break_end' not in columns:
-            cursor.execute("ALTER TABLE tournament_config ADD COLUMN lunch_break_end TEXT DEFAULT '13:00'")
-            print("✅ Spalte 'lunch_break_end' hinzugefügt")
-        
-        conn.commit()
-        print("✅ Datenbank-Upgrade erfolgreich")
-    
+        migrate_database(conn)
     except Exception as e:
         print(f"⚠️ Warnung bei Upgrade: {e}")
-        conn.rollback()
-    
     finally:
         conn.close()
 
@@ -443,174 +1152,612 @@ def get_qualified_teams_for_bracket(conn, group_start, group_end):
     """
     Holt qualifizierte Teams für ein Bracket.
     Logik: Top 3 aus jeder Gruppe (5 Gruppen = 15 Teams) + bester 4. Platz = 16 Teams.
-    Ghost-Teams werden ausgeschlossen.
+    Ghost-Teams werden ausgeschlossen. Reihenfolge aus der Ranking-Engine
+    (goals_for, goal_difference, direkter Vergleich).
     """
-    cursor = conn.cursor()
+    snap = get_ranking_snapshot(conn)
+    group_range = range(group_start, group_end + 1)
 
-    groups = {}
-    fourths = []
+    qualified = []
+    for group_num in group_range:
+        qualified.extend(t['team'] for t in snap['real_groups'].get(group_num, [])[:3])
 
-    for group_num in range(group_start, group_end + 1):
-        cursor.execute("""
-            SELECT r.team, r.points, r.goal_difference, r.goals_for
-            FROM rankings r
-            WHERE r.group_number = ?
-            AND r.team NOT IN (SELECT name FROM teams WHERE is_ghost = 1)
-            ORDER BY r.points DESC, r.goal_difference DESC, r.goals_for DESC
-        """, (group_num,))
-        rows = cursor.fetchall()
-        top3 = [r['team'] for r in rows[:3]]
-        groups[group_num] = top3
-
-        if len(rows) >= 4:
-            fourth = rows[3]
-            fourths.append({
-                'team': fourth['team'],
-                'points': fourth['points'],
-                'goal_difference': fourth['goal_difference'],
-                'goals_for': fourth['goals_for']
-            })
+    # Bester 4. Platz der Bracket-Hälfte als 16. Team
+    half_fourths = [f for f in snap['fourths'] if f['group'] in group_range]
+    if half_fourths:
+        qualified.append(half_fourths[0]['team'])
 
-    qualified = []
-    for group_num in range(group_start, group_end + 1):
-        qualified.extend(groups.get(group_num, []))
+    return qualified[:DE_BRACKET_SIZE]
 
-    # Bester 4. Platz als 16. Team
-    if fourths:
-        best_fourth = sorted(
-            fourths,
-            key=lambda x: (-x['points'], -x['goal_difference'], -x['goals_for'])
-        )[0]
-        qualified.append(best_fourth['team'])
 
-    return qualified[:16]
+def get_bracket_layouts(conn):
+    """{bracket_id: Layout} aller angelegten DE-Brackets (aus den Spielen je Runde)"""
+    counts = defaultdict(lambda: {'Winners': {}, 'Losers': {}})
+    for bracket_id, bracket, round_num, n in conn.execute("""
+        SELECT bracket_id, bracket, round, COUNT(*) FROM double_elim_matches
+        GROUP BY bracket_id, bracket, round ORDER BY bracket_id
+    """):
+        counts[bracket_id][bracket][round_num] = n
 
+    def per_round(by_round):
+        return (0,) + tuple(by_round.get(r, 0) for r in range(1, max(by_round, default=0) + 1))
 
-def process_double_elim_forwarding(conn, match_row, bracket_table, winner_mapping, 
-                                   loser_mapping, loser_winner_mapping):
-    """Automatische Weiterleitung nach Spielende"""
-    cursor = conn.cursor()
-    
-    round_num = match_row['round']
-    bracket_type = match_row['bracket']
-    match_index = match_row['match_index']
-    winner = match_row['winner']
-    loser = match_row['loser']
-    
-    if not winner or not loser:
-        return
-    
-    if bracket_type == 'Winners':
-        key = (round_num, match_index)
-        if key in winner_mapping:
-            next_round, next_index, slot = winner_mapping[key]
-            cursor.execute(f"""
-                UPDATE {bracket_table}
-                SET {slot} = ?
-                WHERE round = ? AND bracket = 'Winners' AND match_index = ?
-            """, (winner, next_round, next_index))
-        
-        if key in loser_mapping:
-            loser_round, loser_index, loser_slot = loser_mapping[key]
-            cursor.execute(f"""
-                UPDATE {bracket_table}
-                SET {loser_slot} = ?
-                WHERE round = ? AND bracket = 'Losers' AND match_index = ?
-            """, (loser, loser_round, loser_index))
-    
-    elif bracket_type == 'Losers':
-        key = (round_num, match_index)
-        if key in loser_winner_mapping:
-            next_round, next_index, slot = loser_winner_mapping[key]
-            cursor.execute(f"""
-                UPDATE {bracket_table}
-                SET {slot} = ?
-                WHERE round = ? AND bracket = 'Losers' AND match_index = ?
-            """, (winner, next_round, next_index))
-    
-    conn.commit()
+    return {bracket_id: double_elim_layout_for_counts(per_round(c['Winners']), per_round(c['Losers']))
+            for bracket_id, c in counts.items()}
 
-"""
-SPIELNUMMERN-SYSTEM FÜR TURNIER-MANAGEMENT
-===========================================
 
-Dieses Modul implementiert die automatische Vergabe von durchlaufenden
-Spielnummern (#1-245+) für alle Turnierphasen.
+def get_bracket_layout(conn, bracket_id):
+    """Layout eines bestehenden DE-Brackets, sonst Standardgröße"""
+    layout = get_bracket_layouts(conn).get(bracket_id)
+    return layout or get_double_elim_layout(DE_BRACKET_SIZE)
 
-NUMMERIERUNGSSYSTEM:
-- Round Robin:           #1 - #150 (10 Gruppen × 5 Runden × 3 Spiele)
-- Bracket A Double Elim: #151 - #181 (ca. 31 Spiele)
-- Bracket B Double Elim: #182 - #212 (ca. 31 Spiele)
-- Super Finals:          #213 - #216 (4 Spiele)
-- Follower Cup:          #217 - #245 (ca. 29 Spiele)
-- Platzierungsrunde:     #246+ (ca. 14 Spiele)
 
-WICHTIG: Diese Funktionen müssen in generate_matches(), generate_double_elim()
-und andere Generierungs-Funktionen integriert werden.
-"""
+def get_double_elim_matches(conn, ready_only=False):
+    """
+    DE-Spiele aller Brackets in einer Abfrage, nach Runde, Seite (WB vor LB)
+    und Index: {bracket_id: [row, ...]}. ready_only: nur Spiele mit zwei Teams.
+    """
+    ready = "WHERE team1 IS NOT NULL AND team2 IS NOT NULL" if ready_only else ""
+    brackets = {bracket_id: [] for bracket_id in DE_BRACKETS}
+    for r in conn.execute(f"""
+        SELECT * FROM double_elim_matches {ready}
+        ORDER BY bracket_id, round, bracket DESC, match_index
+    """):
+        brackets.setdefault(r['bracket_id'], []).append(r)
+    return brackets
+
+
+# ── Bracket-Abhängigkeitsgraph ───────────────────────────────────────────────
+# Knoten = Spiel (identifiziert über key_columns), Kanten = Weiterleitung des
+# Siegers/Verlierers in einen Slot eines späteren Spiels. Wird ein Ergebnis
+# korrigiert, läuft die Korrektur entlang der Kanten: geänderte Slots werden
+# neu besetzt, Ergebnisse mit falscher Besetzung verworfen — rekursiv, aber nur
+# im betroffenen Teilbaum und in einer einzigen Transaktion.
+
+BRACKET_RESULT_COLUMNS = ('score1', 'score2', 'winner', 'loser')
+
+
+class BracketGraph(namedtuple('BracketGraph', ['key_columns', 'edges'])):
+    """edges: {knoten: ((outcome, ziel_knoten, slot), ...)} mit outcome 'winner'/'loser'"""
+    __slots__ = ()
+
+    def key(self, row):
+        return tuple(row[c] for c in self.key_columns)
+
+
+DE_KEY_COLUMNS = ('bracket_id', 'bracket', 'round', 'match_index')
+
+
+def double_elim_graph(winner_mapping, loser_mapping, loser_winner_mapping, bracket_id):
+    """Abhängigkeitsgraph eines DE-Brackets aus seinen Weiterleitungstabellen"""
+    edges = defaultdict(list)
+    for (r, i), (nr, ni, slot) in winner_mapping.items():
+        edges[(bracket_id, 'Winners', r, i)].append(('winner', (bracket_id, 'Winners', nr, ni), slot))
+    for (r, i), (nr, ni, slot) in loser_mapping.items():
+        edges[(bracket_id, 'Winners', r, i)].append(('loser', (bracket_id, 'Losers', nr, ni), slot))
+    for (r, i), (nr, ni, slot) in loser_winner_mapping.items():
+        edges[(bracket_id, 'Losers', r, i)].append(('winner', (bracket_id, 'Losers', nr, ni), slot))
+    return BracketGraph(DE_KEY_COLUMNS, {node: tuple(e) for node, e in edges.items()})
+
+
+# ── SINGLE-ELIMINATION-ENGINE ────────────────────────────────────────────────
+# Follower Cup, Platzierungsrunde und Nebenturniere: beliebige Teamzahl
+# (2 … 128), aufgefüllt auf die nächste Zweierpotenz. Freilose gehen an die
+# besten Setzplätze; Spiele mit Freilos werden nicht angelegt, das Team steht
+# direkt in der nächsten Runde. Optional Spiel um Platz 3 oder eine komplette
+# Platzierungsleiter (jeder Platz wird ausgespielt).
+# Rundennamen zählen vom Finale rückwärts ('final', 'semi', 'quarter', ...);
+# Platzierungsspiele tragen den Startplatz als Präfix ('p5_semi', 'p7_final'),
+# das Spiel um Platz 3 heißt weiterhin 'third'.
+
+SE_MAX_TEAMS = 128
+SINGLE_ELIM_ROUND_NAMES = ('final', 'semi', 'quarter', 'eighth', 'sixteenth',
+                           'thirtysecond', 'sixtyfourth')
+SINGLE_ELIM_ROUND_LABELS = {
+    'final': 'Finale', 'semi': 'Halbfinale', 'quarter': 'Viertelfinale', 'eighth': '1/8-Finale',
+    'sixteenth': '1/16-Finale', 'thirtysecond': '1/32-Finale', 'sixtyfourth': '1/64-Finale',
+}
 
-import sqlite3
 
+class SingleElimMatch(namedtuple('SingleElimMatch',
+                                 ['round', 'match_index', 'level', 'first_place', 'last_place'])):
+    """Spiel im Layout: level = frühester Spielblock, Platzbereich der beiden Teams"""
+    __slots__ = ()
 
-# ============================================================================
-# HILFSFUNKTIONEN FÜR SPIELNUMMERN
-# ============================================================================
+    @property
+    def decides_places(self):
+        """Sieger bekommt first_place, Verlierer first_place + 1"""
+        return self.last_place == self.first_place + 1
 
-def get_next_match_number(cursor):
+
+class SingleElimLayout(namedtuple('SingleElimLayout', [
+        'entrants', 'size', 'third_place', 'consolation', 'matches', 'rounds', 'seeds', 'graph'])):
     """
-    Ermittelt die nächste verfügbare Spielnummer über alle Tabellen hinweg.
-    
-    Returns:
-        int: Nächste freie Spielnummer
+    Vorberechnetes K.o.-Bracket:
+    matches: SingleElimMatch in Spielreihenfolge, rounds: Rundennamen in Spielreihenfolge,
+    seeds: {(round, index): {slot: setzplatz_index}}, graph: Weiterleitungsindex
     """
-    max_numbers = []
-    
-    # Round Robin
-    cursor.execute("SELECT MAX(match_number) as max_num FROM matches")
-    row = cursor.fetchone()
-    if row and row['max_num']:
-        max_numbers.append(row['max_num'])
-    
-    # Double Elim A
-    cursor.execute("SELECT MAX(match_number) as max_num FROM double_elim_matches_a")
-    row = cursor.fetchone()
-    if row and row['max_num']:
-        max_numbers.append(row['max_num'])
-    
-    # Double Elim B
-    cursor.execute("SELECT MAX(match_number) as max_num FROM double_elim_matches_b")
-    row = cursor.fetchone()
-    if row and row['max_num']:
-        max_numbers.append(row['max_num'])
-    
-    # Super Finals
-    cursor.execute("SELECT MAX(match_number) as max_num FROM super_finals_matches")
-    row = cursor.fetchone()
-    if row and row['max_num']:
-        max_numbers.append(row['max_num'])
-    
-    # Follower Cup Quali
-    cursor.execute("SELECT MAX(match_number) as max_num FROM follower_quali_matches")
-    row = cursor.fetchone()
-    if row and row['max_num']:
-        max_numbers.append(row['max_num'])
-    
-    # Follower Cup
-    cursor.execute("SELECT MAX(match_number) as max_num FROM follower_cup_matches")
-    row = cursor.fetchone()
-    if row and row['max_num']:
-        max_numbers.append(row['max_num'])
-    
-    # Placement
-    cursor.execute("SELECT MAX(match_number) as max_num FROM placement_matches")
-    row = cursor.fetchone()
-    if row and row['max_num']:
-        max_numbers.append(row['max_num'])
-    
-    if max_numbers:
-        return max(max_numbers) + 1
+    __slots__ = ()
+
+    @property
+    def match_by_key(self):
+        return {(m.round, m.match_index): m for m in self.matches}
+
+
+def _single_elim_round_label(first_place, depth):
+    name = SINGLE_ELIM_ROUND_NAMES[depth]
+    if first_place == 1:
+        return name
+    if first_place == 3 and depth == 0:
+        return 'third'
+    return f"p{first_place}_{name}"
+
+
+def single_elim_round_label(round_name):
+    """Anzeigename einer K.o.-Runde: 'semi' → 'Halbfinale', 'p5_final' → 'Spiel um Platz 5'"""
+    if round_name == 'third':
+        return 'Spiel um Platz 3'
+    prefix, _, name = round_name.rpartition('_')
+    label = SINGLE_ELIM_ROUND_LABELS.get(name, name)
+    if not prefix:
+        return label
+    first = int(prefix[1:])
+    if name == 'final':
+        return f"Spiel um Platz {first}"
+    last = first + 2 ** (SINGLE_ELIM_ROUND_NAMES.index(name) + 1) - 1
+    return f"Platz {first}–{last}: {label}"
+
+
+@functools.lru_cache(maxsize=None)
+def get_single_elim_layout(entrants, third_place=True, consolation=False):
+    """
+    K.o.-Layout für `entrants` Teams, einmal berechnet und gecacht.
+
+    Args:
+        entrants: Anzahl Teams (2 … 128)
+        third_place: Spiel um Platz 3
+        consolation: vollständige Platzierungsleiter (schließt Platz 3 ein)
+    """
+    if entrants < 2 or entrants > SE_MAX_TEAMS:
+        raise ValueError(f"K.o.-System braucht 2 bis {SE_MAX_TEAMS} Teams, nicht {entrants}")
+
+    size = 1 << (entrants - 1).bit_length()
+    BYE = None
+
+    # Rohstruktur für die volle Zweierpotenz; Eingang = ('seed', i) oder (knoten, outcome)
+    nodes = []
+
+    def build(first_place, inputs, ladder):
+        current = inputs
+        for depth in range(len(inputs).bit_length() - 2, -1, -1):
+            winners, losers = [], []
+            for i in range(0, len(current), 2):
+                nodes.append({'round': _single_elim_round_label(first_place, depth),
+                              'inputs': (current[i], current[i + 1]),
+                              'first': first_place,
+                              'last': first_place + 2 ** (depth + 1) - 1})
+                winners.append((len(nodes) - 1, 'winner'))
+                losers.append((len(nodes) - 1, 'loser'))
+            if depth >= 1 and ladder:
+                build(first_place + 2 ** depth, losers, True)
+            elif depth == 1 and third_place and first_place == 1:
+                build(3, losers, False)
+            current = winners
+
+    build(1, [('seed', s - 1) if s <= entrants else BYE for s in seeding_order(size)],
+          consolation)
+
+    # Freilose auflösen: Spiel mit nur einem Team wird übersprungen (Sieger
+    # rückt durch, Verlierer = Freilos), Spiel ohne Teams entfällt ganz
+    status = {}
+
+    def resolve(source):
+        if source is BYE or source[0] == 'seed':
+            return source
+        node_id, outcome = source
+        kind, live = status[node_id]
+        if kind == 'real':
+            return source
+        if kind == 'walkover' and outcome == 'winner':
+            return live
+        return BYE
+
+    levels, counters, real = {}, defaultdict(int), []
+    for node_id, node in enumerate(nodes):
+        a, b = (resolve(source) for source in node['inputs'])
+        if a is not BYE and b is not BYE:
+            status[node_id] = ('real', None)
+            node['resolved'] = (a, b)
+            node['index'] = counters[node['round']]
+            counters[node['round']] += 1
+            levels[node_id] = 1 + max((levels[s[0]] for s in (a, b) if s[0] != 'seed'), default=0)
+            real.append(node_id)
+        elif a is BYE and b is BYE:
+            status[node_id] = ('dead', None)
+        else:
+            status[node_id] = ('walkover', a if a is not BYE else b)
+
+    def key(node_id):
+        return (nodes[node_id]['round'], nodes[node_id]['index'])
+
+    edges, seeds = defaultdict(list), defaultdict(dict)
+    for node_id in real:
+        for slot, source in zip(('team1', 'team2'), nodes[node_id]['resolved']):
+            if source[0] == 'seed':
+                seeds[key(node_id)][slot] = source[1]
+            else:
+                edges[key(source[0])].append((source[1], key(node_id), slot))
+
+    # Spielreihenfolge: Spielblock, darin Platzierungsspiele vor dem Hauptfeld
+    real.sort(key=lambda n: (levels[n], -nodes[n]['first'], nodes[n]['index']))
+    matches = tuple(SingleElimMatch(nodes[n]['round'], nodes[n]['index'], levels[n],
+                                    nodes[n]['first'], nodes[n]['last']) for n in real)
+    rounds = tuple(dict.fromkeys(m.round for m in matches))
+
+    return SingleElimLayout(
+        entrants=entrants, size=size, third_place=third_place or consolation,
+        consolation=consolation, matches=matches, rounds=rounds,
+        seeds={k: dict(v) for k, v in seeds.items()},
+        graph=BracketGraph(('round', 'match_index'),
+                           {node: tuple(e) for node, e in edges.items()}),
+    )
+
+
+# Bisheriger Follower Cup (16 Teams, Spiel um Platz 3) — Standard für ältere Turniere
+FOLLOWER_CUP_GRAPH = get_single_elim_layout(16, third_place=True).graph
+
+
+def get_single_elim_config(conn, phase):
+    """Gespeicherte Layout-Parameter einer K.o.-Phase oder None (entrants 0 = nur Option)"""
+    row = conn.execute("SELECT * FROM bracket_config WHERE phase = ?", (phase,)).fetchone()
+    if row is None or row['entrants'] < 2:
+        return None
+    return {'layout': get_single_elim_layout(row['entrants'], bool(row['third_place']),
+                                             bool(row['consolation'])),
+            'first_place': row['first_place']}
+
+
+def get_placement_ladder(conn):
+    """Platzierungsrunde als Leiter (jeder Platz ausgespielt) statt einer Runde?"""
+    row = conn.execute("SELECT consolation FROM bracket_config WHERE phase = 'placement'").fetchone()
+    return bool(row and row['consolation'])
+
+
+def set_placement_ladder(conn, enabled):
+    """
+    Option für die nächste Generierung in bracket_config (entrants 0 bis dahin);
+    eine bereits generierte Platzierungsrunde behält ihr Layout
+    """
+    conn.execute("INSERT OR IGNORE INTO bracket_config (phase, entrants, third_place, consolation) "
+                 "VALUES ('placement', 0, 0, 0)")
+    conn.execute("UPDATE bracket_config SET third_place = ?, consolation = ? "
+                 "WHERE phase = 'placement' AND entrants = 0", (int(enabled), int(enabled)))
+
+
+def insert_single_elim(cursor, table, phase, layout, teams, first_number,
+                       first_place=1, court_start=1):
+    """
+    Legt alle Spiele eines Layouts an (Runde 1 gesetzt, Rest leer) und speichert
+    die Layout-Parameter für Weiterleitung und Platzierung.
+    teams: nach Setzplatz sortiert. Returns: nächste freie Spielnummer
+    """
+    with_placement = 'placement' in _table_columns(cursor, table)
+    courts = get_schedule_params(cursor.connection).courts
+    rows = []
+    court = court_start
+    for number, m in enumerate(layout.matches, start=first_number):
+        seeded = layout.seeds.get((m.round, m.match_index), {})
+        team1, team2 = (teams[seeded[s]] if s in seeded else None for s in ('team1', 'team2'))
+        row = [number, m.round, m.match_index, team1, team2, court]
+        if with_placement:
+            first, last = first_place + m.first_place - 1, first_place + m.last_place - 1
+            row.append(f"P{first}" if m.decides_places else f"P{first}-{last}")
+        rows.append(tuple(row))
+        court = (court % courts) + 1
+
+    columns = "match_number, round, match_index, team1, team2, court"
+    if with_placement:
+        columns += ", placement"
+    cursor.executemany(f"""
+        INSERT INTO {table} ({columns})
+        VALUES ({", ".join("?" * len(rows[0]))})
+    """, rows)
+
+    cursor.execute("""
+        INSERT OR REPLACE INTO bracket_config (phase, entrants, third_place, consolation, first_place)
+        VALUES (?, ?, ?, ?, ?)
+    """, (phase, layout.entrants, int(layout.third_place), int(layout.consolation), first_place))
+
+    return first_number + len(rows)
+
+
+def _match_outcome(row, outcome):
+    """Sieger bzw. Verlierer eines Spiels (Tabellen ohne loser-Spalte: aus den Teams)"""
+    winner = row.get('winner')
+    if outcome == 'winner' or winner is None:
+        return winner
+    if row.get('loser') is not None:
+        return row['loser']
+    return row['team2'] if winner == row['team1'] else row['team1']
+
+
+def plan_bracket_propagation(rows, graph, node):
+    """
+    Berechnet die Folgeänderungen, nachdem das Ergebnis von `node` in `rows`
+    gesetzt, geändert oder gelöscht wurde.
+
+    Args:
+        rows: {knoten: dict(row)} des ganzen Brackets — wird angepasst
+        graph: BracketGraph
+        node: Knoten des geänderten Spiels
+
+    Returns:
+        dict: {knoten: {spalte: neuer_wert}} nur für tatsächlich geänderte Spiele
+    """
+    changes = defaultdict(dict)
+
+    def set_column(n, column, value):
+        if column in rows[n] and rows[n][column] != value:
+            rows[n][column] = value
+            changes[n][column] = value
+
+    def push(n):
+        for outcome, target, slot in graph.edges.get(n, ()):
+            if target not in rows:
+                continue
+            team = _match_outcome(rows[n], outcome)
+            if rows[target][slot] == team:
+                continue
+            set_column(target, slot, team)
+            # Ergebnis mit falscher Besetzung ist ungültig → samt Folgen verwerfen
+            if rows[target]['winner'] is not None:
+                for column in BRACKET_RESULT_COLUMNS:
+                    set_column(target, column, None)
+                push(target)
+
+    push(node)
+    return dict(changes)
+
+
+def _run_bracket_update(conn, table, graph, find_node, result_for):
+    """
+    Gemeinsamer Kern aller K.o.-Schreibvorgänge: Bracket lesen, Ergebnis setzen,
+    Folgeänderungen planen und gebündelt schreiben — eine BEGIN-IMMEDIATE-Transaktion.
+
+    Args:
+        find_node: rows → Knoten des Spiels (None = nicht gefunden)
+        result_for: row → {spalte: wert} des neuen Ergebnisses
+
+    Returns:
+        (rows, changes) bzw. (None, None) wenn das Spiel nicht existiert
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        rows = {}
+        for r in conn.execute(f"SELECT * FROM {table}").fetchall():
+            rows[graph.key(r)] = dict(r)
+        node = find_node(rows)
+        if node not in rows:
+            conn.rollback()
+            return None, None
+
+        own = {c: v for c, v in result_for(rows[node]).items()
+               if c in rows[node] and rows[node][c] != v}
+        rows[node].update(own)
+
+        changes = plan_bracket_propagation(rows, graph, node)
+        if own:
+            changes.setdefault(node, {}).update(own)
+
+        # Gleiche Spaltenmengen gebündelt per executemany schreiben
+        batches = defaultdict(list)
+        for n, cols in changes.items():
+            columns = tuple(sorted(cols))
+            batches[columns].append(tuple(cols[c] for c in columns) + (rows[n]['id'],))
+        for columns, params in batches.items():
+            batch_update(conn, table, columns, params)
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return rows, changes
+
+
+def propagate_bracket_result(conn, table, graph, match_row):
+    """
+    Übernimmt das Ergebnis aus match_row (score1/score2/winner[/loser]) und
+    schreibt alle abhängigen Slots und verworfenen Ergebnisse in einer
+    Transaktion. Bleibt der Sieger gleich (Tippfehler im Score), wird nur das
+    Spiel selbst geschrieben.
+
+    Returns:
+        dict: {match_id: {spalte: neuer_wert}} aller geänderten Spiele
+    """
+    node = graph.key(match_row)
+    result = {c: match_row[c] for c in BRACKET_RESULT_COLUMNS if c in match_row.keys()}
+    rows, changes = _run_bracket_update(conn, table, graph, lambda rows: node, lambda row: result)
+    if rows is None:
+        return {}
+    return {rows[n]['id']: cols for n, cols in changes.items()}
+
+
+# ── K.o.-Ergebnisse: ein Schreibpfad für alle Phasen ─────────────────────────
+
+SUPER_FINALS_GRAPH = BracketGraph(('match_id',), {
+    (hf,): tuple((outcome, (target,), slot)
+                 for (source, outcome), (target, slot) in SUPER_FINALS_PROGRESSION.items()
+                 if source == hf)
+    for hf in ('HF1', 'HF2')
+})
+
+# Tabellen ohne Weiterleitung (Follower Quali, Platzierungsrunde)
+NO_FORWARDING_GRAPH = BracketGraph(('id',), {})
+
+# K.o.-Tabellen auf der Single-Elimination-Engine → Phase in bracket_config
+SINGLE_ELIM_PHASES = {
+    'follower_cup_matches': 'follower_cup',
+    'placement_matches': 'placement',
+}
+
+KNOCKOUT_TABLES = (
+    'double_elim_matches', 'super_finals_matches',
+    'follower_quali_matches', 'follower_cup_matches', 'placement_matches',
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _double_elim_layout_graph(layouts):
+    """Ein Graph über alle DE-Brackets — layouts: ((bracket_id, layout), ...)"""
+    edges = {}
+    for bracket_id, layout in layouts:
+        if layout.winner_mapping is None:
+            continue
+        edges.update(double_elim_graph(layout.winner_mapping, layout.loser_mapping,
+                                       layout.loser_winner_mapping, bracket_id).edges)
+    return BracketGraph(DE_KEY_COLUMNS, edges)
+
+
+def get_knockout_graph(conn, table):
+    """Abhängigkeitsgraph einer K.o.-Tabelle"""
+    if table == 'double_elim_matches':
+        return _double_elim_layout_graph(tuple(get_bracket_layouts(conn).items()))
+    if table in SINGLE_ELIM_PHASES:
+        config = get_single_elim_config(conn, SINGLE_ELIM_PHASES[table])
+        if config:
+            return config['layout'].graph
+        # Ältere Turniere ohne gespeichertes Layout
+        return FOLLOWER_CUP_GRAPH if table == 'follower_cup_matches' else NO_FORWARDING_GRAPH
+    if table == 'super_finals_matches':
+        return SUPER_FINALS_GRAPH
+    return NO_FORWARDING_GRAPH
+
+
+def get_single_elim_rounds(conn, table, matches=()):
+    """
+    Runden einer Single-Elimination-Tabelle in Spielreihenfolge des Layouts,
+    matches (Rows) nach Runde und match_index einsortiert.
+    Returns: [{'round', 'label', 'matches'}]
+    """
+    config = get_single_elim_config(conn, SINGLE_ELIM_PHASES[table])
+    if config:
+        names = config['layout'].rounds
+    elif table == 'follower_cup_matches':
+        # Ältere Turniere ohne gespeichertes Layout
+        names = get_single_elim_layout(16, third_place=True).rounds
     else:
-        return 1
+        names = ()
+    rounds = {name: [] for name in names}
+    for m in matches:
+        rounds.setdefault(m['round'], []).append(m)
+    return [{'round': name, 'label': single_elim_round_label(name),
+             'matches': sorted(rows, key=lambda m: m['match_index'])}
+            for name, rows in rounds.items()]
+
+
+def write_knockout_result(conn, table, match_id, score1, score2):
+    """
+    Ein Schreibpfad für alle K.o.-Tabellen: Spiel lesen, Ergebnis schreiben und
+    alle Weiterleitungen (inkl. Korrekturen) in einer Transaktion anwenden.
+    Bei Gleichstand gewinnt team2 (nur Platzierungsrunde lässt das zu).
+
+    Returns:
+        list: geänderte Spiele als dicts, None wenn das Spiel nicht existiert
+
+    Raises:
+        ValueError: Spiel hat noch keine zwei Teams oder DE-Bracket mit unbekanntem Layout
+    """
+    if table not in KNOCKOUT_TABLES:
+        raise ValueError(f"Keine K.o.-Tabelle: {table}")
+    if table == 'double_elim_matches':
+        row = conn.execute("SELECT bracket_id FROM double_elim_matches WHERE id = ?",
+                           (match_id,)).fetchone()
+        layout = row and get_bracket_layouts(conn).get(row['bracket_id'])
+        if layout and layout.winner_mapping is None:
+            raise ValueError(f"Bracket {row['bracket_id']} hat ein unbekanntes Layout "
+                             f"(WB {list(layout.wb_matches[1:])}, LB {list(layout.lb_matches[1:])}) — "
+                             f"keine automatische Weiterleitung möglich")
+    graph = get_knockout_graph(conn, table)
+
+    def find_node(rows):
+        return next((n for n, r in rows.items() if r['id'] == match_id), None)
+
+    def result_for(row):
+        if not row['team1'] or not row['team2']:
+            raise ValueError("Spiel hat noch keine zwei Teams")
+        team1_wins = score1 > score2
+        return {'score1': score1, 'score2': score2,
+                'winner': row['team1'] if team1_wins else row['team2'],
+                'loser': row['team2'] if team1_wins else row['team1']}
+
+    rows, changes = _run_bracket_update(conn, table, graph, find_node, result_for)
+    if rows is None:
+        return None
+    return [rows[n] for n in changes] or [rows[find_node(rows)]]
+
+
+def process_double_elim_forwarding(conn, match_row, bracket_table, winner_mapping, 
+                                   loser_mapping, loser_winner_mapping):
+    """
+    Automatische Weiterleitung nach Spielende — auch bei Korrekturen:
+    verdrängte Teams und dadurch ungültige Folgeergebnisse werden entfernt
+    """
+    graph = double_elim_graph(winner_mapping, loser_mapping, loser_winner_mapping,
+                              match_row['bracket_id'])
+    return propagate_bracket_result(conn, bracket_table, graph, match_row)
+
+"""
+SPIELNUMMERN-SYSTEM FÜR TURNIER-MANAGEMENT
+===========================================
+
+Dieses Modul implementiert die automatische Vergabe von durchlaufenden
+Spielnummern (#1-245+) für alle Turnierphasen.
+
+NUMMERIERUNGSSYSTEM:
+- Round Robin:           #1 - #150 (10 Gruppen × 5 Runden × 3 Spiele)
+- Bracket A Double Elim: #151 - #181 (ca. 31 Spiele)
+- Bracket B Double Elim: #182 - #212 (ca. 31 Spiele)
+- Super Finals:          #213 - #216 (4 Spiele)
+- Follower Cup:          #217 - #245 (ca. 29 Spiele)
+- Platzierungsrunde:     #246+ (ca. 14 Spiele)
+
+WICHTIG: Diese Funktionen müssen in generate_matches(), generate_double_elim()
+und andere Generierungs-Funktionen integriert werden.
+"""
+
+import sqlite3
+
+
+# ============================================================================
+# HILFSFUNKTIONEN FÜR SPIELNUMMERN
+# ============================================================================
+
+def get_next_match_number(cursor):
+    """
+    Nächste freie Spielnummer über alle Tabellen hinweg (ohne Reservierung).
+    
+    Returns:
+        int: Nächste freie Spielnummer
+    """
+    row = cursor.execute("SELECT next_number FROM match_number_sequence WHERE id = 1").fetchone()
+    return row[0] if row else 1
+
+
+def reserve_match_numbers(cursor, count):
+    """
+    Reserviert count fortlaufende Spielnummern. Das UPDATE sperrt die Datenbank
+    bis zum Commit des Aufrufers — parallele Generierungen bekommen so nie
+    überlappende Blöcke.
+
+    Returns:
+        int: erste Nummer des Blocks
+    """
+    cursor.execute("UPDATE match_number_sequence SET next_number = next_number + ? WHERE id = 1",
+                   (count,))
+    return cursor.execute("SELECT next_number FROM match_number_sequence WHERE id = 1").fetchone()[0] - count
 
 
 def assign_round_robin_match_numbers(conn):
@@ -625,32 +1772,37 @@ def assign_round_robin_match_numbers(conn):
     Args:
         conn: SQLite Connection
     """
-    cursor = conn.cursor()
-    
-    match_number = 1
-    
     # Sortierung: Runde → Gruppe → ID
-    cursor.execute("""
+    ids = [r['id'] for r in conn.execute("""
         SELECT id FROM matches 
         ORDER BY round ASC, group_number ASC, id ASC
-    """)
-    
-    matches = cursor.fetchall()
-    
-    for match in matches:
-        conn.execute("""
-            UPDATE matches 
-            SET match_number = ?
-            WHERE id = ?
-        """, (match_number, match['id']))
-        match_number += 1
-    
+    """)]
+    match_number = write_match_numbers(conn, 'matches', ids, 1)
     conn.commit()
     print(f"✅ Round Robin: {match_number - 1} Spielnummern vergeben (#1-#{match_number - 1})")
     
     return match_number  # Nächste verfügbare Nummer
 
 
+def assign_double_elim_match_numbers(conn, bracket_id, start_number):
+    """Nummeriert ein DE-Bracket: erst alle WB-Runden, dann alle LB-Runden"""
+    layout = get_bracket_layout(conn, bracket_id)
+    rounds = {('Winners', r): r for r in range(1, layout.wb_rounds + 1)}
+    rounds.update({('Losers', r): layout.wb_rounds + r for r in range(1, layout.lb_rounds + 1)})
+
+    # Erst alle WB-Runden, dann alle LB-Runden, innerhalb nach match_index
+    rows = [r for r in conn.execute("""
+                SELECT id, bracket, round, match_index FROM double_elim_matches WHERE bracket_id = ?
+            """, (bracket_id,))
+            if (r['bracket'], r['round']) in rounds]
+    rows.sort(key=lambda r: (rounds[(r['bracket'], r['round'])], r['match_index']))
+    match_number = write_match_numbers(conn, 'double_elim_matches', [r['id'] for r in rows], start_number)
+    conn.commit()
+    print(f"✅ Bracket {bracket_id}: {match_number - start_number} Spielnummern vergeben (#{start_number}-#{match_number - 1})")
+
+    return match_number
+
+
 def assign_double_elim_match_numbers_a(conn, start_number=151):
     """
     Vergibt Spielnummern für Bracket A Double Elimination.
@@ -663,46 +1815,7 @@ def assign_double_elim_match_numbers_a(conn, start_number=151):
     Returns:
         int: Nächste verfügbare Spielnummer
     """
-    cursor = conn.cursor()
-    
-    match_number = start_number
-    
-    # Winner Bracket: Runde 1-4
-    for round_num in range(1, 5):
-        cursor.execute("""
-            SELECT id FROM double_elim_matches_a 
-            WHERE round = ? AND bracket = 'Winners'
-            ORDER BY match_index ASC
-        """, (round_num,))
-        
-        for match in cursor.fetchall():
-            conn.execute("""
-                UPDATE double_elim_matches_a 
-                SET match_number = ?
-                WHERE id = ?
-            """, (match_number, match['id']))
-            match_number += 1
-    
-    # Loser Bracket: Runde 1-6
-    for round_num in range(1, 7):
-        cursor.execute("""
-            SELECT id FROM double_elim_matches_a 
-            WHERE round = ? AND bracket = 'Losers'
-            ORDER BY match_index ASC
-        """, (round_num,))
-        
-        for match in cursor.fetchall():
-            conn.execute("""
-                UPDATE double_elim_matches_a 
-                SET match_number = ?
-                WHERE id = ?
-            """, (match_number, match['id']))
-            match_number += 1
-    
-    conn.commit()
-    print(f"✅ Bracket A: {match_number - start_number} Spielnummern vergeben (#{start_number}-#{match_number - 1})")
-    
-    return match_number
+    return assign_double_elim_match_numbers(conn, 'A', start_number)
 
 
 def assign_double_elim_match_numbers_b(conn, start_number=182):
@@ -717,46 +1830,7 @@ def assign_double_elim_match_numbers_b(conn, start_number=182):
     Returns:
         int: Nächste verfügbare Spielnummer
     """
-    cursor = conn.cursor()
-    
-    match_number = start_number
-    
-    # Winner Bracket: Runde 1-4
-    for round_num in range(1, 5):
-        cursor.execute("""
-            SELECT id FROM double_elim_matches_b 
-            WHERE round = ? AND bracket = 'Winners'
-            ORDER BY match_index ASC
-        """, (round_num,))
-        
-        for match in cursor.fetchall():
-            conn.execute("""
-                UPDATE double_elim_matches_b 
-                SET match_number = ?
-                WHERE id = ?
-            """, (match_number, match['id']))
-            match_number += 1
-    
-    # Loser Bracket: Runde 1-6
-    for round_num in range(1, 7):
-        cursor.execute("""
-            SELECT id FROM double_elim_matches_b 
-            WHERE round = ? AND bracket = 'Losers'
-            ORDER BY match_index ASC
-        """, (round_num,))
-        
-        for match in cursor.fetchall():
-            conn.execute("""
-                UPDATE double_elim_matches_b 
-                SET match_number = ?
-                WHERE id = ?
-            """, (match_number, match['id']))
-            match_number += 1
-    
-    conn.commit()
-    print(f"✅ Bracket B: {match_number - start_number} Spielnummern vergeben (#{start_number}-#{match_number - 1})")
-    
-    return match_number
+    return assign_double_elim_match_numbers(conn, 'B', start_number)
 
 
 def assign_super_finals_match_numbers(conn, start_number=213):
@@ -771,19 +1845,9 @@ def assign_super_finals_match_numbers(conn, start_number=213):
     Returns:
         int: Nächste verfügbare Spielnummer
     """
-    cursor = conn.cursor()
-    
     match_ids = ['HF1', 'HF2', 'THIRD', 'FINAL']
-    match_number = start_number
-    
-    for match_id in match_ids:
-        cursor.execute("""
-            UPDATE super_finals_matches 
-            SET match_number = ?
-            WHERE match_id = ?
-        """, (match_number, match_id))
-        match_number += 1
-    
+    match_number = write_match_numbers(conn, 'super_finals_matches', match_ids, start_number,
+                                       key='match_id')
     conn.commit()
     print(f"✅ Super Finals: {match_number - start_number} Spielnummern vergeben (#{start_number}-#{match_number - 1})")
     
@@ -810,44 +1874,21 @@ def assign_follower_cup_match_numbers(conn, start_number=217):
     Returns:
         int: Nächste verfügbare Spielnummer
     """
-    cursor = conn.cursor()
-    
-    match_number = start_number
-    
     # Qualifikationsspiele
-    cursor.execute("""
+    quali_ids = [r['id'] for r in conn.execute("""
         SELECT id FROM follower_quali_matches 
         ORDER BY id ASC
-    """)
-    
-    for match in cursor.fetchall():
-        conn.execute("""
-            UPDATE follower_quali_matches 
-            SET match_number = ?
-            WHERE id = ?
-        """, (match_number, match['id']))
-        match_number += 1
-    
+    """)]
+    match_number = write_match_numbers(conn, 'follower_quali_matches', quali_ids, start_number)
     quali_count = match_number - start_number
     
-    # Cup-Runden in korrekter Reihenfolge
-    rounds = ['eighth', 'quarter', 'semi', 'third', 'final']
-    
-    for round_name in rounds:
-        cursor.execute("""
-            SELECT id FROM follower_cup_matches 
-            WHERE round = ?
-            ORDER BY match_index ASC
-        """, (round_name,))
-        
-        for match in cursor.fetchall():
-            conn.execute("""
-                UPDATE follower_cup_matches 
-                SET match_number = ?
-                WHERE id = ?
-            """, (match_number, match['id']))
-            match_number += 1
-    
+    # Cup-Runden in Spielreihenfolge des Layouts
+    rounds = [r['round'] for r in get_single_elim_rounds(conn, 'follower_cup_matches')]
+    order = {round_name: i for i, round_name in enumerate(rounds)}
+    rows = [r for r in conn.execute("SELECT id, round, match_index FROM follower_cup_matches")
+            if r['round'] in order]
+    rows.sort(key=lambda r: (order[r['round']], r['match_index']))
+    match_number = write_match_numbers(conn, 'follower_cup_matches', [r['id'] for r in rows], match_number)
     conn.commit()
     print(f"✅ Follower Cup: {match_number - start_number} Spielnummern vergeben (#{start_number}-#{match_number - 1})")
     print(f"   - Qualifikation: {quali_count} Spiele")
@@ -868,23 +1909,12 @@ def assign_placement_match_numbers(conn, start_number=246):
     Returns:
         int: Nächste verfügbare Spielnummer
     """
-    cursor = conn.cursor()
-    
-    match_number = start_number
-    
-    cursor.execute("""
+    # Angelegt in Spielreihenfolge
+    ids = [r['id'] for r in conn.execute("""
         SELECT id FROM placement_matches 
-        ORDER BY placement ASC, id ASC
-    """)
-    
-    for match in cursor.fetchall():
-        conn.execute("""
-            UPDATE placement_matches 
-            SET match_number = ?
-            WHERE id = ?
-        """, (match_number, match['id']))
-        match_number += 1
-    
+        ORDER BY id ASC
+    """)]
+    match_number = write_match_numbers(conn, 'placement_matches', ids, start_number)
     conn.commit()
     print(f"✅ Platzierungsrunde: {match_number - start_number} Spielnummern vergeben (#{start_number}-#{match_number - 1})")
     
@@ -897,16 +1927,9 @@ def assign_placement_match_numbers(conn, start_number=246):
 
 def assign_all_match_numbers(conn):
     """
-    Vergibt Spielnummern für ALLE Turnierphasen in korrekter Reihenfolge.
-    
-    Diese Funktion sollte aufgerufen werden:
-    1. Nach Round Robin Generierung
-    2. Nach Double Elimination Generierung
-    3. Nach Super Finals Generierung
-    4. Nach Follower Cup Generierung
-    5. Nach Platzierungsrunden-Generierung
-    
-    ODER einmal am Ende, wenn alle Matches generiert wurden.
+    Vergibt Spielnummern für ALLE Turnierphasen in korrekter Reihenfolge —
+    ein ROW_NUMBER()-Durchlauf über match_number_order, geschrieben in einer
+    Transaktion. Danach steht die Sequenz hinter der letzten Nummer.
     
     Args:
         conn: SQLite Connection
@@ -914,71 +1937,57 @@ def assign_all_match_numbers(conn):
     Returns:
         dict: Statistik über vergebene Nummern
     """
-    cursor = conn.cursor()
-    
     print("\n" + "=" * 70)
     print("🔢 SPIELNUMMERN-VERGABE STARTET")
     print("=" * 70)
-    
+
+    cup_rounds = [r['round'] for r in get_single_elim_rounds(conn, 'follower_cup_matches')]
+    cup_order = " ".join("WHEN ? THEN ?" for _ in cup_rounds)
+    params = [value for i, name in enumerate(cup_rounds) for value in (name, i)]
+    numbered = conn.execute(f"""
+        SELECT source, id, sort1, ROW_NUMBER() OVER (
+            ORDER BY phase_order,
+                     CASE WHEN source = 'follower_cup_matches'
+                          THEN CASE sort1 {cup_order} END ELSE sort1 END,
+                     sort2, sort3
+        ) AS number
+        FROM match_number_order
+        WHERE source != 'follower_cup_matches' OR sort1 IN ({", ".join("?" * len(cup_rounds))})
+    """, params + list(cup_rounds)).fetchall()
+
+    by_table = defaultdict(list)
+    for r in numbered:
+        by_table[r['source']].append((r['number'], r['id']))
+    try:
+        # match_number ist UNIQUE: erst leeren, dann gebündelt schreiben
+        for table, _phase in MATCH_TABLES:
+            conn.execute(f"UPDATE {table} SET match_number = NULL")
+        for table, rows in by_table.items():
+            batch_update(conn, table, ('match_number',), rows)
+        conn.execute("UPDATE match_number_sequence SET next_number = ? WHERE id = 1",
+                     (len(numbered) + 1,))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    # DE-Spiele zählen pro Bracket (sort1 = bracket_id)
+    phase_of = {'matches': 'round_robin', 'super_finals_matches': 'super_finals',
+                'follower_quali_matches': 'follower_cup', 'follower_cup_matches': 'follower_cup',
+                'placement_matches': 'placement'}
+    brackets = sorted(set(DE_BRACKETS) | {r['sort1'] for r in numbered
+                                          if r['source'] == 'double_elim_matches'})
+    by_phase = defaultdict(list)
+    for r in numbered:
+        phase = (f"bracket_{r['sort1'].lower()}" if r['source'] == 'double_elim_matches'
+                 else phase_of[r['source']])
+        by_phase[phase].append(r['number'])
     stats = {}
-    
-    # 1. Round Robin (#1-#150)
-    cursor.execute("SELECT COUNT(*) as count FROM matches")
-    if cursor.fetchone()['count'] > 0:
-        next_num = assign_round_robin_match_numbers(conn)
-        stats['round_robin'] = {'start': 1, 'end': next_num - 1, 'count': next_num - 1}
-    else:
-        next_num = 1
-        stats['round_robin'] = {'start': 0, 'end': 0, 'count': 0}
-    
-    # 2. Bracket A Double Elim (#151-#181)
-    cursor.execute("SELECT COUNT(*) as count FROM double_elim_matches_a")
-    if cursor.fetchone()['count'] > 0:
-        start = next_num
-        next_num = assign_double_elim_match_numbers_a(conn, next_num)
-        stats['bracket_a'] = {'start': start, 'end': next_num - 1, 'count': next_num - start}
-    else:
-        stats['bracket_a'] = {'start': 0, 'end': 0, 'count': 0}
-    
-    # 3. Bracket B Double Elim (#182-#212)
-    cursor.execute("SELECT COUNT(*) as count FROM double_elim_matches_b")
-    if cursor.fetchone()['count'] > 0:
-        start = next_num
-        next_num = assign_double_elim_match_numbers_b(conn, next_num)
-        stats['bracket_b'] = {'start': start, 'end': next_num - 1, 'count': next_num - start}
-    else:
-        stats['bracket_b'] = {'start': 0, 'end': 0, 'count': 0}
-    
-    # 4. Super Finals (#213-#216)
-    cursor.execute("SELECT COUNT(*) as count FROM super_finals_matches")
-    if cursor.fetchone()['count'] > 0:
-        start = next_num
-        next_num = assign_super_finals_match_numbers(conn, next_num)
-        stats['super_finals'] = {'start': start, 'end': next_num - 1, 'count': next_num - start}
-    else:
-        stats['super_finals'] = {'start': 0, 'end': 0, 'count': 0}
-    
-    # 5. Follower Cup (#217-#245)
-    cursor.execute("SELECT COUNT(*) as count FROM follower_quali_matches")
-    quali_count = cursor.fetchone()['count']
-    cursor.execute("SELECT COUNT(*) as count FROM follower_cup_matches")
-    cup_count = cursor.fetchone()['count']
-    
-    if quali_count > 0 or cup_count > 0:
-        start = next_num
-        next_num = assign_follower_cup_match_numbers(conn, next_num)
-        stats['follower_cup'] = {'start': start, 'end': next_num - 1, 'count': next_num - start}
-    else:
-        stats['follower_cup'] = {'start': 0, 'end': 0, 'count': 0}
-    
-    # 6. Platzierungsrunde (#246+)
-    cursor.execute("SELECT COUNT(*) as count FROM placement_matches")
-    if cursor.fetchone()['count'] > 0:
-        start = next_num
-        next_num = assign_placement_match_numbers(conn, next_num)
-        stats['placement'] = {'start': start, 'end': next_num - 1, 'count': next_num - start}
-    else:
-        stats['placement'] = {'start': 0, 'end': 0, 'count': 0}
+    for phase in (['round_robin'] + [f'bracket_{b.lower()}' for b in brackets] +
+                  ['super_finals', 'follower_cup', 'placement']):
+        numbers = by_phase.get(phase)
+        stats[phase] = ({'start': min(numbers), 'end': max(numbers), 'count': len(numbers)}
+                        if numbers else {'start': 0, 'end': 0, 'count': 0})
     
     # Zusammenfassung
     total_matches = sum(phase['count'] for phase in stats.values())
@@ -1012,8 +2021,7 @@ def reset_all_match_numbers(conn):
     cursor = conn.cursor()
     
     cursor.execute("UPDATE matches SET match_number = NULL")
-    cursor.execute("UPDATE double_elim_matches_a SET match_number = NULL")
-    cursor.execute("UPDATE double_elim_matches_b SET match_number = NULL")
+    cursor.execute("UPDATE double_elim_matches SET match_number = NULL")
     cursor.execute("UPDATE super_finals_matches SET match_number = NULL")
     cursor.execute("UPDATE follower_quali_matches SET match_number = NULL")
     cursor.execute("UPDATE follower_cup_matches SET match_number = NULL")
@@ -1128,21 +2136,21 @@ def get_tournament_config(conn):
     cursor.execute("SELECT * FROM tournament_config LIMIT 1")
     config = cursor.fetchone()
 
-    if config:
-        return {
-            'match_duration': config['match_duration'],
-            'break_between_games': config['break_between_games'],
-            'break_between_rounds': config['break_between_rounds'],
-            'start_time': config['start_time']
-        }
-    else:
+    defaults = {
+        'match_duration': 12,
+        'break_between_games': 3,
+        'break_between_rounds': 5,
+        'start_time': '09:00',
+        'lunch_break_enabled': 0,
+        'lunch_break_start': '12:00',
+        'lunch_break_end': '13:00',
+        'courts': DEFAULT_COURTS,
+    }
+    if not config:
         # Defaults falls keine Config vorhanden
-        return {
-            'match_duration': 12,
-            'break_between_games': 3,
-            'break_between_rounds': 5,
-            'start_time': '09:00'
-        }
+        return defaults
+    return {key: config[key] if key in config.keys() and config[key] is not None else default
+            for key, default in defaults.items()}
 
 
 def parse_time(time_str):
@@ -1156,10 +2164,11 @@ def parse_time(time_str):
         datetime.time: Zeit-Objekt
     """
     try:
-        return datetime.strptime(time_str, "%H:%M").time()
-    except ValueError:
+        minutes = time_to_minutes(time_str)
+    except (AttributeError, ValueError):
         # Fallback auf 09:00 wenn ungültiges Format
-        return datetime.strptime("09:00", "%H:%M").time()
+        minutes = 9 * 60
+    return dtime(minutes // 60 % 24, minutes % 60)
 
 
 def format_time(dt):
@@ -1186,350 +2195,370 @@ def add_minutes_to_time(time_str, minutes):
     Returns:
         str: Neue Zeit als "HH:MM"
     """
-    base = datetime.strptime(time_str, "%H:%M")
-    new_time = base + timedelta(minutes=minutes)
-    return format_time(new_time)
+    return minutes_to_time(time_to_minutes(time_str) + minutes)
 
 
 # ============================================================================
-# ROUND ROBIN ZEITBERECHNUNG
+# SPIELPLAN-ENGINE
 # ============================================================================
+# Listen-Scheduling für alle Phasen: Spiele werden nach frühestmöglichem Start
+# (Feld frei, Abhängigkeiten gespielt, beide Teams ausgeruht, nicht in der
+# Mittagspause) und bei Gleichstand nach längster Restkette (kritischer Pfad)
+# auf die Felder verteilt — das hält den Turniertag kurz. Kein Team spielt
+# zwei Spiele gleichzeitig; ein Feld braucht zwischen zwei Spielen die
+# Umstellungszeit (break_between_games), ein Team zwischen zwei Spielen die
+# Rundenpause (break_between_rounds). Zeiten intern in Minuten ab Mitternacht.
+
+DEFAULT_COURTS = 15
+PHASE_BREAK_MINUTES = 15   # letzte Gruppenspiele → K.o.-Phase (Auswertung, Auslosung)
+SUPER_FINALS_BREAKS = {
+    'qualified': 30,       # Bracket-Finale → Halbfinale
+    'third': 30,           # Halbfinale → Spiel um Platz 3
+    'final': 15,           # Spiel um Platz 3 → Finale
+}
 
 
-def check_and_insert_lunch_break(current_time, match_duration, lunch_start, lunch_end):
+def parse_court_count(value):
+    """Anzahl Felder aus einem Formularwert: ganze Zahl ≥ 1, sonst ValueError"""
+    try:
+        courts = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Ungültige Anzahl Felder: {value!r}") from None
+    if courts < 1:
+        raise ValueError("Es braucht mindestens ein Feld!")
+    return courts
+
+
+class ScheduleParams(namedtuple('ScheduleParams',
+                                ['courts', 'duration', 'court_gap', 'team_gap', 'lunch'])):
+    """Eingaben der Engine; lunch = (start, ende) in Minuten oder None"""
+    __slots__ = ()
+
+
+class ScheduleJob(namedtuple('ScheduleJob', ['key', 'teams', 'after', 'release', 'court', 'order'])):
     """
-    Prüft ob ein Match in die Mittagspause fallen würde und verschiebt es danach.
+    Ein zu planendes Spiel:
+    key: (tabelle, id), teams: bekannte Teams, after: ((key, pause), ...) Abhängigkeiten,
+    release: frühester Start, court: festes Feld oder None, order: Reihenfolge bei Gleichstand
     """
-    from datetime import datetime, timedelta
+    __slots__ = ()
 
-    current_dt = datetime.strptime(current_time, "%H:%M")
-    lunch_start_dt = datetime.strptime(lunch_start, "%H:%M")
-    lunch_end_dt = datetime.strptime(lunch_end, "%H:%M")
 
-    match_end_dt = current_dt + timedelta(minutes=match_duration)
+def time_to_minutes(time_str):
+    """'HH:MM' → Minuten ab Mitternacht"""
+    hours, minutes = time_str.split(':')
+    return int(hours) * 60 + int(minutes)
 
-    # Prüfe ob Match in Mittagspause fällt
-    if current_dt < lunch_start_dt and match_end_dt > lunch_start_dt:
-        print(f"       ⚠️  Mittagspause! Verschiebe von {current_time} auf {lunch_end}")
-        return lunch_end
 
-    if lunch_start_dt <= current_dt < lunch_end_dt:
-        print(f"       ⚠️  In Mittagspause! Verschiebe von {current_time} auf {lunch_end}")
-        return lunch_end
+def minutes_to_time(minutes):
+    """Minuten ab Mitternacht → 'HH:MM'"""
+    return f"{minutes // 60 % 24:02d}:{minutes % 60:02d}"
 
-    return current_time
 
+def get_schedule_params(conn):
+    """ScheduleParams aus der Turnier-Konfiguration"""
+    config = get_tournament_config(conn)
+    lunch = None
+    if config['lunch_break_enabled']:
+        lunch = (time_to_minutes(config['lunch_break_start']),
+                 time_to_minutes(config['lunch_break_end']))
+    return ScheduleParams(courts=config['courts'], duration=config['match_duration'],
+                          court_gap=config['break_between_games'],
+                          team_gap=config['break_between_rounds'], lunch=lunch)
 
-def calculate_round_robin_times(conn):
-    """
-    Berechnet Spielzeiten für Round Robin mit PARALLELEN SPIELEN.
 
-    LOGIK:
-    - Alle Spiele einer Runde/Bracket spielen PARALLEL
-    - 10 Gruppen → 2 Brackets (A: 1-5, B: 6-10)
-    - Pro Runde: Erst alle A Gruppen parallel, Pause, dann alle B Gruppen parallel
+def avoid_lunch(start, params):
+    """Verschiebt einen Start, der in die Mittagspause fallen würde, an deren Ende"""
+    if params.lunch and start < params.lunch[1] and start + params.duration > params.lunch[0]:
+        return params.lunch[1]
+    return start
+
+
+def schedule_jobs(jobs, params, court_free=None, team_free=None):
     """
-    cursor = conn.cursor()
+    Plant alle Jobs auf params.courts Felder.
 
-    # Config aus DB holen
-    cursor.execute("SELECT * FROM tournament_config LIMIT 1")
-    config = cursor.fetchone()
+    Args:
+        jobs: ScheduleJob-Liste; Abhängigkeiten auf unbekannte Keys werden ignoriert
+        court_free: {feld: frei ab} für bereits belegte Felder
+        team_free: {team: ende des letzten Spiels}
 
-    if not config:
-        print("❌ Keine Turnier-Konfiguration gefunden!")
-        return 0
+    Returns:
+        dict: {key: (start, feld)}
 
-    match_duration = config["match_duration"]
-    pause_between_games = config["break_between_games"]
-    try:
-        pause_between_rounds = config["break_between_rounds"]
-    except (KeyError, TypeError, IndexError):
-        pause_between_rounds = pause_between_games
-    start_time = config["start_time"]
+    Raises:
+        ValueError: zyklische Abhängigkeiten
+    """
+    by_key = {job.key: job for job in jobs}
+    successors = defaultdict(list)
+    pending = {}
+    for job in jobs:
+        deps = [(key, gap) for key, gap in job.after if key in by_key]
+        pending[job.key] = len(deps)
+        for key, gap in deps:
+            successors[key].append((job.key, gap))
+
+    # Topologische Reihenfolge, dann Restkette rückwärts
+    order = [key for key, n in pending.items() if n == 0]
+    remaining = dict(pending)
+    for key in order:
+        for successor, _ in successors[key]:
+            remaining[successor] -= 1
+            if remaining[successor] == 0:
+                order.append(successor)
+    if len(order) != len(jobs):
+        raise ValueError("Zyklische Abhängigkeiten im Spielplan")
+    chain = {}
+    for key in reversed(order):
+        chain[key] = 1 + max((chain[s] for s, _ in successors[key]), default=0)
+
+    courts = dict(court_free or {})
+    for court in range(1, params.courts + 1):
+        courts.setdefault(court, 0)
+    team_free = dict(team_free or {})
+    dep_ready = defaultdict(int)
+    ready = [key for key, n in pending.items() if n == 0]
+    result = {}
 
+    while ready:
+        first_free = min(courts.values())
+        best = None
+        for key in ready:
+            job = by_key[key]
+            earliest = max([job.release, dep_ready[key]] +
+                           [team_free[t] + params.team_gap for t in job.teams if t in team_free])
+            start = max(earliest, courts.setdefault(job.court, 0) if job.court else first_free)
+            rank = (avoid_lunch(start, params), -chain[key], job.order)
+            if best is None or rank < best[0]:
+                best = (rank, key)
+
+        (start, _, _), key = best
+        job = by_key[key]
+        court = job.court or min(c for c, free in courts.items() if free <= start)
+        ready.remove(key)
+        result[key] = (start, court)
+
+        end = start + params.duration
+        courts[court] = end + params.court_gap
+        for team in job.teams:
+            team_free[team] = end
+        for successor, gap in successors[key]:
+            dep_ready[successor] = max(dep_ready[successor], end + gap)
+            pending[successor] -= 1
+            if pending[successor] == 0:
+                ready.append(successor)
+
+    return result
+
+
+def write_schedule(conn, schedule, duration):
+    """Schreibt Start/Ende (Minuten + Anzeigezeit) und Felder gebündelt pro Tabelle"""
+    by_table = defaultdict(list)
+    for (table, match_id), (start, court) in schedule.items():
+        by_table[table].append((start, start + duration, minutes_to_time(start), court, match_id))
+    for table, rows in by_table.items():
+        batch_update(conn, table, ('start_min', 'end_min', 'time', COURT_COLUMNS.get(table, 'court')),
+                     rows)
+    conn.commit()
 
-    # Mittagspause
-    try:
-        lunch_enabled = config['lunch_break_enabled'] == 1
-        lunch_start = config['lunch_break_start']
-        lunch_end = config['lunch_break_end']
-    except (KeyError, TypeError):
-    # Falls Spalten nicht existieren (alte DB)
-        lunch_enabled = False
-        lunch_start = '12:00'
-        lunch_end = '13:00'
 
-    print("\n" + "=" * 70)
-    print("⏰ ZEITBERECHNUNG ROUND ROBIN (PARALLELE SPIELE)")
-    print("=" * 70)
-    print(f"   Spieldauer: {match_duration} Min")
-    print(f"   Pause Spiele (A→B): {pause_between_games} Min | Pause Runden (B→A): {pause_between_rounds} Min")
-    print(f"   Startzeit: {start_time}")
-    if lunch_enabled:
-        print(f"   Mittagspause: {lunch_start} - {lunch_end}")
-    print("=" * 70)
+def schedule_span(schedule, duration, table=None):
+    """(erster Start, letztes Ende) aller bzw. der Spiele einer Tabelle, sonst None"""
+    starts = [start for (t, _), (start, _) in schedule.items() if table is None or t == table]
+    if not starts:
+        return None
+    return min(starts), max(starts) + duration
 
-    current_time = start_time
-    updated_count = 0
 
-    # 5 Runden durchgehen
-    for round_num in range(1, 6):
-        print(f"\n📍 RUNDE {round_num}")
-    
-        # BRACKET A (Gruppen 1-5) - ALLE PARALLEL
-        print(f"   Bracket A (Gruppen 1-5):")
-    
-        # Mittagspause prüfen
-        if lunch_enabled:
-            current_time = check_and_insert_lunch_break(
-                current_time, match_duration, lunch_start, lunch_end
-            )
-    
-        print(f"      Startzeit: {current_time}")
-    
-        # Alle Matches von Runde X, Gruppen 1-5 bekommen die GLEICHE Zeit
-        cursor.execute("""
-            SELECT id FROM matches 
-            WHERE round = ? AND group_number BETWEEN 1 AND 5
-            ORDER BY group_number
-        """, (round_num,))
-    
-        bracket_a_matches = cursor.fetchall()
-    
-        for match in bracket_a_matches:
-            cursor.execute("UPDATE matches SET time = ? WHERE id = ?", 
-                         (current_time, match['id']))
-            updated_count += 1
-    
-        print(f"      → {len(bracket_a_matches)} Matches parallel")
-    
-        # Zeit vorrücken: Spieldauer + Pause
-        # Zeit vorrücken nach Bracket A: Spieldauer + Pause A→B (=break_between_games)
-        current_time = add_minutes_to_time(current_time, match_duration + pause_between_games)
-    
-        # BRACKET B (Gruppen 6-10) - ALLE PARALLEL
-        print(f"   Bracket B (Gruppen 6-10):")
-    
-        # Mittagspause prüfen
-        if lunch_enabled:
-            current_time = check_and_insert_lunch_break(
-                current_time, match_duration, lunch_start, lunch_end
-            )
-    
-        print(f"      Startzeit: {current_time}")
-    
-        # Alle Matches von Runde X, Gruppen 6-10 bekommen die GLEICHE Zeit
-        cursor.execute("""
-            SELECT id FROM matches 
-            WHERE round = ? AND group_number BETWEEN 6 AND 10
-            ORDER BY group_number
-        """, (round_num,))
-    
-        bracket_b_matches = cursor.fetchall()
-    
-        for match in bracket_b_matches:
-            cursor.execute("UPDATE matches SET time = ? WHERE id = ?", 
-                         (current_time, match['id']))
-            updated_count += 1
-    
-        print(f"      → {len(bracket_b_matches)} Matches parallel")
-    
-        # Zeit vorrücken nach Bracket B: Spieldauer + Pause B→nächste Runde A (=break_between_rounds)
-        current_time = add_minutes_to_time(current_time, match_duration + pause_between_rounds)
+# ============================================================================
+# ROUND ROBIN ZEITBERECHNUNG
+# ============================================================================
 
-    conn.commit()
 
-    print("\n" + "=" * 70)
-    print(f"✅ {updated_count} Matches mit Zeiten versehen")
-    print(f"📅 Letzter Timeslot: {current_time}")
-    print("=" * 70 + "\n")
+def check_and_insert_lunch_break(current_time, match_duration, lunch_start, lunch_end):
+    """
+    Prüft ob ein Match in die Mittagspause fallen würde und verschiebt es danach.
+    """
+    current = time_to_minutes(current_time)
+    lunch_start_min = time_to_minutes(lunch_start)
+    lunch_end_min = time_to_minutes(lunch_end)
 
-    return updated_count
+    # Prüfe ob Match in Mittagspause fällt
+    if current < lunch_start_min < current + match_duration:
+        print(f"       ⚠️  Mittagspause! Verschiebe von {current_time} auf {lunch_end}")
+        return lunch_end
 
+    if lunch_start_min <= current < lunch_end_min:
+        print(f"       ⚠️  In Mittagspause! Verschiebe von {current_time} auf {lunch_end}")
+        return lunch_end
 
-def calculate_round_robin_times_alternative(conn):
+    return current_time
+
+
+def _round_robin_jobs(conn, release, court_per_group=False):
     """
-    Alternative Zeitberechnung: Matches innerhalb jeder Gruppe nacheinander.
+    Gruppenspiele als Jobs: jedes Spiel wartet auf das Spiel der Vorrunde
+    beider Teams. court_per_group=True: jede Gruppe auf einem festen Feld.
+    """
+    rows = conn.execute("""
+        SELECT id, round, group_number, team1, team2 FROM matches
+        ORDER BY round, group_number, id
+    """).fetchall()
+    group_courts = {g: i for i, g in enumerate(sorted({r['group_number'] for r in rows}), start=1)}
+    previous = {}
+    jobs = []
+    for order, r in enumerate(rows):
+        key = ('matches', r['id'])
+        teams = (r['team1'], r['team2'])
+        jobs.append(ScheduleJob(key, teams, tuple((previous[t], 0) for t in teams if t in previous),
+                                release, group_courts[r['group_number']] if court_per_group else None,
+                                order))
+        for team in teams:
+            previous[team] = key
+    return jobs
 
-    Logik:
-    - Gruppe 1 spielt Match 1, dann Pause, dann Match 2, etc.
-    - Alle Gruppen starten gleichzeitig
-    - Pro Gruppe: 5 Runden × 3 Matches = 15 Spiele nacheinander
 
-    Diese Methode ist realistischer für kleinere Turniere.
+def calculate_round_robin_times(conn):
+    """
+    Berechnet Spielzeiten und Felder der Gruppenphase mit der Spielplan-Engine.
 
-    Args:
-        conn: SQLite Connection
+    Alle Spiele einer Runde laufen parallel, soweit Felder frei sind; bei
+    mehr Spielen als Feldern folgen Wellen (bei 10 Gruppen und 15 Feldern:
+    Gruppen 1–5, dann 6–10). Ein Team spielt seine Runden in Reihenfolge.
 
     Returns:
         int: Anzahl der Matches mit Zeiten
     """
-    cursor = conn.cursor()
     config = get_tournament_config(conn)
+    params = get_schedule_params(conn)
+    jobs = _round_robin_jobs(conn, time_to_minutes(config['start_time']))
+    schedule = schedule_jobs(jobs, params)
+    write_schedule(conn, schedule, params.duration)
 
-    match_duration = config['match_duration']
-    break_between_games = config['break_between_games']
-    break_between_rounds = config['break_between_rounds']
-    start_time = config['start_time']
-
-    print(f"\n⏰ ZEITBERECHNUNG ROUND ROBIN (Alternative Methode)")
-    print(f"   Spieldauer: {match_duration} Min")
-    print(f"   Pause zwischen Spielen: {break_between_games} Min")
-    print(f"   Pause zwischen Runden: {break_between_rounds} Min")
-    print(f"   Startzeit: {start_time}")
-    print()
+    span = schedule_span(schedule, params.duration)
+    print(f"⏰ Round Robin: {len(schedule)} Matches auf {params.courts} Feldern"
+          + (f", {minutes_to_time(span[0])} – {minutes_to_time(span[1])}" if span else ""))
+    return len(schedule)
 
-    updated_count = 0
-
-    # Pro Gruppe einzeln durchgehen
-    for group_num in range(1, 11):
-        current_time = start_time
-        current_round = None
-    
-        cursor.execute("""
-            SELECT * FROM matches 
-            WHERE group_number = ?
-            ORDER BY round, id
-        """, (group_num,))
-    
-        matches = cursor.fetchall()
-    
-        print(f"   Gruppe {group_num}: {len(matches)} Matches")
-    
-        for match in matches:
-            match_id = match['id']
-            round_num = match['round']
-        
-            # Neue Runde beginnt → Rundenpause
-            if current_round is not None and current_round != round_num:
-                current_time = add_minutes_to_time(current_time, break_between_rounds)
-        
-            current_round = round_num
-        
-            # Zeit setzen
-            cursor.execute("""
-                UPDATE matches 
-                SET time = ?
-                WHERE id = ?
-            """, (current_time, match_id))
-        
-            updated_count += 1
-        
-            # Nächster Zeitslot: Spieldauer + Pause
-            current_time = add_minutes_to_time(
-                current_time,
-                match_duration + break_between_games
-            )
-
-    conn.commit()
 
-    print(f"\n✅ {updated_count} Matches mit Zeiten versehen")
+def calculate_round_robin_times_alternative(conn):
+    """
+    Alternative Zeitberechnung: jede Gruppe auf einem eigenen Feld, Spiele
+    innerhalb der Gruppe nacheinander, alle Gruppen starten gleichzeitig.
+    Realistischer für kleinere Turniere.
 
-    return updated_count
+    Returns:
+        int: Anzahl der Matches mit Zeiten
+    """
+    config = get_tournament_config(conn)
+    params = get_schedule_params(conn)
+    jobs = _round_robin_jobs(conn, time_to_minutes(config['start_time']), court_per_group=True)
+    schedule = schedule_jobs(jobs, params)
+    write_schedule(conn, schedule, params.duration)
+    print(f"⏰ Round Robin (Alternative): {len(schedule)} Matches, ein Feld pro Gruppe")
+    return len(schedule)
 
 
 # ============================================================================
-# DOUBLE ELIMINATION ZEITBERECHNUNG
+# K.O.-PHASEN ZEITBERECHNUNG
 # ============================================================================
-
-def calculate_double_elim_times(conn, table_name, start_time_str=None):
+# Double Elimination A/B, Super Finals, Follower Quali/Cup und Platzierungsrunde
+# teilen sich die Felder und werden gemeinsam geplant. Abhängigkeiten kommen
+# aus den Bracket-Graphen: ein Spiel startet erst nach den Spielen, die seine
+# Teams liefern.
+
+def _round_robin_end(conn):
+    """Ende des letzten Gruppenspiels in Minuten oder None"""
+    return conn.execute("SELECT MAX(end_min) FROM matches").fetchone()[0]
+
+
+def _knockout_jobs(conn, release, team_gap):
+    """Jobs aller angelegten K.o.-Spiele mit Abhängigkeiten aus den Bracket-Graphen"""
+    tables = {}
+    for table in KNOCKOUT_TABLES:
+        graph = get_knockout_graph(conn, table)
+        tables[table] = (graph, {graph.key(r): dict(r)
+                                 for r in conn.execute(f"SELECT * FROM {table} ORDER BY id")})
+
+    # Super Finals warten auf die Bracket-Finals (Sieger WB-Finale, Sieger LB-Finale)
+    qualified = defaultdict(list)
+    layouts = get_bracket_layouts(conn)
+    de_rows = tables['double_elim_matches'][1]
+    for (bracket_id, place), (match_id, _) in SUPER_FINALS_QUALIFICATION.items():
+        layout = layouts.get(bracket_id)
+        if layout is None:
+            continue
+        node = ((bracket_id, 'Winners', layout.wb_rounds, 0) if place == 1
+                else (bracket_id, 'Losers', layout.lb_rounds, 0))
+        if node in de_rows:
+            qualified[(match_id,)].append((('double_elim_matches', de_rows[node]['id']),
+                                           SUPER_FINALS_BREAKS['qualified']))
+
+    jobs = []
+    for table, (graph, rows) in tables.items():
+        gap = SUPER_FINALS_BREAKS['third'] if table == 'super_finals_matches' else team_gap
+        sources = _bracket_sources(graph)
+        for node, row in rows.items():
+            if row['team2'] == 'BYE':
+                continue
+            after = [((table, rows[source]['id']), gap)
+                     for source, _ in sources.get(node, {}).values() if source in rows]
+            if table == 'super_finals_matches':
+                after += qualified[node]
+                if node == ('FINAL',) and ('THIRD',) in rows:
+                    # Finale als Abschluss nach dem Spiel um Platz 3
+                    after.append((('super_finals_matches', rows[('THIRD',)]['id']),
+                                  SUPER_FINALS_BREAKS['final']))
+            teams = tuple(t for t in (row['team1'], row['team2']) if t)
+            jobs.append(ScheduleJob((table, row['id']), teams, tuple(after), release, None, len(jobs)))
+    return jobs
+
+
+def calculate_knockout_times(conn, start_time_str=None):
     """
-    Berechnet Spielzeiten für Double Elimination Bracket.
-
-    Logik:
-    - Winner Bracket Runde 1: Alle 8 Spiele parallel (verschiedene Felder)
-    - Nach Winner R1: Pause, dann Winner R2 (4 Spiele parallel)
-    - Loser Bracket: Direkt nach entsprechenden Winner-Spielen
+    Plant alle angelegten K.o.-Spiele gemeinsam auf die Felder.
 
     Args:
-        conn: SQLite Connection
-        table_name: 'double_elim_matches_a' oder 'double_elim_matches_b'
-        start_time_str: Startzeit (optional, sonst nach Round Robin)
+        start_time_str: Start der K.o.-Phase (sonst Ende der Gruppenphase
+                        + PHASE_BREAK_MINUTES, Fallback 13:00)
 
     Returns:
-        str: Zeit nach letztem Spiel (für nächste Phase)
+        dict: {tabelle: (start, ende)} in Minuten, nur Tabellen mit Spielen
     """
-    cursor = conn.cursor()
-    config = get_tournament_config(conn)
-
-    match_duration = config['match_duration']
-    break_between_games = config['break_between_games']
-
-    # Startzeit bestimmen
+    params = get_schedule_params(conn)
     if start_time_str is None:
-        # Nach Round Robin: Letzte Zeit + 30 Min Pause
-        cursor.execute("SELECT MAX(time) as last_time FROM matches WHERE time IS NOT NULL")
-        last_rr_time = cursor.fetchone()['last_time']
-    
-        if last_rr_time:
-            start_time_str = add_minutes_to_time(last_rr_time, 30)
-        else:
-            start_time_str = "13:00"  # Fallback
+        rr_end = _round_robin_end(conn)
+        release = rr_end + PHASE_BREAK_MINUTES if rr_end is not None else time_to_minutes("13:00")
+    else:
+        release = time_to_minutes(start_time_str)
 
-    current_time = start_time_str
+    schedule = schedule_jobs(_knockout_jobs(conn, release, params.team_gap), params)
+    write_schedule(conn, schedule, params.duration)
 
-    print(f"\n⏰ ZEITBERECHNUNG DOUBLE ELIMINATION ({table_name})")
-    print(f"   Startzeit: {current_time}")
-    print()
+    spans = {}
+    for table in KNOCKOUT_TABLES:
+        span = schedule_span(schedule, params.duration, table)
+        if span:
+            spans[table] = span
+            print(f"⏰ {table}: {minutes_to_time(span[0])} – {minutes_to_time(span[1])}")
+    return spans
 
-    # Winner Bracket
-    for round_num in range(1, 5):
-        num_matches = 8 // (2 ** (round_num - 1))
-    
-        print(f"   Winner Runde {round_num}: {num_matches} Matches um {current_time}")
-    
-        cursor.execute(f"""
-            SELECT id FROM {table_name}
-            WHERE round = ? AND bracket = 'Winners'
-            ORDER BY match_index
-        """, (round_num,))
-    
-        for match_row in cursor.fetchall():
-            cursor.execute(f"""
-                UPDATE {table_name}
-                SET time = ?
-                WHERE id = ?
-            """, (current_time, match_row['id']))
-    
-        # Nächste Runde: Spieldauer + Pause
-        current_time = add_minutes_to_time(
-            current_time,
-            match_duration + break_between_games
-        )
-
-    # Loser Bracket (startet während Winner Bracket läuft)
-    # Vereinfachung: Loser Bracket 15 Min nach Winner Start
-    loser_start = add_minutes_to_time(start_time_str, 15)
-    current_time = loser_start
 
-    for round_num in range(1, 7):
-        num_matches = max(1, 8 // (2 ** (round_num - 1)))
-    
-        print(f"   Loser Runde {round_num}: {num_matches} Matches um {current_time}")
-    
-        cursor.execute(f"""
-            SELECT id FROM {table_name}
-            WHERE round = ? AND bracket = 'Losers'
-            ORDER BY match_index
-        """, (round_num,))
-    
-        for match_row in cursor.fetchall():
-            cursor.execute(f"""
-                UPDATE {table_name}
-                SET time = ?
-                WHERE id = ?
-            """, (current_time, match_row['id']))
-    
-        current_time = add_minutes_to_time(
-            current_time,
-            match_duration + break_between_games
-        )
-
-    conn.commit()
+def calculate_double_elim_times(conn, table_name, start_time_str=None):
+    """
+    Berechnet Spielzeiten der Double-Elimination-Brackets — geplant
+    zusammen mit allen anderen K.o.-Spielen (gemeinsame Felder).
 
-    print(f"   → Bracket endet ca. um: {current_time}")
+    Args:
+        table_name: 'double_elim_matches'
+        start_time_str: Start der K.o.-Phase (optional, sonst nach Round Robin)
 
-    return current_time
+    Returns:
+        str: Zeit nach letztem DE-Spiel (für nächste Phase)
+    """
+    spans = calculate_knockout_times(conn, start_time_str)
+    span = spans.get(table_name)
+    return minutes_to_time(span[1]) if span else start_time_str
 
 
 # ============================================================================
@@ -1544,467 +2573,1254 @@ def calculate_double_elim_times_and_courts(conn, de_start_time_str=None):
 
 def calculate_super_finals_times(conn, start_time_str=None):
     """
-    Berechnet Spielzeiten für Super Finals.
-
-    Reihenfolge:
-    1. Halbfinale 1 (HF1)
-    2. Halbfinale 2 (HF2) - parallel zu HF1 auf anderem Feld
-    3. Pause (30 Min)
-    4. Spiel um Platz 3 (THIRD)
-    5. Pause (15 Min)
-    6. Finale (FINAL)
+    Berechnet Spielzeiten für Super Finals (über die K.o.-Planung).
 
-    Args:
-        conn: SQLite Connection
-        start_time_str: Startzeit (optional, sonst nach Double Elim)
+    Reihenfolge: Halbfinale 1 & 2 parallel, Pause, Spiel um Platz 3,
+    Pause, Finale (SUPER_FINALS_BREAKS).
 
     Returns:
         str: Zeit nach Finale
     """
-    cursor = conn.cursor()
-    config = get_tournament_config(conn)
-
-    match_duration = config['match_duration']
+    spans = calculate_knockout_times(conn, start_time_str)
+    span = spans.get('super_finals_matches')
+    return minutes_to_time(span[1]) if span else start_time_str
 
-    # Startzeit bestimmen
-    if start_time_str is None:
-        # Nach Double Elimination B
-        cursor.execute("""
-            SELECT MAX(time) as last_time 
-            FROM double_elim_matches_b 
-            WHERE time IS NOT NULL
-        """)
-        last_de_time = cursor.fetchone()['last_time']
-    
-        if last_de_time:
-            start_time_str = add_minutes_to_time(last_de_time, 45)
-        else:
-            start_time_str = "15:00"  # Fallback
-
-    current_time = start_time_str
 
-    print(f"\n⏰ ZEITBERECHNUNG SUPER FINALS")
-    print(f"   Startzeit: {current_time}")
-    print()
-
-    # Halbfinale 1 & 2 (parallel)
-    print(f"   Halbfinale 1 & 2: {current_time}")
-    cursor.execute("""
-        UPDATE super_finals_matches 
-        SET time = ?
-        WHERE match_id IN ('HF1', 'HF2')
-    """, (current_time,))
+# ============================================================================
+# FOLLOWER CUP ZEITBERECHNUNG
+# ============================================================================
 
-    # Pause nach Halbfinale
-    current_time = add_minutes_to_time(current_time, match_duration + 30)
+def calculate_follower_cup_times(conn, start_time_str=None):
+    """
+    Berechnet Spielzeiten für Follower Quali und Follower Cup — parallel zur
+    Double Elimination auf den gemeinsamen Feldern.
 
-    # Spiel um Platz 3
-    print(f"   Spiel um Platz 3: {current_time}")
-    cursor.execute("""
-        UPDATE super_finals_matches 
-        SET time = ?
-        WHERE match_id = 'THIRD'
-    """, (current_time,))
+    Returns:
+        str: Zeit nach letztem Spiel
+    """
+    spans = calculate_knockout_times(conn, start_time_str)
+    ends = [spans[t][1] for t in ('follower_quali_matches', 'follower_cup_matches') if t in spans]
+    return minutes_to_time(max(ends)) if ends else start_time_str
 
-    # Pause vor Finale
-    current_time = add_minutes_to_time(current_time, match_duration + 15)
 
-    # Finale
-    print(f"   FINALE: {current_time}")
-    cursor.execute("""
-        UPDATE super_finals_matches 
-        SET time = ?
-        WHERE match_id = 'FINAL'
-    """, (current_time,))
+# ============================================================================
+# HAUPTFUNKTION: ALLE ZEITEN BERECHNEN
+# ============================================================================
 
-    # Endzeit
-    end_time = add_minutes_to_time(current_time, match_duration)
+def calculate_all_match_times(conn):
+    """
+    Berechnet Spielzeiten für ALLE Turnierphasen: erst die Gruppenphase,
+    dann alle K.o.-Spiele gemeinsam.
 
-    conn.commit()
+    Returns:
+        dict: Zeitplan-Statistik {phase: {'start', 'end'}}
+    """
+    print("\n⏰ ZEITBERECHNUNG FÜR ALLE TURNIERPHASEN")
+    stats = {}
+    params = get_schedule_params(conn)
 
-    print(f"   → Turnier endet ca. um: {end_time}\n")
+    if conn.execute("SELECT COUNT(*) FROM matches").fetchone()[0] > 0:
+        calculate_round_robin_times(conn)
+        start = conn.execute("SELECT MIN(start_min) FROM matches").fetchone()[0]
+        end = _round_robin_end(conn)
+        if start is not None:
+            stats['round_robin'] = {'start': minutes_to_time(start), 'end': minutes_to_time(end)}
+
+    phases = {
+        'super_finals_matches': 'super_finals',
+        'follower_quali_matches': 'follower_quali',
+        'follower_cup_matches': 'follower_cup',
+        'placement_matches': 'placement',
+    }
+    for table, (start, end) in calculate_knockout_times(conn).items():
+        if table != 'double_elim_matches':
+            stats[phases[table]] = {'start': minutes_to_time(start), 'end': minutes_to_time(end)}
+            continue
+        # DE pro Bracket
+        for bracket_id, first, last in conn.execute("""
+            SELECT bracket_id, MIN(start_min), MAX(end_min) FROM double_elim_matches
+            WHERE start_min IS NOT NULL GROUP BY bracket_id ORDER BY bracket_id
+        """).fetchall():
+            stats[f'bracket_{bracket_id.lower()}'] = {'start': minutes_to_time(first),
+                                                      'end': minutes_to_time(last)}
 
-    return end_time
+    for phase, times in stats.items():
+        print(f"   {phase.upper()}: {times['start']} - {times['end']}")
+    return stats
 
 
 # ============================================================================
-# FOLLOWER CUP ZEITBERECHNUNG
+# LIVE-FELDZUTEILUNG K.O.-PHASEN
 # ============================================================================
-
-def calculate_follower_cup_times(conn, start_time_str=None):
+# Der Spielplan oben ist eine Schätzung vor Turnierbeginn. Während der K.o.-
+# Phasen kann ein Spiel starten, sobald beide Teams feststehen und ein Feld
+# frei ist. Nach jedem Ergebnis gibt der Dispatcher das Feld des beendeten
+# Spiels frei und verteilt alle spielbereiten Spiele über eine Prioritäts-
+# Warteschlange der Felder (frei ab, feld): Spiele mit freiem Feld werden
+# sofort aufgerufen, die übrigen erhalten Feld und geschätzte Startzeit.
+# Der Zustand liegt pro Turnier im Speicher und wird nach einem Neustart aus
+# den laufenden Spielen (Feld + Zeit gesetzt, noch kein Ergebnis) rekonstruiert.
+
+class CourtDispatch:
+    """Live-Zustand eines Turniers: Felder, aufgerufene Spiele, Ende pro Team"""
+    __slots__ = ('court_free', 'called', 'team_free')
+
+    def __init__(self, court_free):
+        self.court_free = court_free   # {feld: frei ab}
+        self.called = {}               # {(tabelle, id): (start, feld)} — läuft gerade
+        self.team_free = {}            # {team: ende des letzten Spiels}
+
+
+_court_dispatch = {}
+_court_dispatch_lock = threading.Lock()
+
+
+def current_minutes():
+    """Aktuelle Uhrzeit in Minuten ab Mitternacht"""
+    now = datetime.now()
+    return now.hour * 60 + now.minute
+
+
+def _ready_knockout_matches(conn):
+    """Spielbereite K.o.-Spiele: beide Teams bekannt, kein Freilos, noch kein Ergebnis"""
+    ready = []
+    for table_order, table in enumerate(KNOCKOUT_TABLES):
+        for r in conn.execute(f"""
+            SELECT id, match_number, team1, team2, court, time, start_min FROM {table}
+            WHERE team1 IS NOT NULL AND team2 IS NOT NULL AND team2 != 'BYE'
+              AND winner IS NULL
+        """):
+            ready.append((table, table_order, dict(r)))
+    return ready
+
+
+def _restore_court_dispatch(ready, params, now):
+    """Dispatcher-Zustand aus der DB: Spiele mit Feld, deren Zeit läuft, belegen ihr Feld"""
+    state = CourtDispatch({court: now for court in range(1, params.courts + 1)})
+    for table, _, row in ready:
+        if row['court'] and row['start_min'] is not None:
+            start = row['start_min']
+            if start <= now < start + params.duration:
+                state.called[(table, row['id'])] = (start, row['court'])
+                state.court_free[row['court']] = start + params.duration + params.court_gap
+    return state
+
+
+def dispatch_knockout_courts(conn, finished=None, now=None):
     """
-    Berechnet Spielzeiten für Follower Cup.
+    Gibt das Feld eines beendeten Spiels frei und verteilt alle spielbereiten
+    K.o.-Spiele auf die Felder. Geschrieben werden nur geänderte Zeiten/Felder.
 
-    Läuft parallel zu Double Elimination auf separaten Feldern.
+    Args:
+        finished: (tabelle, match_id) des gerade eingetragenen Ergebnisses
+        now: Uhrzeit in Minuten (Standard: aktuelle Uhrzeit)
+
+    Returns:
+        list: Warteschlange als dicts (table, id, match_number, team1, team2,
+              court, time, called), sortiert nach Startzeit
+    """
+    params = get_schedule_params(conn)
+    now = current_minutes() if now is None else now
+    ready = _ready_knockout_matches(conn)
+    key = getattr(conn, 'db_path', None)
+
+    with _court_dispatch_lock:
+        state = _court_dispatch.get(key)
+        if state is None or len(state.court_free) != params.courts:
+            state = _restore_court_dispatch(ready, params, now)
+            if key:
+                _court_dispatch[key] = state
+
+        if finished:
+            table, match_id = finished
+            row = conn.execute(f"SELECT team1, team2, court FROM {table} WHERE id = ?",
+                               (match_id,)).fetchone()
+            court = state.called.pop(finished, (None, row['court'] if row else None))[1]
+            # Korrektur eines alten Ergebnisses: Feld ist längst neu belegt
+            held = {c for _, c in state.called.values()}
+            if court in state.court_free and court not in held:
+                state.court_free[court] = now + params.court_gap
+            if row:
+                for team in (row['team1'], row['team2']):
+                    if team:
+                        state.team_free[team] = now
+
+        # Nicht mehr spielbereite Spiele (Korrektur im Bracket) geben ihr Feld frei
+        ready_keys = {(table, row['id']) for table, _, row in ready}
+        for stale in [k for k in state.called if k not in ready_keys]:
+            _, court = state.called.pop(stale)
+            state.court_free[court] = now
+
+        def teams_ready(row):
+            return max([now] + [state.team_free[t] + params.team_gap
+                                for t in (row['team1'], row['team2']) if t in state.team_free])
+
+        # Laufende Spiele belegen ihr Feld bis zum geschätzten Ende
+        courts = [(free, court) for court, free in state.court_free.items()]
+        heapq.heapify(courts)
+
+        assignment = dict(state.called)
+        waiting = sorted((item for item in ready if (item[0], item[2]['id']) not in state.called),
+                         key=lambda item: (teams_ready(item[2]), item[2]['start_min'] or 0, item[1],
+                                           item[2]['id']))
+        for table, _, row in waiting:
+            free, court = heapq.heappop(courts)
+            start = avoid_lunch(max(free, teams_ready(row)), params)
+            assignment[(table, row['id'])] = (start, court)
+            if start <= now:
+                state.called[(table, row['id'])] = (start, court)
+                state.court_free[court] = start + params.duration + params.court_gap
+            heapq.heappush(courts, (start + params.duration + params.court_gap, court))
+        called = set(state.called)
+
+    rows = {(table, row['id']): row for table, _, row in ready}
+    changed = {k: v for k, v in assignment.items()
+               if (rows[k]['start_min'], rows[k]['court']) != v}
+    if changed:
+        write_schedule(conn, changed, params.duration)
+
+    queue = [dict(rows[k], table=k[0], court=court, start_min=start, time=minutes_to_time(start),
+                  called=k in called)
+             for k, (start, court) in assignment.items()]
+    queue.sort(key=lambda m: (not m['called'], m['start_min'], m['court']))
+    return queue
+
+
+def _timed_matches(conn):
+    """Alle Spiele mit Zeit: {(tabelle, id): dict(start, court, teams, done)}"""
+    sources = [('matches', 'score1 IS NOT NULL')]
+    sources += [(table, 'winner IS NOT NULL') for table in KNOCKOUT_TABLES]
+    matches = {}
+    for table, done in sources:
+        for r in conn.execute(f"""
+            SELECT id, team1, team2, start_min, {COURT_COLUMNS.get(table, 'court')} AS court,
+                   {done} AS done
+            FROM {table} WHERE start_min IS NOT NULL
+        """):
+            teams = tuple(t for t in (r['team1'], r['team2']) if t and t != 'BYE')
+            matches[(table, r['id'])] = {'start': r['start_min'], 'court': r['court'],
+                                         'teams': teams, 'done': bool(r['done'])}
+    return matches
+
+
+def reschedule_delays(conn, starts=None, ends=None):
+    """
+    Verschiebt nur die Spiele, die von einer Verspätung abhängen: Folgespiele
+    auf demselben Feld, Folgespiele derselben Teams und Bracket-Nachfolger.
+    Feld und Reihenfolge bleiben, Spiele werden nur nach hinten geschoben;
+    gespielte Spiele bleiben unverändert.
 
     Args:
-        conn: SQLite Connection
-        start_time_str: Startzeit (optional, parallel zu Double Elim)
+        starts: {(tabelle, id): neuer Start in Minuten}
+        ends: {(tabelle, id): tatsächliches Ende in Minuten}
 
     Returns:
-        str: Zeit nach letztem Spiel
+        dict: changed (Anzahl geschriebener Spiele), projected_end ('HH:MM' oder None)
     """
-    cursor = conn.cursor()
-    config = get_tournament_config(conn)
+    params = get_schedule_params(conn)
+    matches = _timed_matches(conn)
+    starts = {k: v for k, v in (starts or {}).items() if k in matches and not matches[k]['done']}
+    ends = {k: v for k, v in (ends or {}).items() if k in matches}
+
+    successors = defaultdict(list)
+    by_court, by_team = defaultdict(list), defaultdict(list)
+    for key, m in matches.items():
+        if m['court']:
+            by_court[m['court']].append(key)
+        for team in m['teams']:
+            by_team[team].append(key)
+    for chains, gap in ((by_court, params.court_gap), (by_team, params.team_gap)):
+        for keys in chains.values():
+            keys.sort(key=lambda k: (matches[k]['start'], k))
+            for a, b in zip(keys, keys[1:]):
+                successors[a].append((b, gap))
+    # Nur zeitlich geplante Bracket-Spiele verketten (Superfinals z.B. haben keine Startzeit)
+    for job in _knockout_jobs(conn, 0, params.team_gap):
+        if job.key not in matches:
+            continue
+        for dep, gap in job.after:
+            if dep in matches:
+                successors[dep].append((job.key, gap))
+
+    start = {k: m['start'] for k, m in matches.items()}
+    start.update(starts)
+    heap = [(start[k], k) for k in set(starts) | set(ends)]
+    heapq.heapify(heap)
+    while heap:
+        begin, key = heapq.heappop(heap)
+        if begin != start[key]:
+            continue
+        end = ends.get(key, begin + params.duration)
+        for successor, gap in successors[key]:
+            candidate = avoid_lunch(end + gap, params)
+            if not matches[successor]['done'] and candidate > start[successor]:
+                start[successor] = candidate
+                heapq.heappush(heap, (candidate, successor))
+
+    changed = {k: (s, matches[k]['court']) for k, s in start.items() if s != matches[k]['start']}
+    if changed:
+        write_schedule(conn, changed, params.duration)
+
+    projected = max((ends.get(k, s + params.duration) for k, s in start.items()), default=None)
+    return {'changed': len(changed),
+            'projected_end': minutes_to_time(projected) if projected is not None else None}
+
+
+def reschedule_court_finished(conn, court, finished_at):
+    """
+    'Feld X war um HH:MM fertig': gemeint ist das erste dort begonnene Spiel
+    ohne Ergebnis, sonst das zuletzt begonnene.
+    """
+    finished = time_to_minutes(finished_at)
+    matches = _timed_matches(conn)
+    on_court = sorted((m['start'], k) for k, m in matches.items()
+                      if m['court'] == court and m['start'] <= finished)
+    if not on_court:
+        return reschedule_delays(conn)
+    running = [k for _, k in on_court if not matches[k]['done']]
+    return reschedule_delays(conn, ends={running[0] if running else on_court[-1][1]: finished})
 
-    match_duration = config['match_duration']
-    break_between_games = config['break_between_games']
 
-    # Startzeit bestimmen
-    if start_time_str is None:
-        # Parallel zu Double Elimination, aber auf anderen Feldern
-        cursor.execute("""
-            SELECT MIN(time) as first_time 
-            FROM double_elim_matches_a 
-            WHERE time IS NOT NULL
-        """)
-        de_start = cursor.fetchone()['first_time']
-    
-        if de_start:
-            start_time_str = de_start  # Gleiche Startzeit
-        else:
-            start_time_str = "13:00"  # Fallback
+def reschedule_round_delay(conn, round_num, minutes, table='matches'):
+    """
+    'Runde N hat M Minuten später begonnen': offene Spiele der Runde verschieben.
+    Gruppen- und DE-Runden sind Nummern, Follower Cup und Platzierung
+    Rundennamen ('quarter', 'semi', 'p5_semi', ...).
+    """
+    if table in ('matches', 'double_elim_matches'):
+        round_num = int(round_num)
+    elif table in SINGLE_ELIM_PHASES:
+        round_num = str(round_num)
+        if not conn.execute(f"SELECT 1 FROM {table} WHERE round = ? LIMIT 1", (round_num,)).fetchone():
+            raise ValueError(f"Unbekannte Runde: {round_num}")
+    else:
+        raise ValueError(f"Tabelle ohne Runden: {table}")
+    starts = {(table, r['id']): r['start_min'] + minutes
+              for r in conn.execute(f"""
+                  SELECT id, start_min FROM {table} WHERE round = ? AND start_min IS NOT NULL
+              """, (round_num,))}
+    return reschedule_delays(conn, starts=starts)
 
-    current_time = start_time_str
 
-    print(f"\n⏰ ZEITBERECHNUNG FOLLOWER CUP")
-    print(f"   Startzeit: {current_time}")
-    print()
+def get_next_up(conn, limit=None):
+    """
+    Nächste K.o.-Spiele für die Ansage: spielbereite Spiele nach Startzeit
+    und Feld, so wie sie der Dispatcher zuletzt verteilt hat.
+    """
+    queue = [dict(row, table=table) for table, _, row in _ready_knockout_matches(conn)]
+    queue.sort(key=lambda m: (m['start_min'] is None, m['start_min'] or 0, m['court'] or 0))
+    return queue[:limit] if limit else queue
 
-    # Qualifikationsspiele
-    cursor.execute("SELECT COUNT(*) as count FROM follower_quali_matches")
-    quali_count = cursor.fetchone()['count']
 
-    if quali_count > 0:
-        print(f"   Qualifikation: {quali_count} Matches ab {current_time}")
-    
-        cursor.execute("SELECT id FROM follower_quali_matches ORDER BY id")
-    
-        for i, match_row in enumerate(cursor.fetchall()):
-            # Alle 4 Spiele parallel (verschiedene Felder)
-            if i > 0 and i % 4 == 0:
-                current_time = add_minutes_to_time(
-                    current_time,
-                    match_duration + break_between_games
-                )
-        
-            cursor.execute("""
-                UPDATE follower_quali_matches 
-                SET time = ?
-                WHERE id = ?
-            """, (current_time, match_row['id']))
-    
-        # Pause nach Quali
-        current_time = add_minutes_to_time(current_time, 20)
-
-    # Cup-Runden
-    rounds = [
-        ('eighth', 8, "1/8-Finale"),
-        ('quarter', 4, "Viertelfinale"),
-        ('semi', 2, "Halbfinale"),
-        ('third', 1, "Spiel um Platz 3"),
-        ('final', 1, "Finale")
-    ]
+def get_court_status(conn, court, now=None):
+    """
+    Laufendes und nächstes Spiel auf einem Feld über alle Phasen — pro
+    Tabelle zwei Index-Abfragen auf (feld, start_min).
 
-    for round_name, num_matches, display_name in rounds:
-        cursor.execute("""
-            SELECT COUNT(*) as count 
-            FROM follower_cup_matches 
-            WHERE round = ?
-        """, (round_name,))
-    
-        count = cursor.fetchone()['count']
-    
-        if count > 0:
-            print(f"   {display_name}: {count} Matches um {current_time}")
-        
-            cursor.execute("""
-                SELECT id FROM follower_cup_matches 
-                WHERE round = ?
-                ORDER BY match_index
-            """, (round_name,))
-        
-            for match_row in cursor.fetchall():
-                cursor.execute("""
-                    UPDATE follower_cup_matches 
-                    SET time = ?
-                    WHERE id = ?
-                """, (current_time, match_row['id']))
-        
-            # Nächste Runde
-            if round_name in ['semi', 'third']:
-                # Längere Pause vor Finale
-                current_time = add_minutes_to_time(
-                    current_time,
-                    match_duration + 20
-                )
-            else:
-                current_time = add_minutes_to_time(
-                    current_time,
-                    match_duration + break_between_games
-                )
+    Returns:
+        dict: court, current, next (Spiele als dicts mit table, sonst None)
+    """
+    now = current_minutes() if now is None else now
+    current = upcoming = None
+    for table, _phase in MATCH_TABLES:
+        select = f"""
+            SELECT id, match_number, team1, team2, time, start_min, end_min FROM {table}
+            WHERE {COURT_COLUMNS.get(table, 'court')} = ?"""
+        row = conn.execute(f"{select} AND start_min <= ? ORDER BY start_min DESC LIMIT 1",
+                           (court, now)).fetchone()
+        if row and row['end_min'] > now and (current is None or row['start_min'] > current['start_min']):
+            current = dict(row, table=table)
+        row = conn.execute(f"{select} AND start_min > ? ORDER BY start_min LIMIT 1",
+                           (court, now)).fetchone()
+        if row and (upcoming is None or row['start_min'] < upcoming['start_min']):
+            upcoming = dict(row, table=table)
+    return {'court': court, 'current': current, 'next': upcoming}
 
-    conn.commit()
 
-    end_time = add_minutes_to_time(current_time, match_duration)
-    print(f"   → Follower Cup endet ca. um: {end_time}\n")
+# ============================================================================
+# RESET-FUNKTION
+# ============================================================================
+
+def reset_all_match_times(conn):
+    """
+    Setzt alle Spielzeiten zurück (NULL).
+    Nützlich für Neuberechnung mit geänderten Parametern.
+
+    Args:
+        conn: SQLite Connection
+    """
+    cursor = conn.cursor()
+
+    for table, _phase in MATCH_TABLES:
+        cursor.execute(f"UPDATE {table} SET time = NULL, start_min = NULL, end_min = NULL")
 
-    return end_time
+    conn.commit()
+    print("✅ Alle Spielzeiten zurückgesetzt")
 
 
 # ============================================================================
-# HAUPTFUNKTION: ALLE ZEITEN BERECHNEN
+# INTEGRATION IN BESTEHENDEN CODE
 # ============================================================================
 
-def calculate_all_match_times(conn):
+# [Integration-Kommentarblock entfernt]
+
+
+
+
+
+
+def load_head_to_head(conn, group_num=None):
+    """Direkte Vergleiche aus einer Query: {(team_a, team_b): punkte von team_a}
+
+    Sieg = 3, sonst 0 (wie bisher). Ohne group_num für alle Gruppen.
+    """
+    sql = """
+        SELECT team1, team2, score1, score2 FROM matches
+        WHERE score1 IS NOT NULL AND score2 IS NOT NULL
     """
-    Berechnet Spielzeiten für ALLE Turnierphasen.
+    params = ()
+    if group_num is not None:
+        sql += " AND group_number = ?"
+        params = (group_num,)
 
-    Diese Funktion sollte aufgerufen werden:
-    1. Nach Round Robin Generierung
-    2. Nach Double Elimination Generierung
-    3. Nach Super Finals Generierung
-    4. Nach Follower Cup Generierung
+    h2h = {}
+    for r in conn.execute(sql, params):
+        h2h[(r['team1'], r['team2'])] = 3 if r['score1'] > r['score2'] else 0
+        h2h[(r['team2'], r['team1'])] = 3 if r['score2'] > r['score1'] else 0
+    return h2h
 
-    ODER einmal am Ende, wenn alle Matches generiert wurden.
 
-    Args:
-        conn: SQLite Connection
+def order_with_head_to_head(teams, h2h, rank_key=None):
+    """Sortiert Teams: 1. goals_for DESC  2. goal_difference DESC  3. direkter Vergleich
 
-    Returns:
-        dict: Zeitplan-Statistik
+    Der direkte Vergleich wird als Sortierschlüssel vorberechnet: H2H-Punkte
+    gegen alle Teams mit gleichem Rang (Mini-Tabelle). Bei zwei Teams
+    entspricht das dem paarweisen Vergleich. rank_key ersetzt die Kriterien
+    1./2., z.B. durch den group_rank aus ranked_rankings.
     """
+    def base(t):
+        if rank_key is not None:
+            return (rank_key(t),)
+        return (-t['goals_for'], -t['goal_difference'])
+
+    tied = defaultdict(list)
+    for t in teams:
+        tied[base(t)].append(t['team'])
+
+    def key(t):
+        block = tied[base(t)]
+        h2h_points = sum(h2h.get((t['team'], other), 0) for other in block if other != t['team'])
+        return base(t) + (-h2h_points,)
+
+    return sorted(teams, key=key)
+
+
+def sort_all_groups_with_head_to_head(conn):
+    """Alle Gruppen sortiert (aus dem Ranking-Snapshot): {group_number: [rows]}"""
+    return get_ranking_snapshot(conn)['groups']
+
+
+def sort_group_with_head_to_head(conn, group_num):
+    """Sortiert eine Gruppe: 1. goals_for DESC  2. goal_difference DESC  3. direkter Vergleich"""
     cursor = conn.cursor()
+    cursor.execute("SELECT * FROM ranked_rankings WHERE group_number = ? ORDER BY group_rank, id",
+                   (group_num,))
+    teams = list(cursor.fetchall())
+    return order_with_head_to_head(teams, load_head_to_head(conn, group_num),
+                                   rank_key=lambda t: t['group_rank'])
 
-    print("\n" + "=" * 70)
-    print("⏰ ZEITBERECHNUNG FÜR ALLE TURNIERPHASEN")
-    print("=" * 70)
 
-    stats = {}
+# ── Ranking-Engine ───────────────────────────────────────────────────────────
+# Alle Gruppen-Reihenfolgen und die Phasenzuteilung (DE/FC/PLZ) werden einmal
+# pro Daten-Version berechnet und pro Turnier gecacht. Alle Routen lesen aus
+# diesem Snapshot; die Einträge dürfen nicht verändert werden.
 
-    # 1. Round Robin
-    cursor.execute("SELECT COUNT(*) as count FROM matches")
-    if cursor.fetchone()['count'] > 0:
-        calculate_round_robin_times(conn)
-    
-        cursor.execute("SELECT MIN(time) as start, MAX(time) as end FROM matches WHERE time IS NOT NULL")
-        times = cursor.fetchone()
-        stats['round_robin'] = {'start': times['start'], 'end': times['end']}
+_snapshot_cache = {}
+_snapshot_cache_lock = threading.Lock()
 
-    # 2. Bracket A
-    cursor.execute("SELECT COUNT(*) as count FROM double_elim_matches_a")
-    if cursor.fetchone()['count'] > 0:
-        end_time_a = calculate_double_elim_times(conn, 'double_elim_matches_a')
-    
-        cursor.execute("""
-            SELECT MIN(time) as start FROM double_elim_matches_a WHERE time IS NOT NULL
-        """)
-        start_a = cursor.fetchone()['start']
-        stats['bracket_a'] = {'start': start_a, 'end': end_time_a}
 
-    # 3. Bracket B (parallel zu A oder nacheinander)
-    cursor.execute("SELECT COUNT(*) as count FROM double_elim_matches_b")
-    if cursor.fetchone()['count'] > 0:
-        # Optional: Bracket B gleichzeitig mit A (verschiedene Felder)
-        # Oder: Bracket B nach A
-        end_time_b = calculate_double_elim_times(conn, 'double_elim_matches_b')
-    
-        cursor.execute("""
-            SELECT MIN(time) as start FROM double_elim_matches_b WHERE time IS NOT NULL
-        """)
-        start_b = cursor.fetchone()['start']
-        stats['bracket_b'] = {'start': start_b, 'end': end_time_b}
+def get_versioned_snapshot(conn, name, builder):
+    """Ergebnis von builder(conn), gecacht pro Turnier-Datei, Name und Daten-Version"""
+    db_path = getattr(conn, 'db_path', None)
+    if not db_path:
+        return builder(conn)
 
-    # 4. Super Finals
-    cursor.execute("SELECT COUNT(*) as count FROM super_finals_matches")
-    if cursor.fetchone()['count'] > 0:
-        end_time_sf = calculate_super_finals_times(conn)
-    
-        cursor.execute("""
-            SELECT MIN(time) as start FROM super_finals_matches WHERE time IS NOT NULL
-        """)
-        start_sf = cursor.fetchone()['start']
-        stats['super_finals'] = {'start': start_sf, 'end': end_time_sf}
+    version = get_data_version(conn)
+    key = (db_path, name)
+    with _snapshot_cache_lock:
+        cached = _snapshot_cache.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
 
-    # 5. Follower Cup (parallel zu Double Elim)
-    cursor.execute("""
-        SELECT COUNT(*) as count 
-        FROM (
-            SELECT id FROM follower_quali_matches
-            UNION ALL
-            SELECT id FROM follower_cup_matches
-        )
-    """)
-    if cursor.fetchone()['count'] > 0:
-        end_time_fc = calculate_follower_cup_times(conn)
-        stats['follower_cup'] = {'end': end_time_fc}
+    snapshot = builder(conn)
+    with _snapshot_cache_lock:
+        _snapshot_cache[key] = (version, snapshot)
+    return snapshot
 
-    # Zusammenfassung
-    print("\n" + "=" * 70)
-    print("📊 ZEITPLAN-ZUSAMMENFASSUNG")
-    print("=" * 70)
 
-    for phase, times in stats.items():
-        if 'start' in times and 'end' in times:
-            print(f"   {phase.upper()}: {times['start']} - {times['end']}")
-        elif 'end' in times:
-            print(f"   {phase.upper()}: endet um {times['end']}")
+def get_wildcard_override(conn):
+    """Team, das manuell auf Wildcard-Platz 2 gesetzt wurde, oder None"""
+    try:
+        row = conn.execute("SELECT wildcard2_team FROM wildcard_override LIMIT 1").fetchone()
+    except Exception:
+        return None
+    return row[0] if row and row[0] else None
 
-    print("=" * 70 + "\n")
 
-    return stats
+def _build_ranking_snapshot(conn):
+    """Berechnet Gruppen-Reihenfolge und Phasenzuteilung aus einer Rankings-Query"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM ranked_rankings ORDER BY group_number, group_rank, id")
+    by_group = defaultdict(list)
+    for row in cursor.fetchall():
+        by_group[row['group_number']].append(dict(row))
 
+    # Gleicher group_rank (goals_for + goal_difference) → direkter Vergleich
+    h2h = load_head_to_head(conn)
+    groups = {}
+    real_groups = {}
+    for g, teams in sorted(by_group.items()):
+        ordered = order_with_head_to_head(teams, h2h, rank_key=lambda t: t['group_rank'])
+        real = [t for t in ordered if not t['is_ghost']]
+        for position, t in enumerate(real, start=1):
+            t['position'] = position
+        groups[g] = ordered
+        real_groups[g] = real
 
-# ============================================================================
-# RESET-FUNKTION
-# ============================================================================
+    de_teams = set()
+    fourths = []
+    fives_sixes = []
+    for g, real in real_groups.items():
+        for t in real:
+            entry = {'team': t['team'], 'group': g,
+                     'goals_for': t['goals_for'],
+                     'goal_difference': t['goal_difference']}
+            if t['position'] <= 3:
+                de_teams.add(t['team'])
+            elif t['position'] == 4:
+                fourths.append(entry)
+            elif t['position'] <= 6:
+                fives_sixes.append(entry)
+
+    # Viertplatzierte nach goals_for/goal_difference, ohne Override (für Gleichstand-Anzeige)
+    fourths.sort(key=lambda x: (-x['goals_for'], -x['goal_difference']))
+    fourths_ranked = list(fourths)
 
-def reset_all_match_times(conn):
+    # Manueller Override bei Gleichstand (Wildcard 2)
+    override_team = get_wildcard_override(conn)
+    if override_team:
+        idx = next((i for i, f in enumerate(fourths) if f['team'] == override_team), None)
+        if idx is not None and idx != 1:
+            fourths[1], fourths[idx] = fourths[idx], fourths[1]
+
+    best2 = fourths[:2]
+    rest8 = fourths[2:]
+    for f in best2:
+        de_teams.add(f['team'])
+
+    # 5./6. Platzierte sortieren
+    fives_sixes.sort(key=lambda x: (-x['goals_for'], -x['goal_difference']))
+    fc_from_5_6 = set(t['team'] for t in fives_sixes[:8])
+    plz_teams   = set(t['team'] for t in fives_sixes[8:])
+
+    fc_teams = set(f['team'] for f in rest8) | fc_from_5_6
+
+    wildcard_teams = set(f['team'] for f in best2)
+    phase = {}
+    for real in real_groups.values():
+        for t in real:
+            if t['team'] in wildcard_teams:  phase[t['team']] = 'DE*'
+            elif t['team'] in de_teams:      phase[t['team']] = 'DE'
+            elif t['team'] in fc_teams:      phase[t['team']] = 'FC'
+            else:                            phase[t['team']] = 'PLZ'
+
+    return {
+        'groups': groups,              # {g: alle Teams inkl. Ghosts, sortiert}
+        'real_groups': real_groups,    # {g: ohne Ghosts, sortiert}
+        'stats': {t['team']: t for teams in groups.values() for t in teams},
+        'fourths': fourths_ranked,
+        'fives_sixes': fives_sixes,
+        'best2': best2,
+        'rest8': rest8,
+        'de_teams': de_teams,
+        'fc_teams': fc_teams,
+        'plz_teams': plz_teams,
+        'phase': phase,
+    }
+
+
+def get_ranking_snapshot(conn):
+    """Ranking-Snapshot der aktuellen Daten-Version (gecacht pro Turnier-Datei)"""
+    return get_versioned_snapshot(conn, 'rankings', _build_ranking_snapshot)
+
+
+def sort_teams_by_goals(snapshot, teams):
+    """Teams nach goals_for DESC, goal_difference DESC (Seeding für FC/PLZ)"""
+    stats = snapshot['stats']
+    known = [t for t in teams if t in stats]
+    return sorted(known, key=lambda t: (-stats[t]['goals_for'], -stats[t]['goal_difference']))
+
+
+def get_phase_assignment(conn):
     """
-    Setzt alle Spielzeiten zurück (NULL).
-    Nützlich für Neuberechnung mit geänderten Parametern.
+    Berechnet die Phasenzuteilung für alle Teams:
+    - DE: P1-3 jeder Gruppe (30) + 2 beste Viertplatzierte (goals_for) = 32
+    - FC: 8 restliche Viertplatzierte + Top 8 der 5./6. Platzierten = 16
+    - PLZ: letzte 12 der 5./6. Platzierten = 12
+    Returns: (de_teams, fc_teams, plz_teams, best2, rest8)
+    """
+    snap = get_ranking_snapshot(conn)
+    return snap['de_teams'], snap['fc_teams'], snap['plz_teams'], snap['best2'], snap['rest8']
+
+
+# ── Qualifikations-Szenarien ─────────────────────────────────────────────────
+# "Was braucht mein Team?": Solange Gruppenspiele offen sind, wird für jedes
+# Team bestimmt, welche Phase (DE/FC/PLZ) sicher, möglich oder ausgeschlossen
+# ist. Stufe 1 spielt pro Gruppe alle offenen Spiele über Punkte-Intervalle
+# durch — auf einer In-Memory-Kopie der Rankings, ohne DB-Zugriff — und sammelt
+# je Team und Tabellenplatz den besten und schlechtesten Sortierschlüssel.
+# Stufe 2 kombiniert die Gruppen per Branch-and-Bound für die gruppen-
+# übergreifenden Regeln (zwei beste Vierte, Top 8 der 5./6.); von jeder Gruppe
+# zählen dabei nur die Extremwerte.
+# Passen alle 43 Einzelwerte (0 … 42) ins Limit, ist das Ergebnis exakt. Sonst
+# werden die Intervalle gröber: 'possible' kann dann eine Phase enthalten, die
+# nicht mehr erreichbar ist, 'eliminated' und 'guaranteed' bleiben sicher.
+
+QUALIFICATION_PHASES = ('DE', 'FC', 'PLZ')
+SCENARIO_MAX_SCORE = 42
+SCENARIO_MAX_OUTCOMES = 5000   # durchgespielte Intervall-Kombinationen pro Gruppe
+
+
+def _scenario_score_cells(open_count):
+    """
+    Feinste Einteilung von 0 … SCENARIO_MAX_SCORE in Intervalle (von, bis), bei
+    der die offenen Spiele einer Gruppe höchstens SCENARIO_MAX_OUTCOMES
+    Kombinationen ergeben — im gröbsten Fall ein einziges Intervall
+    """
+    values = SCENARIO_MAX_SCORE + 1
+    count = values
+    while count > 1 and count ** (2 * open_count) > SCENARIO_MAX_OUTCOMES:
+        count -= 1
+    edges = [round(i * values / count) for i in range(count + 1)]
+    return [(lo, hi - 1) for lo, hi in zip(edges, edges[1:])]
+
+
+def _group_scenario_states(teams, open_matches, h2h, cells):
+    """
+    Mögliche Tabellenplätze der echten Teams einer Gruppe.
+
+    Jedes offene Spiel wird über alle Paare von Intervallen aus `cells`
+    durchgespielt. Sind alle Intervalle Einzelwerte, entsteht je Kombination
+    eine exakte Tabelle (inkl. direktem Vergleich). Sonst liegen goals_for und
+    goal_difference jedes Teams in Intervallen; ein Team steht nur dann sicher
+    vor einem anderen, wenn die Intervalle das erzwingen.
 
     Args:
-        conn: SQLite Connection
+        teams: Rankings-Zeilen (dicts) in id-Reihenfolge, inkl. Ghosts
+        open_matches: [(team1, team2)]
+        h2h: direkte Vergleiche der gespielten Spiele (wird nicht verändert)
+        cells: Punkte-Intervalle (von, bis) je Team und Spiel
+
+    Returns:
+        dict: {(team, platz): [bester, schlechtester Schlüssel (-goals_for, -goal_difference)]}
     """
-    cursor = conn.cursor()
+    names = [t['team'] for t in teams]
+    ghost = [t['is_ghost'] for t in teams]
+    real = [i for i in range(len(names)) if not ghost[i]]
+    gf_lo = [t['goals_for'] for t in teams]
+    gd_lo = [t['goal_difference'] for t in teams]
+    gf_hi, gd_hi = list(gf_lo), list(gd_lo)
+    index = {name: i for i, name in enumerate(names)}
+    matches = [(index[a], index[b]) for a, b in open_matches if a in index and b in index]
+    outcomes = [(c1, c2) for c1 in cells for c2 in cells]
+    exact = all(lo == hi for lo, hi in cells)
+    h2h = dict(h2h)
+    states = {}
+
+    def rank_key(t):
+        return (t['is_ghost'], -t['goals_for'], -t['goal_difference'])
+
+    def record(i, position, best, worst):
+        keys = states.setdefault((names[i], position), [best, worst])
+        keys[0] = min(keys[0], best)
+        keys[1] = max(keys[1], worst)
+
+    def finish_exact():
+        keys = [(ghost[i], -gf_lo[i], -gd_lo[i]) for i in range(len(names))]
+        order = sorted(range(len(names)), key=keys.__getitem__)
+        # Direkter Vergleich nur bei Gleichstand — wie im Ranking-Snapshot
+        if any(keys[a] == keys[b] for a, b in zip(order, order[1:])):
+            rows = [{'team': names[i], 'is_ghost': ghost[i], 'goals_for': gf_lo[i],
+                     'goal_difference': gd_lo[i], 'index': i} for i in range(len(names))]
+            order = [r['index'] for r in order_with_head_to_head(rows, h2h, rank_key=rank_key)]
+        for position, i in enumerate((i for i in order if not ghost[i]), start=1):
+            key = (-gf_lo[i], -gd_lo[i])
+            record(i, position, key, key)
+
+    # Intervall-Modus: u steht sicher vor t ⇔ (gf, gd)-Untergrenze von u liegt
+    # lexikografisch über der Obergrenze von t. Zählen per Bisektion, gleiche
+    # Ausgänge (Team, Platzbereich, Grenzen) nur einmal merken
+    reached = set()
+
+    def finish_intervals():
+        lo = [(gf_lo[i], gd_lo[i]) for i in real]
+        hi = [(gf_hi[i], gd_hi[i]) for i in real]
+        lo_sorted, hi_sorted = sorted(lo), sorted(hi)
+        n = len(real)
+        for j, i in enumerate(real):
+            surely = n - bisect.bisect_right(lo_sorted, hi[j])
+            reach = n - bisect.bisect_left(hi_sorted, lo[j])   # inkl. t selbst
+            reached.add((i, surely, reach, hi[j], lo[j]))
+
+    finish = finish_exact if exact else finish_intervals
+    never = (float('-inf'), float('-inf'))   # Grenzen eines Ghosts: zählt für niemanden
+
+    def moved(i, own, other):
+        """(Unter-, Obergrenze) von i nach einem Spiel mit eigenen/gegnerischen Punkten"""
+        if ghost[i]:
+            return never, never
+        return ((gf_lo[i] + own[0], gd_lo[i] + own[0] - other[1]),
+                (gf_hi[i] + own[1], gd_hi[i] + own[1] - other[0]))
+
+    def finish_last_match(a, b):
+        """
+        Alle Ausgänge des letzten offenen Spiels auf einmal: die übrigen Teams
+        stehen fest und werden nur einmal gegeneinander gezählt
+        """
+        fixed = [i for i in real if i != a and i != b]
+        lo = [(gf_lo[i], gd_lo[i]) for i in fixed]
+        hi = [(gf_hi[i], gd_hi[i]) for i in fixed]
+        lo_sorted, hi_sorted = sorted(lo), sorted(hi)
+        n = len(fixed)
+        moves = [moved(a, c1, c2) + moved(b, c2, c1) for c1, c2 in outcomes]
+        for j, i in enumerate(fixed):
+            surely = n - bisect.bisect_right(lo_sorted, hi[j])
+            reach = n - bisect.bisect_left(hi_sorted, lo[j])
+            shifts = {((lo_a > hi[j]) + (lo_b > hi[j]), (hi_a >= lo[j]) + (hi_b >= lo[j]))
+                      for lo_a, hi_a, lo_b, hi_b in moves}
+            reached.update((i, surely + x, reach + y, hi[j], lo[j]) for x, y in shifts)
+        for i, own, other in ((a, 0, 2), (b, 2, 0)):
+            if ghost[i]:
+                continue
+            reached.update((i, n - bisect.bisect_right(lo_sorted, m[own + 1]) + (m[other] > m[own + 1]),
+                            n + 1 - bisect.bisect_left(hi_sorted, m[own]) + (m[other + 1] >= m[own]),
+                            m[own + 1], m[own]) for m in moves)
+
+    def play(k):
+        if k == len(matches):
+            finish()
+            return
+        a, b = matches[k]
+        if not exact and k == len(matches) - 1:
+            finish_last_match(a, b)
+            return
+        for (l1, h1), (l2, h2) in outcomes:
+            gf_lo[a] += l1; gf_hi[a] += h1; gf_lo[b] += l2; gf_hi[b] += h2
+            gd_lo[a] += l1 - h2; gd_hi[a] += h1 - l2
+            gd_lo[b] += l2 - h1; gd_hi[b] += h2 - l1
+            if exact:
+                h2h[(names[a], names[b])] = 3 if l1 > l2 else 0
+                h2h[(names[b], names[a])] = 3 if l2 > l1 else 0
+            play(k + 1)
+            gf_lo[a] -= l1; gf_hi[a] -= h1; gf_lo[b] -= l2; gf_hi[b] -= h2
+            gd_lo[a] -= l1 - h2; gd_hi[a] -= h1 - l2
+            gd_lo[b] -= l2 - h1; gd_hi[b] -= h2 - l1
+
+    play(0)
+    for i, surely, reach, (gf_top, gd_top), (gf_bottom, gd_bottom) in reached:
+        for position in range(surely + 1, reach + 1):
+            record(i, position, (-gf_top, -gd_top), (-gf_bottom, -gd_bottom))
+    return states
+
+
+def _summarize_group_scenarios(group, states, override_team):
+    """
+    Extremwerte einer Gruppe für Stufe 2: pro Tabellenplatz 4/5/6 der beste
+    und schlechteste Sortierschlüssel (-gf, -gd, gruppe, platz) über alle
+    Teams, die dort landen können. Der Override-Kandidat als Vierter zählt separat.
+    """
+    extremes = {4: [], 5: [], 6: []}
+    override_fourth = False
+    for (team, position), keys in states.items():
+        if position not in extremes:
+            continue
+        if position == 4 and team == override_team:
+            override_fourth = True
+        else:
+            extremes[position].extend(key + (group, position) for key in keys)
+    summary = {p: (min(keys), max(keys)) if keys else None for p, keys in extremes.items()}
+    summary['override_fourth'] = override_fourth
+    return summary
+
+
+def _fourth_place_options(summary, key):
+    """Mögliche Beiträge (vierter_davor, override_ist_vierter) einer anderen Gruppe"""
+    options = set()
+    if summary[4] is not None:
+        best, worst = summary[4]
+        if best < key:
+            options.add((1, 0))
+        if worst > key:
+            options.add((0, 0))
+    if summary['override_fourth']:
+        options.add((0, 1))
+    return options or {(0, 0)}
+
+
+def _fifth_sixth_options(summary, key):
+    """Minimale und maximale Anzahl 5./6. einer anderen Gruppe vor `key`"""
+    fifth, sixth = summary[5], summary[6]
+    if fifth is None:
+        return {(0,)}
+    most = 2 if sixth is not None and sixth[0] < key else (1 if fifth[0] < key else 0)
+    if fifth[1] > key:
+        # dieser Fünfte steht hinter key — sein Sechster erst recht
+        fewest = 0
+    elif sixth is None or sixth[1] > key:
+        fewest = 1
+    else:
+        fewest = 2
+    return {(fewest,), (most,)}
 
-    cursor.execute("UPDATE matches SET time = NULL")
-    cursor.execute("UPDATE double_elim_matches_a SET time = NULL")
-    cursor.execute("UPDATE double_elim_matches_b SET time = NULL")
-    cursor.execute("UPDATE super_finals_matches SET time = NULL")
-    cursor.execute("UPDATE follower_quali_matches SET time = NULL")
-    cursor.execute("UPDATE follower_cup_matches SET time = NULL")
-    cursor.execute("UPDATE placement_matches SET time = NULL")
 
-    conn.commit()
-    print("✅ Alle Spielzeiten zurückgesetzt")
+def _exists_combination(options, predicate, increasing, width):
+    """
+    Branch-and-Bound: gibt es je Gruppe eine Option (Vektor) so, dass die Summe
+    predicate erfüllt? predicate muss in jeder Komponente monoton sein
+    (increasing=True: steigend, sonst fallend).
+    """
+    zero = (0,) * width
+    lowest, highest = [zero], [zero]   # Summe der Minima/Maxima ab Gruppe i (rückwärts)
+    for group_options in reversed(options):
+        lowest.append(tuple(a + min(o[c] for o in group_options)
+                            for c, a in enumerate(lowest[-1])))
+        highest.append(tuple(a + max(o[c] for o in group_options)
+                             for c, a in enumerate(highest[-1])))
+    lowest.reverse()
+    highest.reverse()
+
+    def add(a, b):
+        return tuple(x + y for x, y in zip(a, b))
+
+    def search(i, acc):
+        optimistic = add(acc, highest[i] if increasing else lowest[i])
+        if not predicate(*optimistic):
+            return False
+        pessimistic = add(acc, lowest[i] if increasing else highest[i])
+        if predicate(*pessimistic):
+            return True
+        return any(search(i + 1, add(acc, o))
+                   for o in sorted(options[i], reverse=increasing))
+
+    return search(0, zero)
+
+
+def _de_via_fourth(above, override_fourth):
+    """Vierter kommt ins DE: kein anderer Vierter davor, oder einer und kein Override-Tausch"""
+    return above == 0 or (above == 1 and override_fourth == 0)
+
+
+def _possible_phases(team, group, group_states, summaries, override_team):
+    """Alle Phasen, die `team` über die möglichen Plätze in seiner Gruppe erreichen kann"""
+    states = {(position, key + (group, position))
+              for (name, position), keys in group_states.items() if name == team
+              for key in keys}
+
+    others = [s for g, s in summaries.items() if g != group]
+    possible = set()
+    for position, key in states:
+        if position <= 3:
+            possible.add('DE')
+        elif position > 6:
+            possible.add('PLZ')
+        elif position == 4:
+            if team == override_team:
+                possible.add('DE')
+                continue
+            options = [_fourth_place_options(s, key) for s in others]
+            if 'DE' not in possible and _exists_combination(options, _de_via_fourth, False, 2):
+                possible.add('DE')
+            if 'FC' not in possible and _exists_combination(
+                    options, lambda a, o: not _de_via_fourth(a, o), True, 2):
+                possible.add('FC')
+        else:
+            ahead = 1 if position == 6 else 0   # eigener Fünfter steht vor dem Sechsten
+            options = [_fifth_sixth_options(s, key) for s in others]
+            if 'FC' not in possible and _exists_combination(
+                    options, lambda k: ahead + k <= 7, False, 1):
+                possible.add('FC')
+            if 'PLZ' not in possible and _exists_combination(
+                    options, lambda k: ahead + k >= 8, True, 1):
+                possible.add('PLZ')
+        if len(possible) == len(QUALIFICATION_PHASES):
+            break
+    return possible
+
+
+def solve_qualification_scenarios(conn):
+    """
+    Status jedes echten Teams pro Phase: 'guaranteed', 'possible' oder 'eliminated'.
+    Offene Spiele werden über die feinste Punkte-Einteilung aus
+    _scenario_score_cells durchgespielt; exact sagt, ob dabei jede Gruppe alle
+    Einzelwerte 0 … 42 bekam. 'eliminated'/'guaranteed' gelten immer sicher.
+
+    Returns:
+        {'open_matches': n, 'exact': bool,
+         'teams': {team: {'group': g, 'DE': ..., 'FC': ..., 'PLZ': ...}}}
+    """
+    by_group = defaultdict(list)
+    for r in conn.execute("""
+        SELECT r.team, r.group_number, r.goals_for, r.goal_difference,
+               COALESCE(t.is_ghost, 0) AS is_ghost
+        FROM rankings r
+        LEFT JOIN teams t ON r.team = t.name
+        ORDER BY r.id
+    """):
+        by_group[r['group_number']].append(dict(r))
+
+    open_matches = defaultdict(list)
+    for m in conn.execute("""
+        SELECT team1, team2, group_number FROM matches
+        WHERE score1 IS NULL OR score2 IS NULL
+    """):
+        open_matches[m['group_number']].append((m['team1'], m['team2']))
+
+    h2h = load_head_to_head(conn)
+    override_team = get_wildcard_override(conn)
+
+    states = {}
+    exact = True
+    for g, teams in sorted(by_group.items()):
+        pending = open_matches.get(g, [])
+        cells = _scenario_score_cells(len(pending))
+        exact = exact and (not pending or len(cells) == SCENARIO_MAX_SCORE + 1)
+        states[g] = _group_scenario_states(teams, pending, h2h, cells)
+
+    summaries = {g: _summarize_group_scenarios(g, st, override_team) for g, st in states.items()}
+    result = {}
+    for g, teams in sorted(by_group.items()):
+        for t in teams:
+            if t['is_ghost']:
+                continue
+            possible = _possible_phases(t['team'], g, states[g], summaries, override_team)
+            status = {'group': g}
+            for phase in QUALIFICATION_PHASES:
+                if phase not in possible:
+                    status[phase] = 'eliminated'
+                elif len(possible) == 1:
+                    status[phase] = 'guaranteed'
+                else:
+                    status[phase] = 'possible'
+            result[t['team']] = status
 
+    return {'open_matches': sum(len(m) for m in open_matches.values()), 'exact': exact,
+            'teams': result}
 
-# ============================================================================
-# INTEGRATION IN BESTEHENDEN CODE
-# ============================================================================
 
-# [Integration-Kommentarblock entfernt]
+def get_qualification_scenarios(conn):
+    """Qualifikations-Szenarien der aktuellen Daten-Version (gecacht pro Turnier-Datei)"""
+    return get_versioned_snapshot(conn, 'qualification_scenarios', solve_qualification_scenarios)
 
 
+# ── Bracket-Status-Engine ────────────────────────────────────────────────────
+# Stand jedes Teams in den Double-Elimination-Brackets, berechnet in einem
+# Durchgang über alle DE-Spiele und gecacht pro Daten-Version.
 
+class BracketTeamStatus(namedtuple('BracketTeamStatus',
+                                   ['team', 'bracket_id', 'side', 'round', 'eliminated'])):
+    """Stand eines Teams: side 'WB'/'LB', round = weiteste entschiedene Runde"""
+    __slots__ = ()
 
+    @property
+    def status(self):
+        return "Ausgeschieden" if self.eliminated else f"{self.side} R{self.round}"
 
 
-def sort_group_with_head_to_head(conn, group_num):
-    """Sortiert eine Gruppe: 1. goals_for DESC  2. goal_difference DESC  3. direkter Vergleich"""
-    import functools
+def _build_bracket_status(conn):
+    """{bracket_id: [BracketTeamStatus, ...]} sortiert: aktive Teams nach Runde, dann Ausgeschiedene"""
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT r.*, t.is_ghost
-        FROM rankings r
-        LEFT JOIN teams t ON r.team = t.name
-        WHERE r.group_number = ?
-    """, (group_num,))
-    teams = list(cursor.fetchall())
+        SELECT bracket_id, bracket, round, team1, team2, winner, loser
+        FROM double_elim_matches
+    """)
 
-    def h2h(team_a, team_b):
-        cursor.execute("""
-            SELECT score1, score2, team1 FROM matches
-            WHERE group_number = ?
-            AND ((team1 = ? AND team2 = ?) OR (team1 = ? AND team2 = ?))
-            AND score1 IS NOT NULL
-        """, (group_num, team_a, team_b, team_b, team_a))
-        r = cursor.fetchone()
-        if not r: return 0
-        if r['team1'] == team_a:
-            return 3 if r['score1'] > r['score2'] else 0
-        else:
-            return 3 if r['score2'] > r['score1'] else 0
+    # team → (side, round) des weitesten entschiedenen Matches
+    furthest = {bracket_id: {} for bracket_id in DE_BRACKETS}
+    eliminated = defaultdict(set)
+    for m in cursor.fetchall():
+        bracket_id = m['bracket_id']
+        furthest.setdefault(bracket_id, {})
+        side = 'WB' if m['bracket'] == 'Winners' else 'LB'
+        for team in (m['team1'], m['team2']):
+            if not team:
+                continue
+            best = furthest[bracket_id].setdefault(team, None)
+            if m['winner'] is None:
+                continue
+            # Bei gleicher Runde zählt das LB (Team ist aus dem WB gefallen)
+            if best is None or (m['round'], side == 'LB') > (best[1], best[0] == 'LB'):
+                furthest[bracket_id][team] = (side, m['round'])
+        if side == 'LB' and m['loser']:
+            eliminated[bracket_id].add(m['loser'])
+
+    result = {}
+    for bracket_id, teams in furthest.items():
+        statuses = [BracketTeamStatus(team, bracket_id, *(best or ('WB', 1)),
+                                      eliminated=team in eliminated[bracket_id])
+                    for team, best in teams.items()]
+        statuses.sort(key=lambda t: (1, 0) if t.eliminated else (0, -t.round))
+        result[bracket_id] = statuses
+    return result
 
-    def compare(t1, t2):
-        if t1['goals_for'] != t2['goals_for']:
-            return -1 if t1['goals_for'] > t2['goals_for'] else 1
-        if t1['goal_difference'] != t2['goal_difference']:
-            return -1 if t1['goal_difference'] > t2['goal_difference'] else 1
-        a = h2h(t1['team'], t2['team'])
-        b = h2h(t2['team'], t1['team'])
-        if a != b:
-            return -1 if a > b else 1
-        return 0
 
-    return sorted(teams, key=functools.cmp_to_key(compare))
+def get_bracket_status(conn):
+    """Bracket-Status der aktuellen Daten-Version: {'A': [...], 'B': [...]}"""
+    return get_versioned_snapshot(conn, 'bracket_status', _build_bracket_status)
 
 
-def get_phase_assignment(conn):
+# ── Monte-Carlo-Simulation ───────────────────────────────────────────────────
+# Siegwahrscheinlichkeiten für alle noch aktiven Teams in DE-Brackets, Super
+# Finals und Follower Cup. Die Bracket-Struktur kommt aus den Abhängigkeits-
+# graphen (gleiche Weiterleitung wie beim Schreiben), die Spielstärke aus dem
+# Gruppen-Ranking. Alle Simulationen laufen gleichzeitig: pro Spiel eine
+# numpy-Operation über alle Durchläufe. Ergebnis gecacht pro Daten-Version.
+
+SIMULATION_RUNS = 100_000
+SIMULATION_WORKERS = 1            # > 1 → Durchläufe auf einen Prozess-Pool verteilen
+SIMULATION_RATING_SCALE = 6.0     # Punktdifferenz pro Spiel ≙ Faktor e in den Siegchancen
+SIMULATION_PRIOR_MATCHES = 2      # Schrumpfung: wenige Spiele → Stärke näher bei 0
+
+SIM_BYE = 0                       # Team-Index 0 = Freilos (verliert immer)
+
+
+class BracketProgram(namedtuple('BracketProgram', ['teams', 'ratings', 'ops', 'targets'])):
     """
-    Berechnet die Phasenzuteilung für alle Teams:
-    - DE: P1-3 jeder Gruppe (30) + 2 beste Viertplatzierte (goals_for) = 32
-    - FC: 8 restliche Viertplatzierte + Top 8 der 5./6. Platzierten = 16
-    - PLZ: letzte 12 der 5./6. Platzierten = 12
-    Returns: (de_teams, fc_teams, plz_teams, best2, rest8)
+    Simulierbares Turnier:
+    teams: Namen (Index 0 = Freilos), ratings: Stärke je Team,
+    ops: Spiele in Spielreihenfolge — ('fixed', sieger, verlierer) oder
+         ('play', quelle1, quelle2) mit quelle ('team', index) / ('match', pos, outcome),
+    targets: {name: ((pos, outcome), ...)} — gezählte Ausgänge
     """
-    import functools
-    cursor = conn.cursor()
+    __slots__ = ()
 
-    def sort_grp(g):
-        cursor.execute("""
-            SELECT r.*, t.is_ghost FROM rankings r
-            LEFT JOIN teams t ON r.team = t.name
-            WHERE r.group_number = ?
-        """, (g,))
-        teams = list(cursor.fetchall())
-        def cmp(t1, t2):
-            if t1['goals_for'] != t2['goals_for']:
-                return -1 if t1['goals_for'] > t2['goals_for'] else 1
-            if t1['goal_difference'] != t2['goal_difference']:
-                return -1 if t1['goal_difference'] > t2['goal_difference'] else 1
-            return 0
-        return sorted(teams, key=functools.cmp_to_key(cmp))
 
-    de_teams = set()
-    fourths = []
-    fives_sixes = []
+def team_ratings(snapshot, teams):
+    """Stärke je Team: Punktdifferenz pro Gruppenspiel, geschrumpft Richtung 0"""
+    ratings = []
+    for team in teams:
+        stats = snapshot['stats'].get(team)
+        if not stats:
+            ratings.append(0.0)
+            continue
+        ratings.append(stats['goal_difference'] /
+                       (stats['matches_played'] + SIMULATION_PRIOR_MATCHES))
+    return ratings
 
-    for g in range(1, 11):
-        sg = sort_grp(g)
-        real = [t for t in sg if not t['is_ghost']]
-        for t in real[:3]:
-            de_teams.add(t['team'])
-        if len(real) >= 4:
-            f = real[3]
-            fourths.append({'team': f['team'], 'group': g,
-                            'goals_for': f['goals_for'],
-                            'goal_difference': f['goal_difference']})
-        for t in real[4:6]:
-            fives_sixes.append({'team': t['team'],
-                                'goals_for': t['goals_for'],
-                                'goal_difference': t['goal_difference']})
-
-    # 2 beste Viertplatzierte → DE
-    fourths.sort(key=lambda x: (-x['goals_for'], -x['goal_difference']))
 
-    # Manueller Override bei Gleichstand (Wildcard 2)
-    try:
-        override_row = conn.execute("SELECT wildcard2_team FROM wildcard_override LIMIT 1").fetchone()
-    except Exception:
-        override_row = None
+def _bracket_sources(graph):
+    """Umkehrung der Kanten: {ziel: {slot: (quelle, outcome)}}"""
+    sources = defaultdict(dict)
+    for node, edges in graph.edges.items():
+        for outcome, target, slot in edges:
+            sources[target][slot] = (node, outcome)
+    return sources
 
-    if override_row and override_row[0]:
-        override_team = override_row[0]
-        idx = next((i for i, f in enumerate(fourths) if f['team'] == override_team), None)
-        if idx is not None and idx != 1:
-            fourths[1], fourths[idx] = fourths[idx], fourths[1]
 
-    best2 = fourths[:2]
-    rest8 = fourths[2:]
-    for f in best2:
-        de_teams.add(f['team'])
+def build_bracket_program(conn):
+    """
+    Übersetzt den aktuellen Stand aller K.o.-Phasen in ein BracketProgram.
+    Entschiedene Spiele sind fest, besetzte Slots werden übernommen, offene
+    Slots kommen aus der Weiterleitung. Super Finals werden auch simuliert,
+    bevor sie angelegt sind.
+    """
+    teams, index = [None], {}
+    rows, sources, order = {}, {}, []
+
+    def team_index(name):
+        if name not in index:
+            index[name] = len(teams)
+            teams.append(name)
+        return index[name]
+
+    def add_phase(phase, table, graph, nodes=()):
+        table_rows = {graph.key(r): dict(r)
+                      for r in conn.execute(f"SELECT * FROM {table} ORDER BY id")}
+        for node in list(table_rows) + [n for n in nodes if n not in table_rows]:
+            rows[(phase, node)] = table_rows.get(node, {})
+            order.append((phase, node))
+        for target, slots in _bracket_sources(graph).items():
+            for slot, (node, outcome) in slots.items():
+                sources.setdefault((phase, target), {})[slot] = ((phase, node), outcome)
+        return table_rows
+
+    targets = {}
+    finalists = {}
+    if add_phase('DE', 'double_elim_matches', get_knockout_graph(conn, 'double_elim_matches')):
+        for bracket_id, layout in get_bracket_layouts(conn).items():
+            finalists[(bracket_id, 1)] = (('DE', (bracket_id, 'Winners', layout.wb_rounds, 0)), 'winner')
+            finalists[(bracket_id, 2)] = (('DE', (bracket_id, 'Losers', layout.lb_rounds, 0)), 'winner')
+
+    if all(qualifier in finalists for qualifier in SUPER_FINALS_QUALIFICATION):
+        add_phase('SF', 'super_finals_matches', SUPER_FINALS_GRAPH,
+                  nodes=[('HF1',), ('HF2',), ('FINAL',), ('THIRD',)])
+        for qualifier, (match_id, slot) in SUPER_FINALS_QUALIFICATION.items():
+            sources.setdefault(('SF', (match_id,)), {})[slot] = finalists[qualifier]
+        targets['super_finals'] = tuple(finalists[q] for q in SUPER_FINALS_QUALIFICATION)
+        targets['title'] = ((('SF', ('FINAL',)), 'winner'),)
+        targets['podium'] = ((('SF', ('FINAL',)), 'winner'), (('SF', ('FINAL',)), 'loser'),
+                             (('SF', ('THIRD',)), 'winner'))
+
+    if add_phase('FC', 'follower_cup_matches', get_knockout_graph(conn, 'follower_cup_matches')):
+        targets['follower_cup'] = ((('FC', ('final', 0)), 'winner'),)
+
+    # Spielreihenfolge: Quellen immer vor ihren Zielen
+    position, ops = {}, []
+
+    def visit(node):
+        if node in position or node not in rows:
+            return
+        for source, _ in sources.get(node, {}).values():
+            visit(source)
+        row = rows[node]
+        if row.get('winner'):
+            loser = _match_outcome(row, 'loser')
+            op = ('fixed', team_index(row['winner']), team_index(loser) if loser else SIM_BYE)
+        else:
+            inputs = []
+            for slot in ('team1', 'team2'):
+                source = sources.get(node, {}).get(slot)
+                if row.get(slot):
+                    inputs.append(('team', team_index(row[slot])))
+                elif source and source[0] in position:
+                    inputs.append(('match', position[source[0]], source[1]))
+                else:
+                    inputs.append(('team', SIM_BYE))
+            op = ('play',) + tuple(inputs)
+        position[node] = len(ops)
+        ops.append(op)
+
+    for node in order:
+        visit(node)
+
+    targets = {name: tuple((position[node], outcome) for node, outcome in outcomes
+                           if node in position)
+               for name, outcomes in targets.items()}
+    ratings = [0.0] + team_ratings(get_ranking_snapshot(conn), teams[1:])
+    return BracketProgram(tuple(teams), tuple(ratings), tuple(ops), targets)
+
+
+def win_probability_matrix(ratings):
+    """P[i, j] = Chance, dass Team i gegen Team j gewinnt (logistisch, Freilos verliert)"""
+    import numpy as np
+    r = np.asarray(ratings, dtype=np.float64)
+    p = 1.0 / (1.0 + np.exp((r[None, :] - r[:, None]) / SIMULATION_RATING_SCALE))
+    p[SIM_BYE, :] = 0.0
+    p[:, SIM_BYE] = 1.0
+    p[SIM_BYE, SIM_BYE] = 0.5
+    return p.astype(np.float32)
+
+
+def simulate_bracket_program(program, runs, seed=None):
+    """
+    Spielt das Programm `runs`-mal durch.
+    Returns: {target: int-Array Anzahl pro Team-Index}
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    prob = win_probability_matrix(program.ratings)
+    team_count = len(program.teams)
+
+    results = []   # pro Spiel: (sieger, verlierer) — Skalar oder Array über alle Läufe
+
+    def resolve(source):
+        if source[0] == 'team':
+            return source[1]
+        winner, loser = results[source[1]]
+        return winner if source[2] == 'winner' else loser
+
+    for op in program.ops:
+        if op[0] == 'fixed':
+            results.append((op[1], op[2]))
+            continue
+        team1, team2 = resolve(op[1]), resolve(op[2])
+        team1_wins = rng.random(runs, dtype=np.float32) < prob[team1, team2]
+        results.append((np.where(team1_wins, team1, team2),
+                        np.where(team1_wins, team2, team1)))
+
+    counts = {}
+    for name, outcomes in program.targets.items():
+        total = np.zeros(team_count, dtype=np.int64)
+        for pos, outcome in outcomes:
+            team = results[pos][0 if outcome == 'winner' else 1]
+            total += np.bincount(np.broadcast_to(team, runs), minlength=team_count)
+        counts[name] = total
+    return counts
+
+
+def _simulate_chunk(args):
+    return simulate_bracket_program(*args)
+
+
+def run_bracket_simulation(program, runs=SIMULATION_RUNS, seed=None, workers=SIMULATION_WORKERS):
+    """
+    Simuliert `runs` Turnierverläufe, optional verteilt auf `workers` Prozesse
+    (jeder mit eigenem Zufallsstrom aus demselben Seed).
+    Returns: {target: {team: wahrscheinlichkeit}} ohne Teams mit Chance 0
+    """
+    import numpy as np
+    if workers > 1 and runs >= workers:
+        from concurrent.futures import ProcessPoolExecutor
+        streams = np.random.SeedSequence(seed).spawn(workers)
+        chunks = [runs // workers + (1 if i < runs % workers else 0) for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_chunk,
+                                  [(program, n, s) for n, s in zip(chunks, streams)]))
+        counts = {name: sum(part[name] for part in parts) for name in program.targets}
+    else:
+        counts = simulate_bracket_program(program, runs, seed)
 
-    # 5./6. Platzierte sortieren
-    fives_sixes.sort(key=lambda x: (-x['goals_for'], -x['goal_difference']))
-    fc_from_5_6 = set(t['team'] for t in fives_sixes[:8])
-    plz_teams   = set(t['team'] for t in fives_sixes[8:])
+    return {
+        name: {program.teams[i]: float(total[i]) / runs
+               for i in np.flatnonzero(total) if i != SIM_BYE}
+        for name, total in counts.items()
+    }
+
+
+def _build_win_probabilities(conn):
+    program = build_bracket_program(conn)
+    # Seed aus der Daten-Version: gleicher Stand → gleiche Zahlen auf allen Beamern
+    probabilities = run_bracket_simulation(program, seed=get_data_version(conn))
+    return {'runs': SIMULATION_RUNS, 'probabilities': probabilities}
 
-    fc_teams = set(f['team'] for f in rest8) | fc_from_5_6
 
-    return de_teams, fc_teams, plz_teams, best2, rest8
+def get_win_probabilities(conn):
+    """Siegwahrscheinlichkeiten der aktuellen Daten-Version (gecacht pro Turnier-Datei)"""
+    return get_versioned_snapshot(conn, 'win_probabilities', _build_win_probabilities)
+
+
+# Korrelierte Unterabfragen statt UPDATE … FROM (erst ab SQLite 3.33), damit
+# jede SQLite-Version mit WITH vor UPDATE (3.8.3) reicht
+RANKINGS_REBUILD_SQL = """
+    WITH sides AS (
+        SELECT team1 AS team, score1 AS gf, score2 AS ga FROM matches
+        WHERE score1 IS NOT NULL AND score2 IS NOT NULL
+        UNION ALL
+        SELECT team2, score2, score1 FROM matches
+        WHERE score1 IS NOT NULL AND score2 IS NOT NULL
+    )
+    UPDATE rankings
+    SET matches_played  = (SELECT COUNT(*) FROM sides s WHERE s.team = rankings.team),
+        wins            = (SELECT COUNT(*) FROM sides s WHERE s.team = rankings.team AND s.gf > s.ga),
+        draws           = (SELECT COUNT(*) FROM sides s WHERE s.team = rankings.team AND s.gf = s.ga),
+        losses          = (SELECT COUNT(*) FROM sides s WHERE s.team = rankings.team AND s.gf < s.ga),
+        goals_for       = (SELECT COALESCE(SUM(s.gf), 0) FROM sides s WHERE s.team = rankings.team),
+        goals_against   = (SELECT COALESCE(SUM(s.ga), 0) FROM sides s WHERE s.team = rankings.team),
+        goal_difference = (SELECT COALESCE(SUM(s.gf - s.ga), 0) FROM sides s
+                           WHERE s.team = rankings.team),
+        points          = (SELECT COALESCE(SUM(CASE WHEN s.gf > s.ga THEN 3
+                                                    WHEN s.gf = s.ga THEN 1 ELSE 0 END), 0)
+                           FROM sides s WHERE s.team = rankings.team)
+"""
 
 
 def recalculate_rankings_internal(conn):
@@ -2029,47 +3845,78 @@ def recalculate_rankings_internal(conn):
         )
     """)
 
-    # ── Alle Werte auf 0 zurücksetzen ────────────────────────────────────────
-    cursor.execute("""
-        UPDATE rankings
-        SET matches_played=0, wins=0, draws=0, losses=0,
-            goals_for=0, goals_against=0, goal_difference=0, points=0
-    """)
+    # ── Alle Werte in einem Statement aus den gespielten Matches berechnen ───
+    # Jede Match-Seite als eigene Zeile (team, eigene, gegnerische Punkte),
+    # pro Team aggregieren und per LEFT JOIN auch Teams ohne Spiel auf 0 setzen.
+    cursor.execute(RANKINGS_REBUILD_SQL)
 
-    # ── Aus gespielte Matches neu berechnen ──────────────────────────────────
-    cursor.execute("""
-        SELECT * FROM matches
-        WHERE score1 IS NOT NULL AND score2 IS NOT NULL
-    """)
+    conn.commit()
 
-    for match in cursor.fetchall():
-        team1, team2 = match['team1'], match['team2']
-        score1, score2 = match['score1'], match['score2']
 
-        if score1 > score2:
-            w1,d1,l1,p1 = 1,0,0,3; w2,d2,l2,p2 = 0,0,1,0
-        elif score1 < score2:
-            w1,d1,l1,p1 = 0,0,1,0; w2,d2,l2,p2 = 1,0,0,3
-        else:
-            w1,d1,l1,p1 = 0,1,0,1; w2,d2,l2,p2 = 0,1,0,1
+# ── Inkrementelle Rankings ───────────────────────────────────────────────────
+# Beim Speichern eines Resultats wird nur die Differenz zwischen altem und
+# neuem Resultat auf die beiden beteiligten Teams angewendet.
 
-        cursor.execute("""
-            UPDATE rankings
-            SET matches_played=matches_played+1, wins=wins+?, draws=draws+?,
-                losses=losses+?, goals_for=goals_for+?, goals_against=goals_against+?,
-                goal_difference=goal_difference+(?-?), points=points+?
-            WHERE team=?
-        """, (w1,d1,l1,score1,score2,score1,score2,p1,team1))
+RANKING_STAT_COLUMNS = ('matches_played', 'wins', 'draws', 'losses',
+                        'goals_for', 'goals_against', 'goal_difference', 'points')
 
-        cursor.execute("""
-            UPDATE rankings
-            SET matches_played=matches_played+1, wins=wins+?, draws=draws+?,
-                losses=losses+?, goals_for=goals_for+?, goals_against=goals_against+?,
-                goal_difference=goal_difference+(?-?), points=points+?
-            WHERE team=?
-        """, (w2,d2,l2,score2,score1,score2,score1,p2,team2))
 
-    conn.commit()
+def _ranking_contribution(own, other):
+    """Beitrag eines Spiels zum Ranking eines Teams (Reihenfolge wie RANKING_STAT_COLUMNS)"""
+    if own is None or other is None:
+        return (0, 0, 0, 0, 0, 0, 0, 0)
+    if own > other:
+        w, d, l, p = 1, 0, 0, 3
+    elif own < other:
+        w, d, l, p = 0, 0, 1, 0
+    else:
+        w, d, l, p = 0, 1, 0, 1
+    return (1, w, d, l, own, other, own - other, p)
+
+
+def apply_ranking_delta(conn, team1, team2, old_scores, new_scores):
+    """Korrigiert die Rankings von team1/team2 um die Differenz alt → neu.
+
+    old_scores/new_scores sind (score1, score2)-Tupel, (None, None) = nicht gespielt.
+    Committet nicht — der Aufrufer schreibt Match und Rankings in einer Transaktion.
+    Gibt False zurück, wenn ein Team keinen Rankings-Eintrag hat.
+    """
+    set_clause = ", ".join(f"{col}={col}+?" for col in RANKING_STAT_COLUMNS)
+    for team, side in ((team1, 0), (team2, 1)):
+        old = _ranking_contribution(old_scores[side], old_scores[1 - side])
+        new = _ranking_contribution(new_scores[side], new_scores[1 - side])
+        delta = tuple(n - o for n, o in zip(new, old))
+        if not any(delta):
+            continue
+        cur = conn.execute(f"UPDATE rankings SET {set_clause} WHERE team=?", delta + (team,))
+        if cur.rowcount == 0:
+            return False
+    return True
+
+
+def rebuild_and_verify_rankings(conn):
+    """Vollständige Neuberechnung; liefert die Abweichungen zum vorherigen Stand.
+
+    Rückgabe: Liste von {'team', 'column', 'stored', 'expected'}. Eine leere
+    Liste heisst, die inkrementell gepflegten Rankings waren korrekt.
+    """
+    columns = ", ".join(RANKING_STAT_COLUMNS)
+    before = {row['team']: tuple(row)[1:]
+              for row in conn.execute(f"SELECT team, {columns} FROM rankings")}
+
+    recalculate_rankings_internal(conn)
+
+    drift = []
+    for row in conn.execute(f"SELECT team, {columns} FROM rankings"):
+        stored = before.get(row['team'])
+        expected = tuple(row)[1:]
+        if stored is None:
+            drift.append({'team': row['team'], 'column': None, 'stored': None, 'expected': None})
+            continue
+        for col, old, new in zip(RANKING_STAT_COLUMNS, stored, expected):
+            if old != new:
+                drift.append({'team': row['team'], 'column': col, 'stored': old, 'expected': new})
+    return drift
 
 
 # ============================================================================
@@ -2090,6 +3937,10 @@ def create_new_game():
     match_duration = int(request.form.get('match_duration', 12))
     break_between_games = int(request.form.get('break_between_games', 3))
     start_time = request.form.get('start_time', '09:00')
+    try:
+        courts = parse_court_count(request.form.get('courts', DEFAULT_COURTS))
+    except ValueError as e:
+        return render_template("admin/error.html", error_message=str(e))
     
     # NEU: Mittagspause
     lunch_break_enabled = 1 if request.form.get('lunch_break_enabled') == 'on' else 0
@@ -2106,10 +3957,10 @@ def create_new_game():
     cursor.execute("""
         INSERT OR REPLACE INTO tournament_config 
         (game_name, match_duration, break_between_games, start_time,
-         lunch_break_enabled, lunch_break_start, lunch_break_end)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
+         lunch_break_enabled, lunch_break_start, lunch_break_end, courts)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
     """, (game_name, match_duration, break_between_games, start_time,
-          lunch_break_enabled, lunch_break_start, lunch_break_end))
+          lunch_break_enabled, lunch_break_start, lunch_break_end, courts))
     
     conn.commit()
     conn.close()
@@ -2160,12 +4011,13 @@ def cancel_game(game_name):
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM matches")
-    cursor.execute("DELETE FROM double_elim_matches_a")
-    cursor.execute("DELETE FROM double_elim_matches_b")
+    cursor.execute("DELETE FROM double_elim_matches")
     cursor.execute("DELETE FROM super_finals_matches")
     cursor.execute("DELETE FROM follower_quali_matches")
     cursor.execute("DELETE FROM follower_cup_matches")
     cursor.execute("DELETE FROM placement_matches")
+    cursor.execute("DELETE FROM bracket_config WHERE phase != 'placement'")
+    cursor.execute("UPDATE bracket_config SET entrants = 0")
     cursor.execute("UPDATE rankings SET matches_played=0, wins=0, draws=0, losses=0, goals_for=0, goals_against=0, goal_difference=0, points=0")
 
     conn.commit()
@@ -2401,70 +4253,43 @@ def generate_matches(game_name):
     for team in all_teams:
         groups[team['group_number']].append(team['name'])
 
-    # ── Rotierendes Feldsystem ────────────────────────────────────────────────
-    # Bracket A: Gruppen 1–5, Bracket B: Gruppen 6–10
-    # Jede Gruppe belegt pro Runde 3 Felder (n//2 = 3 Spiele bei 6 Teams)
-    # Startfeld der Gruppe in Runde r = ((grp_index * 3) + (r-1) * 3) % 15 + 1
-    # Beispiel Bracket A Runde 1: Grp1→F1-3, Grp2→F4-6, Grp3→F7-9, Grp4→F10-12, Grp5→F13-15
-    #          Bracket A Runde 2: Grp1→F4-6, Grp2→F7-9, Grp3→F10-12, Grp4→F13-15, Grp5→F1-3
-    # Bracket B spielen auf denselben Feldern 1-15, zeitlich versetzt
-
-    FIELDS = 15   # Felder 1–15
-    SPIELE_PRO_GRUPPE = 3  # n//2 bei 6 Teams
-
-    def get_start_field(grp_index_in_bracket, round_num):
-        """Startfeld für Gruppe in Runde — rotiert um 3 pro Runde"""
-        offset = ((grp_index_in_bracket * SPIELE_PRO_GRUPPE) + (round_num - 1) * SPIELE_PRO_GRUPPE) % FIELDS
-        return offset + 1  # 1-basiert
-
-    # Gruppen nach Brackets aufteilen
-    bracket_a_groups = sorted(g for g in groups.keys() if g <= 5)
-    bracket_b_groups = sorted(g for g in groups.keys() if g > 5)
-
-    # Spiele für ein Bracket generieren
-    def generate_bracket(bracket_groups):
-        # teams_by_group: Kopie für Round-Robin-Rotation
-        teams_state = {g: list(groups[g]) for g in bracket_groups}
-
-        for round_num in range(1, 6):  # 5 Runden bei 6 Teams
-            for grp_idx, group_num in enumerate(bracket_groups):
-                teams = teams_state[group_num]
-                n = len(teams)
-                if n < 2:
-                    continue
-
-                start_field = get_start_field(grp_idx, round_num)
+    # Felder und Zeiten vergibt die Spielplan-Engine (calculate_round_robin_times)
+    # teams_state: Kopie für Round-Robin-Rotation
+    teams_state = {g: list(teams) for g, teams in groups.items()}
+    pairings = []
 
-                for i in range(n // 2):
-                    team1 = teams[i]
-                    team2 = teams[n - 1 - i]
-                    field = ((start_field - 1 + i) % FIELDS) + 1  # F, F+1, F+2
+    for round_num in range(1, 6):  # 5 Runden bei 6 Teams
+        for group_num in sorted(teams_state):
+            teams = teams_state[group_num]
+            n = len(teams)
+            if n < 2:
+                continue
 
-                    cursor.execute("""
-                        INSERT INTO matches (round, team1, team2, group_number, field)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (round_num, team1, team2, group_num, field))
+            for i in range(n // 2):
+                pairings.append((round_num, teams[i], teams[n - 1 - i], group_num))
 
-            # Rotation für nächste Runde (alle Gruppen gleichzeitig)
-            for group_num in bracket_groups:
-                t = teams_state[group_num]
-                if len(t) > 2:
-                    teams_state[group_num] = [t[0]] + [t[-1]] + t[1:-1]
+        # Rotation für nächste Runde (alle Gruppen gleichzeitig)
+        for group_num, t in teams_state.items():
+            if len(t) > 2:
+                teams_state[group_num] = [t[0]] + [t[-1]] + t[1:-1]
 
-    generate_bracket(bracket_a_groups)
-    generate_bracket(bracket_b_groups)
+    cursor.executemany("""
+        INSERT INTO matches (round, team1, team2, group_number)
+        VALUES (?, ?, ?, ?)
+    """, pairings)
     
     # Ghost-Teams verlieren automatisch
     cursor.execute("SELECT name FROM teams WHERE is_ghost = 1")
     ghost_teams = [row['name'] for row in cursor.fetchall()]
     
     if ghost_teams:
-        cursor.execute("SELECT * FROM matches")
-        for match in cursor.fetchall():
+        forfeits = []
+        for match in cursor.execute("SELECT id, team1, team2 FROM matches").fetchall():
             if match['team1'] in ghost_teams:
-                cursor.execute("UPDATE matches SET score1 = 0, score2 = 42 WHERE id = ?", (match['id'],))
+                forfeits.append((0, 42, match['id']))
             elif match['team2'] in ghost_teams:
-                cursor.execute("UPDATE matches SET score1 = 42, score2 = 0 WHERE id = ?", (match['id'],))
+                forfeits.append((42, 0, match['id']))
+        batch_update(conn, 'matches', ('score1', 'score2'), forfeits)
     
     conn.commit()
     
@@ -2542,6 +4367,35 @@ def enter_results(game_name):
                            rounds=rounds, current_round=current_round)
 
 
+def _write_match_score(conn, match_id, scores):
+    """Schreibt ein Gruppenspiel-Resultat und passt die Rankings inkrementell an.
+
+    Match-Update und Rankings-Delta laufen in einer Transaktion. Fehlt ein
+    Rankings-Eintrag, wird stattdessen voll neu berechnet.
+    Gibt False zurück, wenn das Spiel nicht existiert.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        old = conn.execute("SELECT team1, team2, score1, score2 FROM matches WHERE id=?",
+                           (match_id,)).fetchone()
+        if old is None:
+            conn.rollback()
+            return False
+        conn.execute("UPDATE matches SET score1=?, score2=? WHERE id=?", scores + (match_id,))
+        consistent = apply_ranking_delta(conn, old['team1'], old['team2'],
+                                         (old['score1'], old['score2']), scores)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if not consistent:
+        recalculate_rankings_internal(conn)
+    return True
+
+
 @app.route('/save_result/<game_name>/<int:match_id>', methods=['POST'])
 def save_result(game_name, match_id):
     """Einzelnes Ergebnis speichern — antwortet mit JSON für AJAX"""
@@ -2566,9 +4420,11 @@ def save_result(game_name, match_id):
 
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     conn = get_db_connection(db_path)
-    conn.execute("UPDATE matches SET score1=?, score2=? WHERE id=?", (s1, s2, match_id))
-    conn.commit()
-    recalculate_rankings_internal(conn)
+    if not _write_match_score(conn, match_id, (s1, s2)):
+        conn.close()
+        if is_ajax:
+            return jsonify({'ok': False, 'error': 'Spiel nicht gefunden'})
+        return redirect(url_for('enter_results', game_name=game_name))
     conn.close()
 
     if is_ajax:
@@ -2582,9 +4438,7 @@ def delete_result(game_name, match_id):
     is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     conn = get_db_connection(db_path)
-    conn.execute("UPDATE matches SET score1=NULL, score2=NULL WHERE id=?", (match_id,))
-    conn.commit()
-    recalculate_rankings_internal(conn)
+    _write_match_score(conn, match_id, (None, None))
     conn.close()
 
     if is_ajax:
@@ -2597,9 +4451,13 @@ def recalculate_rankings(game_name):
     """Rankings manuell neu berechnen"""
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     conn = get_db_connection(db_path)
-    recalculate_rankings_internal(conn)
+    drift = rebuild_and_verify_rankings(conn)
     conn.close()
-    return redirect(url_for('group_standings', game_name=game_name))
+    if drift:
+        print(f"⚠️ Rankings-Abweichung korrigiert ({len(drift)} Werte):")
+        for d in drift:
+            print(f"   {d['team']}: {d['column']} {d['stored']} → {d['expected']}")
+    return redirect(url_for('group_standings', game_name=game_name, drift=len(drift)))
 
 
 @app.route('/set_wildcard_override/<game_name>', methods=['POST'])
@@ -2629,12 +4487,11 @@ def group_standings(game_name):
     if not os.path.exists(db_path):
         return render_template("admin/error.html", error_message="Turnier nicht gefunden!")
     conn = get_db_connection(db_path)
-    groups = {}
-    for group_num in range(1, 11):
-        groups[group_num] = sort_group_with_head_to_head(conn, group_num)
-    de_teams, fc_teams, plz_teams, best2, rest8 = get_phase_assignment(conn)
-    all_fourths = rest8 + best2
-    all_fourths.sort(key=lambda x: (-x['goals_for'], -x['goal_difference']))
+    snap = get_ranking_snapshot(conn)
+    groups = {group_num: snap['groups'].get(group_num, []) for group_num in range(1, 11)}
+    de_teams, fc_teams, plz_teams = snap['de_teams'], snap['fc_teams'], snap['plz_teams']
+    best2 = snap['best2']
+    all_fourths = snap['fourths']
     best_4th_1 = best2[0] if len(best2) > 0 else None
     best_4th_2 = best2[1] if len(best2) > 1 else None
     wildcard_tie = False
@@ -2668,79 +4525,52 @@ def generate_double_elim(game_name):
     conn = get_db_connection(db_path)
     cursor = conn.cursor()
     
-    cursor.execute("SELECT COUNT(*) as count FROM double_elim_matches_a")
+    cursor.execute("SELECT COUNT(*) as count FROM double_elim_matches")
     if cursor.fetchone()['count'] > 0:
         conn.close()
         return render_template("admin/error.html", 
                              error_message="Brackets wurden bereits generiert!")
     
-    bracket_a_teams = get_qualified_teams_for_bracket(conn, 1, 5)
-    bracket_b_teams = get_qualified_teams_for_bracket(conn, 6, 10)
+    bracket_teams = {bracket_id: get_qualified_teams_for_bracket(conn, *groups)
+                     for bracket_id, groups in DE_BRACKETS.items()}
     
-    if len(bracket_a_teams) < 16 or len(bracket_b_teams) < 16:
+    layout = get_double_elim_layout(DE_BRACKET_SIZE)
+
+    if any(len(teams) < layout.size for teams in bracket_teams.values()):
+        counts = ", ".join(f"{b}: {len(teams)}" for b, teams in bracket_teams.items())
         conn.close()
         return render_template("admin/error.html", 
-                             error_message=f"Nicht genug qualifizierte Teams! A: {len(bracket_a_teams)}, B: {len(bracket_b_teams)}")
-    
-    # ── KORREKTE 16-TEAM DOUBLE ELIMINATION STRUKTUR ────────────────────────
-    # WB: R1=8, R2=4, R3=2, R4=1 (WB Final)
-    # LB: R1=8, R2=8, R3=4, R4=4, R5=2, R6=2, R7=1, R8=1 (LB Final)
-    # Seeding: P1 vs P16, P2 vs P15, ... P8 vs P9
-
-    # LB-Runden-Struktur: {round: anzahl_spiele}
-    LB_ROUNDS = {1:8, 2:8, 3:4, 4:4, 5:2, 6:2, 7:1, 8:1}
-    WB_ROUNDS = {1:8, 2:4, 3:2, 4:1}  # R4 = WB Final
-
-    def insert_bracket(table, teams):
-        # WB Runde 1 — Seeding: 1 vs 16, 2 vs 15, 3 vs 14, 4 vs 13, ...
-        # match_index 0: seed1 vs seed16, 1: seed8 vs seed9, 2: seed4 vs seed13, ...
-        # Standard DE Seeding-Schema:
-        seeds = list(range(16))  # 0..15 = Platz 1..16
-        pairings = [
-            (0, 15), (7, 8), (3, 12), (4, 11),
-            (1, 14), (6, 9), (2, 13), (5, 10)
-        ]
-        for i, (s1, s2) in enumerate(pairings):
-            cursor.execute(f"""
-                INSERT INTO {table}
-                (round, bracket, match_index, team1, team2)
-                VALUES (1, 'Winners', ?, ?, ?)
-            """, (i, teams[s1], teams[s2]))
-
-        # WB Runden 2-4 (leer, werden durch Weiterleitung befüllt)
-        for rnd, n in WB_ROUNDS.items():
-            if rnd == 1: continue
-            for i in range(n):
-                cursor.execute(f"""
-                    INSERT INTO {table}
-                    (round, bracket, match_index, team1, team2)
-                    VALUES (?, 'Winners', ?, NULL, NULL)
-                """, (rnd, i))
-
-        # LB Runden 1-8 (leer, werden durch Weiterleitung befüllt)
-        for rnd, n in LB_ROUNDS.items():
-            for i in range(n):
-                cursor.execute(f"""
-                    INSERT INTO {table}
-                    (round, bracket, match_index, team1, team2)
-                    VALUES (?, 'Losers', ?, NULL, NULL)
-                """, (rnd, i))
-
-    insert_bracket('double_elim_matches_a', bracket_a_teams)
-    insert_bracket('double_elim_matches_b', bracket_b_teams)
+                             error_message=f"Nicht genug qualifizierte Teams! {counts}")
+    
+    # ── DOUBLE ELIMINATION STRUKTUR AUS DEM LAYOUT ──────────────────────────
+    # 16 Teams: WB 8/4/2/1, LB 4/4/2/2/1/1 (LB R6 = LB Final)
+    # Seeding: P1 vs P16, P8 vs P9, P4 vs P13, ... (Standard-Setzliste)
+
+    # WB Runde 1 gemäß Setzliste, alle übrigen Spiele leer —
+    # sie werden durch die Weiterleitung befüllt
+    rows = []
+    for bracket_id, teams in bracket_teams.items():
+        seeded = {i: (teams[s1], teams[s2]) for i, (s1, s2) in enumerate(layout.pairings)}
+        for bracket, round_num, match_index in layout.slots:
+            team1, team2 = (seeded[match_index] if bracket == 'Winners' and round_num == 1
+                            else (None, None))
+            rows.append((bracket_id, round_num, bracket, match_index, team1, team2))
+    cursor.executemany("""
+        INSERT INTO double_elim_matches
+        (bracket_id, round, bracket, match_index, team1, team2)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
     
     conn.commit()
-    cursor.execute("SELECT MAX(match_number) as max_num FROM matches")
-    next_number = (cursor.fetchone()['max_num'] or 0) + 1
+    next_number = reserve_match_numbers(cursor, len(rows))
 
     print("\n🔢 Vergebe Spielnummern...")
-    next_number = assign_double_elim_match_numbers_a(conn, next_number)
-    assign_double_elim_match_numbers_b(conn, next_number)
+    for bracket_id in bracket_teams:
+        next_number = assign_double_elim_match_numbers(conn, bracket_id, next_number)
 
-    # NEU: Spielzeiten
+    # NEU: Spielzeiten (beide Brackets gemeinsam auf allen Feldern)
     print("\n⏰ Berechne Spielzeiten...")
-    calculate_double_elim_times(conn, 'double_elim_matches_a')
-    calculate_double_elim_times(conn, 'double_elim_matches_b')
+    calculate_knockout_times(conn)
 
     conn.close()
     
@@ -2756,15 +4586,6 @@ def renumber_all_matches(game_name):
         return jsonify({"success": False, "error": "Turnier nicht gefunden!"})
     try:
         conn = get_db_connection(db_path)
-        cursor = conn.cursor()
-        cursor.execute("UPDATE matches SET match_number = NULL")
-        cursor.execute("UPDATE double_elim_matches_a SET match_number = NULL")
-        cursor.execute("UPDATE double_elim_matches_b SET match_number = NULL")
-        cursor.execute("UPDATE super_finals_matches SET match_number = NULL")
-        cursor.execute("UPDATE follower_quali_matches SET match_number = NULL")
-        cursor.execute("UPDATE follower_cup_matches SET match_number = NULL")
-        cursor.execute("UPDATE placement_matches SET match_number = NULL")
-        conn.commit()
         stats = assign_all_match_numbers(conn)
         conn.close()
         return jsonify({"success": True, "message": "Spielnummern neu vergeben!", "stats": stats})
@@ -2777,26 +4598,13 @@ def double_elim_bracket(game_name):
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     
     conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT * FROM double_elim_matches_a 
-        ORDER BY round, bracket DESC, match_index
-    """)
-    matches_a = cursor.fetchall()
-    
-    cursor.execute("""
-        SELECT * FROM double_elim_matches_b 
-        ORDER BY round, bracket DESC, match_index
-    """)
-    matches_b = cursor.fetchall()
-    
+    brackets = get_double_elim_matches(conn)
     conn.close()
     
     return render_template("admin/double_elim_bracket.html",
                          game_name=game_name,
-                         matches_a=matches_a,
-                         matches_b=matches_b)
+                         matches_a=brackets['A'],
+                         matches_b=brackets['B'])
 
 
 @app.route('/enter_double_elim_results/<game_name>')
@@ -2805,80 +4613,71 @@ def enter_double_elim_results(game_name):
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     
     conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT 'A' as bracket_id, * FROM double_elim_matches_a 
-        WHERE team1 IS NOT NULL AND team2 IS NOT NULL
-        ORDER BY round, bracket DESC, match_index
-    """)
-    matches_a = cursor.fetchall()
-    
-    cursor.execute("""
-        SELECT 'B' as bracket_id, * FROM double_elim_matches_b 
-        WHERE team1 IS NOT NULL AND team2 IS NOT NULL
-        ORDER BY round, bracket DESC, match_index
-    """)
-    matches_b = cursor.fetchall()
-    
+    brackets = get_double_elim_matches(conn, ready_only=True)
+    layouts = get_bracket_layouts(conn)
     conn.close()
     
     return render_template("admin/enter_double_elim_results.html",
                          game_name=game_name,
-                         matches_a=matches_a,
-                         matches_b=matches_b)
+                         matches_a=brackets['A'],
+                         matches_b=brackets['B'],
+                         lb_rounds=max((l.lb_rounds for l in layouts.values()), default=0))
 
 
-@app.route('/update_double_elim_result/<game_name>/<int:match_id>', methods=['POST'])
-def update_double_elim_result(game_name, match_id):
-    """Double Elimination Ergebnis speichern"""
-    score1 = int(request.form['score1'])
-    score2 = int(request.form['score2'])
-    
+def _save_knockout_result(game_name, table, match_id, endpoint, allow_draw=False):
+    """
+    Gemeinsame Route-Logik der K.o.-Phasen: Score prüfen, über
+    write_knockout_result speichern, JSON für AJAX sonst Redirect.
+    """
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+    def fail(message):
+        if is_ajax:
+            return jsonify({'ok': False, 'error': message})
+        return render_template("admin/error.html", error_message=message)
+
+    try:
+        score1 = int(request.form['score1'])
+        score2 = int(request.form['score2'])
+    except (KeyError, ValueError):
+        return fail("Ungültige Zahl")
+
     if score1 > 42 or score2 > 42 or score1 < 0 or score2 < 0:
-        return render_template("admin/error.html", 
-                             error_message="Punktzahl muss zwischen 0 und 42 liegen!")
-    
-    if score1 == score2:
-        return render_template("admin/error.html", 
-                             error_message="Unentschieden nicht erlaubt!")
-    
+        return fail("Punktzahl muss zwischen 0 und 42 liegen!")
+
+    if score1 == score2 and not allow_draw:
+        return fail("Unentschieden nicht erlaubt!")
+
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
-    
     conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    
-    table = f"double_elim_matches_{bracket_id.lower()}"
-    
-    cursor.execute(f"SELECT * FROM {table} WHERE id = ?", (match_id,))
-    match = cursor.fetchone()
-    
-    if not match:
+    try:
+        matches = write_knockout_result(conn, table, match_id, score1, score2)
+    except ValueError as e:
         conn.close()
-        return redirect(url_for('enter_double_elim_results', game_name=game_name))
-    
-    winner = match['team1'] if score1 > score2 else match['team2']
-    loser = match['team2'] if score1 > score2 else match['team1']
-    
-    cursor.execute(f"""
-        UPDATE {table}
-        SET score1 = ?, score2 = ?, winner = ?, loser = ?
-        WHERE id = ?
-    """, (score1, score2, winner, loser, match_id))
-    
-    conn.commit()
-    
-    # Weiterleitung
-    if bracket_id == 'A':
-        process_double_elim_forwarding(conn, match, table, WINNER_MAPPING_A, 
-                                       LOSER_MAPPING_A, LOSER_WINNER_MAPPING_A)
-    else:
-        process_double_elim_forwarding(conn, match, table, WINNER_MAPPING_B, 
-                                       LOSER_MAPPING_B, LOSER_WINNER_MAPPING_B)
-    
+        return fail(str(e))
+    if matches is not None:
+        # Neu spielbereite Spiele sofort auf freie Felder verteilen
+        queue = {(m['table'], m['id']): m
+                 for m in dispatch_knockout_courts(conn, finished=(table, match_id))}
+        for m in matches:
+            if (table, m['id']) in queue:
+                m.update(court=queue[(table, m['id'])]['court'], time=queue[(table, m['id'])]['time'])
     conn.close()
-    
-    return redirect(url_for('enter_double_elim_results', game_name=game_name))
+
+    if matches is None:
+        if is_ajax:
+            return jsonify({'ok': False, 'error': 'Spiel nicht gefunden'})
+        return redirect(url_for(endpoint, game_name=game_name))
+
+    if is_ajax:
+        return jsonify({'ok': True, 'matches': [dict(m) for m in matches]})
+    return redirect(url_for(endpoint, game_name=game_name))
+
+
+@app.route('/update_double_elim_result/<game_name>/<int:match_id>', methods=['POST'])
+def update_double_elim_result(game_name, match_id):
+    """Double Elimination Ergebnis speichern (alle Brackets in einer Tabelle)"""
+    return _save_knockout_result(game_name, 'double_elim_matches', match_id, 'enter_double_elim_results')
 
 
 # ============================================================================
@@ -2899,48 +4698,28 @@ def generate_super_finals(game_name):
         return render_template("admin/error.html", 
                              error_message="Super Finals wurden bereits generiert!")
     
-    # Bracket A Finalisten
-    cursor.execute("""
-        SELECT winner FROM double_elim_matches_a 
-        WHERE round = 4 AND bracket = 'Winners' AND match_index = 0
-        AND winner IS NOT NULL
-    """)
-    row = cursor.fetchone()
-    winner_a = row['winner'] if row else None
-    
-    cursor.execute("""
-        SELECT winner FROM double_elim_matches_a 
-        WHERE round = 6 AND bracket = 'Losers' 
-        AND winner IS NOT NULL
-        ORDER BY id DESC LIMIT 1
-    """)
-    row = cursor.fetchone()
-    second_a = row['winner'] if row else None
-    
-    # Bracket B Finalisten
-    cursor.execute("""
-        SELECT winner FROM double_elim_matches_b 
-        WHERE round = 4 AND bracket = 'Winners' AND match_index = 0
-        AND winner IS NOT NULL
-    """)
-    row = cursor.fetchone()
-    winner_b = row['winner'] if row else None
-    
-    cursor.execute("""
-        SELECT winner FROM double_elim_matches_b 
-        WHERE round = 6 AND bracket = 'Losers' 
-        AND winner IS NOT NULL
-        ORDER BY id DESC LIMIT 1
-    """)
-    row = cursor.fetchone()
-    second_b = row['winner'] if row else None
+    # Bracket-Finalisten: Sieger WB-Finale (1) und Sieger LB-Finale (2)
+    finalists = {}
+    for bracket_id, layout in get_bracket_layouts(conn).items():
+        for place, bracket, round_num in ((1, 'Winners', layout.wb_rounds),
+                                          (2, 'Losers', layout.lb_rounds)):
+            cursor.execute("""
+                SELECT winner FROM double_elim_matches
+                WHERE bracket_id = ? AND bracket = ? AND round = ? AND match_index = 0
+                AND winner IS NOT NULL
+            """, (bracket_id, bracket, round_num))
+            row = cursor.fetchone()
+            finalists[(bracket_id, place)] = row['winner'] if row else None
+    winner_a, second_a = finalists.get(('A', 1)), finalists.get(('A', 2))
+    winner_b, second_b = finalists.get(('B', 1)), finalists.get(('B', 2))
     
     if not all([winner_a, second_a, winner_b, second_b]):
         conn.close()
         return render_template("admin/error.html", 
                              error_message=f"Nicht alle Bracket-Finalisten stehen fest! A1:{winner_a}, A2:{second_a}, B1:{winner_b}, B2:{second_b}")
     
-    match_number = 213
+    # HF1, HF2, FINAL, THIRD
+    match_number = reserve_match_numbers(cursor, 4)
     
     # Halbfinale 1: Sieger A vs 2. Platz B
     cursor.execute("""
@@ -3037,51 +4816,8 @@ def enter_super_finals_results(game_name):
 @app.route('/save_super_finals_result/<game_name>/<int:match_id>', methods=['POST'])
 def save_super_finals_result(game_name, match_id):
     """Super Finals Ergebnis speichern"""
-    score1 = int(request.form['score1'])
-    score2 = int(request.form['score2'])
-    
-    if score1 > 42 or score2 > 42 or score1 < 0 or score2 < 0:
-        return render_template("admin/error.html", 
-                             error_message="Punktzahl muss zwischen 0 und 42 liegen!")
-    
-    if score1 == score2:
-        return render_template("admin/error.html", 
-                             error_message="Unentschieden nicht erlaubt!")
-    
-    db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
-    
-    conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM super_finals_matches WHERE id = ?", (match_id,))
-    match = cursor.fetchone()
-    
-    if not match:
-        conn.close()
-        return redirect(url_for('enter_super_finals_results', game_name=game_name))
-    
-    winner = match['team1'] if score1 > score2 else match['team2']
-    loser = match['team2'] if score1 > score2 else match['team1']
-    
-    cursor.execute("""
-        UPDATE super_finals_matches
-        SET score1 = ?, score2 = ?, winner = ?
-        WHERE id = ?
-    """, (score1, score2, winner, match_id))
-    
-    match_id_str = match['match_id']
-    
-    if match_id_str == 'HF1':
-        cursor.execute("UPDATE super_finals_matches SET team1 = ? WHERE match_id = 'FINAL'", (winner,))
-        cursor.execute("UPDATE super_finals_matches SET team1 = ? WHERE match_id = 'THIRD'", (loser,))
-    elif match_id_str == 'HF2':
-        cursor.execute("UPDATE super_finals_matches SET team2 = ? WHERE match_id = 'FINAL'", (winner,))
-        cursor.execute("UPDATE super_finals_matches SET team2 = ? WHERE match_id = 'THIRD'", (loser,))
-    
-    conn.commit()
-    conn.close()
-    
-    return redirect(url_for('enter_super_finals_results', game_name=game_name))
+    return _save_knockout_result(game_name, 'super_finals_matches', match_id,
+                                 'enter_super_finals_results')
 
 
 @app.route('/reset_super_finals/<game_name>', methods=['POST'])
@@ -3116,55 +4852,10 @@ def generate_follower_quali(game_name):
         return render_template("admin/error.html", 
                              error_message="Follower Quali wurde bereits generiert!")
     
-    follower_teams = []
-    
-    # 4. Platzierte
-    cursor.execute("""
-        SELECT r.team, r.points, r.goal_difference, r.goals_for, r.group_number
-        FROM rankings r
-        WHERE (SELECT COUNT(*) FROM rankings r2 
-               WHERE r2.group_number = r.group_number 
-               AND (r2.points > r.points 
-                    OR (r2.points = r.points AND r2.goal_difference > r.goal_difference)
-                    OR (r2.points = r.points AND r2.goal_difference = r.goal_difference 
-                        AND r2.goals_for > r.goals_for))) = 3
-        AND r.team NOT IN (SELECT name FROM teams WHERE is_ghost = 1)
-        ORDER BY r.points DESC, r.goal_difference DESC, r.goals_for DESC
-    """)
-    all_4th = cursor.fetchall()
-    
-    for team in all_4th[2:]:
-        follower_teams.append((team['team'], team['points'], team['goal_difference']))
-    
-    # 5. Platzierte
-    cursor.execute("""
-        SELECT r.team, r.points, r.goal_difference
-        FROM rankings r
-        WHERE (SELECT COUNT(*) FROM rankings r2 
-               WHERE r2.group_number = r.group_number 
-               AND (r2.points > r.points 
-                    OR (r2.points = r.points AND r2.goal_difference > r.goal_difference)
-                    OR (r2.points = r.points AND r2.goal_difference = r.goal_difference 
-                        AND r2.goals_for > r.goals_for))) = 4
-        AND r.team NOT IN (SELECT name FROM teams WHERE is_ghost = 1)
-        ORDER BY r.points DESC, r.goal_difference DESC
-    """)
-    follower_teams.extend([(t['team'], t['points'], t['goal_difference']) for t in cursor.fetchall()])
-    
-    # 6. Platzierte
-    cursor.execute("""
-        SELECT r.team, r.points, r.goal_difference
-        FROM rankings r
-        WHERE (SELECT COUNT(*) FROM rankings r2 
-               WHERE r2.group_number = r.group_number 
-               AND (r2.points > r.points 
-                    OR (r2.points = r.points AND r2.goal_difference > r.goal_difference)
-                    OR (r2.points = r.points AND r2.goal_difference = r.goal_difference 
-                        AND r2.goals_for > r.goals_for))) = 5
-        AND r.team NOT IN (SELECT name FROM teams WHERE is_ghost = 1)
-        ORDER BY r.points DESC, r.goal_difference DESC
-    """)
-    follower_teams.extend([(t['team'], t['points'], t['goal_difference']) for t in cursor.fetchall()])
+    # 4. Platzierte (ohne die 2 Wildcards) sowie 5. und 6. Platzierte
+    snap = get_ranking_snapshot(conn)
+    follower_teams = [(t['team'], t['goals_for'], t['goal_difference'])
+                      for t in snap['rest8'] + snap['fives_sixes']]
     
     follower_teams.sort(key=lambda x: (x[1], x[2]), reverse=True)
     
@@ -3173,10 +4864,12 @@ def generate_follower_quali(game_name):
     
     quali_teams = [t[0] for t in follower_teams[4:]]
     
-    match_number = 217
+    num_quali_teams = len(quali_teams)
+    # Paarungen plus evtl. ein Freilos
+    match_number = reserve_match_numbers(cursor, (num_quali_teams + 1) // 2)
+    courts = get_schedule_params(conn).courts
     court = 1
     
-    num_quali_teams = len(quali_teams)
     for i in range(num_quali_teams // 2):
         team1 = quali_teams[i]
         team2 = quali_teams[-(i+1)]
@@ -3188,7 +4881,7 @@ def generate_follower_quali(game_name):
         """, (match_number, team1, team2, court))
         
         match_number += 1
-        court = (court % 15) + 1
+        court = (court % courts) + 1
     
     if num_quali_teams % 2 == 1:
         bye_team = quali_teams[num_quali_teams // 2]
@@ -3244,40 +4937,11 @@ def enter_follower_quali_results(game_name):
                          matches=matches)
 
 
-@app.route('/save_follower_quali_result/<game_name>/<int:match_id>', methods=['POST'])
-def save_follower_quali_result(game_name, match_id):
-    """Follower Quali Ergebnis speichern"""
-    score1 = int(request.form['score1'])
-    score2 = int(request.form['score2'])
-    
-    if score1 > 42 or score2 > 42 or score1 < 0 or score2 < 0:
-        return render_template("admin/error.html", 
-                             error_message="Punktzahl muss zwischen 0 und 42 liegen!")
-    
-    if score1 == score2:
-        return render_template("admin/error.html", 
-                             error_message="Unentschieden nicht erlaubt!")
-    
-    db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
-    
-    conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM follower_quali_matches WHERE id = ?", (match_id,))
-    match = cursor.fetchone()
-    
-    winner = match['team1'] if score1 > score2 else match['team2']
-    
-    cursor.execute("""
-        UPDATE follower_quali_matches
-        SET score1 = ?, score2 = ?, winner = ?
-        WHERE id = ?
-    """, (score1, score2, winner, match_id))
-    
-    conn.commit()
-    conn.close()
-    
-    return redirect(url_for('enter_follower_quali_results', game_name=game_name))
+@app.route('/save_follower_quali_result/<game_name>/<int:match_id>', methods=['POST'])
+def save_follower_quali_result(game_name, match_id):
+    """Follower Quali Ergebnis speichern"""
+    return _save_knockout_result(game_name, 'follower_quali_matches', match_id,
+                                 'enter_follower_quali_results')
 
 
 @app.route('/generate_follower_cup/<game_name>')
@@ -3297,70 +4961,19 @@ def generate_follower_cup(game_name):
     # Alle 16 FC-Teams direkt via get_phase_assignment — keine Quali nötig
     de_teams, fc_teams, plz_teams, best2, rest8 = get_phase_assignment(conn)
 
-    if len(fc_teams) < 16:
+    if len(fc_teams) < 2:
         conn.close()
         return render_template("admin/error.html",
                              error_message=f"Nicht genug FC-Teams! Nur {len(fc_teams)} gefunden. Bitte alle Round Robin Ergebnisse eintragen.")
 
-    # Sortiert nach goals_for (beste zuerst)
-    cursor.execute("""
-        SELECT r.team, r.goals_for, r.goal_difference
-        FROM rankings r
-        WHERE r.team IN ({})
-        ORDER BY r.goals_for DESC, r.goal_difference DESC
-    """.format(','.join('?' for _ in fc_teams)), list(fc_teams))
-    all_teams = [row['team'] for row in cursor.fetchall()]
-    
-    all_teams = all_teams[:16]
-    
-    match_number = 230
-    court = 1
-    
-    # 1/8-Finale
-    for i in range(8):
-        cursor.execute("""
-            INSERT INTO follower_cup_matches 
-            (match_number, round, match_index, team1, team2, court)
-            VALUES (?, 'eighth', ?, ?, ?, ?)
-        """, (match_number, i, all_teams[i], all_teams[15-i], court))
-        match_number += 1
-        court = (court % 15) + 1
-    
-    # 1/4-Finale
-    for i in range(4):
-        cursor.execute("""
-            INSERT INTO follower_cup_matches 
-            (match_number, round, match_index, team1, team2, court)
-            VALUES (?, 'quarter', ?, NULL, NULL, ?)
-        """, (match_number, i, court))
-        match_number += 1
-        court = (court % 15) + 1
-    
-    # Halbfinale
-    for i in range(2):
-        cursor.execute("""
-            INSERT INTO follower_cup_matches 
-            (match_number, round, match_index, team1, team2, court)
-            VALUES (?, 'semi', ?, NULL, NULL, ?)
-        """, (match_number, i, court))
-        match_number += 1
-        court = (court % 15) + 1
-    
-    # Finale
-    cursor.execute("""
-        INSERT INTO follower_cup_matches 
-        (match_number, round, match_index, team1, team2, court)
-        VALUES (?, 'final', 0, NULL, NULL, ?)
-    """, (match_number, court))
-    match_number += 1
-    court = (court % 15) + 1
+    # Sortiert nach goals_for (beste zuerst) = Setzliste
+    all_teams = sort_teams_by_goals(get_ranking_snapshot(conn), fc_teams)
     
-    # Platz 3
-    cursor.execute("""
-        INSERT INTO follower_cup_matches 
-        (match_number, round, match_index, team1, team2, court)
-        VALUES (?, 'third', 0, NULL, NULL, ?)
-    """, (match_number, court))
+    # K.o.-Layout mit Spiel um Platz 3, Plätze ab P33 (nach den DE-Teams)
+    layout = get_single_elim_layout(len(all_teams), third_place=True)
+    insert_single_elim(cursor, 'follower_cup_matches', 'follower_cup', layout, all_teams,
+                       reserve_match_numbers(cursor, len(layout.matches)),
+                       first_place=len(de_teams) + 1)
     
     conn.commit()
     conn.close()
@@ -3376,35 +4989,18 @@ def follower_cup_overview(game_name):
     conn = get_db_connection(db_path)
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT * FROM follower_cup_matches 
-        ORDER BY 
-            CASE round 
-                WHEN 'eighth' THEN 1 
-                WHEN 'quarter' THEN 2 
-                WHEN 'semi' THEN 3 
-                WHEN 'final' THEN 4 
-                WHEN 'third' THEN 5 
-            END,
-            match_index
-    """)
-    matches = cursor.fetchall()
+    cursor.execute("SELECT * FROM follower_cup_matches")
+    rounds = get_single_elim_rounds(conn, 'follower_cup_matches', cursor.fetchall())
+    config = get_single_elim_config(conn, 'follower_cup')
     
     conn.close()
     
-    matches_eighth = [m for m in matches if m['round'] == 'eighth']
-    matches_quarter = [m for m in matches if m['round'] == 'quarter']
-    matches_semi = [m for m in matches if m['round'] == 'semi']
-    matches_final = [m for m in matches if m['round'] == 'final']
-    matches_third = [m for m in matches if m['round'] == 'third']
-    
     return render_template("admin/follower_cup_overview.html",
                          game_name=game_name,
-                         matches_eighth=matches_eighth,
-                         matches_quarter=matches_quarter,
-                         matches_semi=matches_semi,
-                         matches_final=matches_final,
-                         matches_third=matches_third)
+                         rounds=rounds,
+                         has_matches=any(r['matches'] for r in rounds),
+                         first_place=config['first_place'] if config else 33,
+                         last_place=config['first_place'] + config['layout'].entrants - 1 if config else 48)
 
 
 @app.route('/enter_follower_cup_results/<game_name>')
@@ -3416,99 +5012,26 @@ def enter_follower_cup_results(game_name):
     cursor = conn.cursor()
     
     cursor.execute("""
-        SELECT * FROM follower_cup_matches 
+        SELECT * FROM follower_cup_matches
         WHERE team1 IS NOT NULL AND team2 IS NOT NULL
-        ORDER BY 
-            CASE round 
-                WHEN 'eighth' THEN 1 
-                WHEN 'quarter' THEN 2 
-                WHEN 'semi' THEN 3 
-                WHEN 'final' THEN 4 
-                WHEN 'third' THEN 5 
-            END,
-            match_index
     """)
-    matches = cursor.fetchall()
+    rounds = get_single_elim_rounds(conn, 'follower_cup_matches', cursor.fetchall())
+    config = get_single_elim_config(conn, 'follower_cup')
     
     conn.close()
     
-    matches_eighth = [m for m in matches if m['round'] == 'eighth']
-    matches_quarter = [m for m in matches if m['round'] == 'quarter']
-    matches_semi = [m for m in matches if m['round'] == 'semi']
-    matches_final = [m for m in matches if m['round'] == 'final']
-    matches_third = [m for m in matches if m['round'] == 'third']
-    
     return render_template("admin/enter_follower_cup_results.html",
                          game_name=game_name,
-                         matches_eighth=matches_eighth,
-                         matches_quarter=matches_quarter,
-                         matches_semi=matches_semi,
-                         matches_final=matches_final,
-                         matches_third=matches_third)
+                         rounds=rounds,
+                         first_place=config['first_place'] if config else 33,
+                         last_place=config['first_place'] + config['layout'].entrants - 1 if config else 48)
 
 
 @app.route('/save_follower_cup_result/<game_name>/<int:match_id>', methods=['POST'])
 def save_follower_cup_result(game_name, match_id):
     """Follower Cup Ergebnis speichern"""
-    score1 = int(request.form['score1'])
-    score2 = int(request.form['score2'])
-    
-    if score1 > 42 or score2 > 42 or score1 < 0 or score2 < 0:
-        return render_template("admin/error.html", 
-                             error_message="Punktzahl muss zwischen 0 und 42 liegen!")
-    
-    if score1 == score2:
-        return render_template("admin/error.html", 
-                             error_message="Unentschieden nicht erlaubt!")
-    
-    db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
-    
-    conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM follower_cup_matches WHERE id = ?", (match_id,))
-    match = cursor.fetchone()
-    
-    winner = match['team1'] if score1 > score2 else match['team2']
-    loser = match['team2'] if score1 > score2 else match['team1']
-    
-    cursor.execute("""
-        UPDATE follower_cup_matches
-        SET score1 = ?, score2 = ?, winner = ?
-        WHERE id = ?
-    """, (score1, score2, winner, match_id))
-    
-    round_type = match['round']
-    match_index = match['match_index']
-    
-    if round_type == 'eighth':
-        next_match_index = match_index // 2
-        slot = 'team1' if match_index % 2 == 0 else 'team2'
-        cursor.execute(f"""
-            UPDATE follower_cup_matches
-            SET {slot} = ?
-            WHERE round = 'quarter' AND match_index = ?
-        """, (winner, next_match_index))
-    
-    elif round_type == 'quarter':
-        next_match_index = match_index // 2
-        slot = 'team1' if match_index % 2 == 0 else 'team2'
-        cursor.execute(f"""
-            UPDATE follower_cup_matches
-            SET {slot} = ?
-            WHERE round = 'semi' AND match_index = ?
-        """, (winner, next_match_index))
-    
-    elif round_type == 'semi':
-        slot_final = 'team1' if match_index == 0 else 'team2'
-        slot_third = 'team1' if match_index == 0 else 'team2'
-        cursor.execute(f"UPDATE follower_cup_matches SET {slot_final} = ? WHERE round = 'final'", (winner,))
-        cursor.execute(f"UPDATE follower_cup_matches SET {slot_third} = ? WHERE round = 'third'", (loser,))
-    
-    conn.commit()
-    conn.close()
-    
-    return redirect(url_for('enter_follower_cup_results', game_name=game_name))
+    return _save_knockout_result(game_name, 'follower_cup_matches', match_id,
+                                 'enter_follower_cup_results')
 
 
 @app.route('/reset_follower_cup/<game_name>', methods=['POST'])
@@ -3520,6 +5043,7 @@ def reset_follower_cup(game_name):
     cursor = conn.cursor()
     cursor.execute("DELETE FROM follower_quali_matches")
     cursor.execute("DELETE FROM follower_cup_matches")
+    cursor.execute("DELETE FROM bracket_config WHERE phase = 'follower_cup'")
     conn.commit()
     conn.close()
     
@@ -3532,7 +5056,7 @@ def reset_follower_cup(game_name):
 
 @app.route('/generate_placement_round/<game_name>')
 def generate_placement_round(game_name):
-    """Platzierungsrunde für Teams 37-60 generieren"""
+    """Platzierungsrunde für die restlichen Teams (P49-60) generieren"""
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     
     conn = get_db_connection(db_path)
@@ -3546,31 +5070,31 @@ def generate_placement_round(game_name):
         return render_template("admin/error.html",
                              error_message="Keine Platzierungsrunden-Teams gefunden. Bitte alle Round Robin Ergebnisse eintragen.")
 
-    cursor.execute("""
-        SELECT r.team, r.goals_for, r.goal_difference, r.points
-        FROM rankings r
-        WHERE r.team IN ({})
-        ORDER BY r.goals_for DESC, r.goal_difference DESC, r.points DESC
-    """.format(','.join('?' for _ in plz_teams_set)), list(plz_teams_set))
+    placement_teams = sort_teams_by_goals(get_ranking_snapshot(conn), plz_teams_set)
 
-    placement_teams = [row['team'] for row in cursor.fetchall()]
-    
-    match_number = 246
-    court = 1
-    
-    num_teams = len(placement_teams)
-    for i in range(num_teams // 2):
-        team1 = placement_teams[i]
-        team2 = placement_teams[-(i+1)]
-        
-        cursor.execute("""
-            INSERT INTO placement_matches 
-            (match_number, placement, team1, team2, court)
-            VALUES (?, ?, ?, ?, ?)
-        """, (match_number, f"P{37 + i*2}", team1, team2, court))
-        
-        match_number += 1
-        court = (court % 15) + 1
+    if len(placement_teams) < 2:
+        conn.close()
+        return render_template("admin/error.html",
+                             error_message="Für eine Platzierungsrunde braucht es mindestens 2 Teams.")
+
+    # Plätze nach DE + FC
+    first_place = len(de_teams_plz) + len(fc_teams_plz) + 1
+    if get_placement_ladder(conn):
+        # Platzierungsleiter: jeder Platz wird ausgespielt
+        layout = get_single_elim_layout(len(placement_teams), third_place=True, consolation=True)
+        insert_single_elim(cursor, 'placement_matches', 'placement', layout, placement_teams,
+                           reserve_match_numbers(cursor, len(layout.matches)),
+                           first_place=first_place)
+    else:
+        # Eine Runde: Bester gegen Schlechtesten, jedes Spiel entscheidet zwei Plätze
+        pairs = len(placement_teams) // 2
+        first_number = reserve_match_numbers(cursor, pairs)
+        courts = get_schedule_params(conn).courts
+        cursor.executemany("""
+            INSERT INTO placement_matches (match_number, placement, match_index, team1, team2, court)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(first_number + i, f"P{first_place + 2 * i}", i,
+               placement_teams[i], placement_teams[-(i + 1)], i % courts + 1) for i in range(pairs)])
     
     conn.commit()
     conn.close()
@@ -3617,33 +5141,8 @@ def enter_placement_results(game_name):
 @app.route('/save_placement_result/<game_name>/<int:match_id>', methods=['POST'])
 def save_placement_result(game_name, match_id):
     """Platzierungsrunde Ergebnis speichern"""
-    score1 = int(request.form['score1'])
-    score2 = int(request.form['score2'])
-    
-    if score1 > 42 or score2 > 42 or score1 < 0 or score2 < 0:
-        return render_template("admin/error.html", 
-                             error_message="Punktzahl muss zwischen 0 und 42 liegen!")
-    
-    db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
-    
-    conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM placement_matches WHERE id = ?", (match_id,))
-    match = cursor.fetchone()
-    
-    winner = match['team1'] if score1 > score2 else match['team2']
-    
-    cursor.execute("""
-        UPDATE placement_matches
-        SET score1 = ?, score2 = ?, winner = ?
-        WHERE id = ?
-    """, (score1, score2, winner, match_id))
-    
-    conn.commit()
-    conn.close()
-    
-    return redirect(url_for('enter_placement_results', game_name=game_name))
+    return _save_knockout_result(game_name, 'placement_matches', match_id,
+                                 'enter_placement_results', allow_draw=True)
 
 
 @app.route('/reset_placement/<game_name>', methods=['POST'])
@@ -3654,6 +5153,8 @@ def reset_placement(game_name):
     conn = get_db_connection(db_path)
     cursor = conn.cursor()
     cursor.execute("DELETE FROM placement_matches")
+    # Leiter-Option bleibt für die nächste Generierung erhalten
+    cursor.execute("UPDATE bracket_config SET entrants = 0 WHERE phase = 'placement'")
     conn.commit()
     conn.close()
     
@@ -3674,6 +5175,7 @@ def tournament_config(game_name):
     
     cursor.execute("SELECT * FROM tournament_config WHERE game_name = ?", (game_name,))
     config = cursor.fetchone()
+    placement_ladder = get_placement_ladder(conn)
     
     conn.close()
     
@@ -3682,12 +5184,14 @@ def tournament_config(game_name):
             'match_duration': 12,
             'break_between_games': 3,
             'break_between_rounds': 5,
-            'start_time': '09:00'
+            'start_time': '09:00',
+            'courts': DEFAULT_COURTS
         }
     
     return render_template("admin/tournament_config.html",
                          game_name=game_name,
-                         config=config)
+                         config=config,
+                         placement_ladder=placement_ladder)
 
 
 @app.route('/update_tournament_config/<game_name>', methods=['POST'])
@@ -3696,6 +5200,10 @@ def update_tournament_config(game_name):
     match_duration = int(request.form['match_duration'])
     break_between_games = int(request.form['break_between_games'])
     start_time = request.form['start_time']
+    try:
+        courts = parse_court_count(request.form.get('courts', DEFAULT_COURTS))
+    except ValueError as e:
+        return render_template("admin/error.html", error_message=str(e))
     
     # NEU: Mittagspause
     lunch_break_enabled = 1 if request.form.get('lunch_break_enabled') == 'on' else 0
@@ -3714,11 +5222,13 @@ def update_tournament_config(game_name):
             start_time = ?,
             lunch_break_enabled = ?,
             lunch_break_start = ?,
-            lunch_break_end = ?
+            lunch_break_end = ?,
+            courts = ?
         WHERE game_name = ?
     """, (match_duration, break_between_games, start_time,
-          lunch_break_enabled, lunch_break_start, lunch_break_end,
+          lunch_break_enabled, lunch_break_start, lunch_break_end, courts,
           game_name))
+    set_placement_ladder(conn, request.form.get('placement_ladder') == 'on')
     
     conn.commit()
     conn.close()
@@ -3730,6 +5240,93 @@ def update_tournament_config(game_name):
 # DISPLAY-BEREICH (Beamer/Publikum)
 # ============================================================================
 
+# ── Response-Cache für Display-JSON ──────────────────────────────────────────
+# Die Beamer pollen alle paar Sekunden. Antworten werden pro Turnier, Endpoint
+# und Daten-Version gecacht; unveränderte Polls bekommen 304 ohne Neuberechnung.
+
+_DISPLAY_ETAG_PREFIX = os.urandom(4).hex()   # neuer Code nach Neustart → neue ETags
+_display_response_cache = {}
+_display_response_cache_lock = threading.Lock()
+
+
+def cached_display_json(view):
+    """Decorator: Cache + starke ETags für JSON-Routen mit <game_name>"""
+    @functools.wraps(view)
+    def wrapper(game_name):
+        db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
+        if not os.path.exists(db_path):
+            return view(game_name)
+
+        conn = get_db_connection(db_path)
+        version = get_data_version(conn)
+        conn.close()
+
+        etag = f"{_DISPLAY_ETAG_PREFIX}-{view.__name__}-{version}"
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+
+        key = (os.path.abspath(db_path), view.__name__)
+        with _display_response_cache_lock:
+            cached = _display_response_cache.get(key)
+        if cached and cached[0] == version:
+            body = cached[1]
+        else:
+            response = view(game_name)
+            if response.status_code != 200:
+                return response
+            body = response.get_data()
+            with _display_response_cache_lock:
+                _display_response_cache[key] = (version, body)
+
+        response = app.response_class(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return wrapper
+
+
+# ── Push-Kanal für Display-Seiten (Server-Sent Events) ───────────────────────
+
+SSE_KEEPALIVE_SECONDS = 15
+
+
+@app.route('/api/display/<game_name>/events')
+def api_display_events(game_name):
+    """SSE-Stream: sendet 'changed' mit der neuen Daten-Version nach jeder Änderung"""
+    db_path = os.path.abspath(os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db"))
+    if not os.path.exists(db_path):
+        return jsonify({'error': 'Turnier nicht gefunden'}), 404
+
+    def read_version():
+        # Bewusst ausserhalb des App-Contexts: Verbindung nur kurz aus dem Pool
+        conn = _acquire_db_connection(db_path)
+        try:
+            return get_data_version(conn)
+        finally:
+            release_db_connection(conn)
+
+    def stream():
+        last_version = None
+        seen = _data_changes[db_path]
+        yield "retry: 3000\n\n"
+        while True:
+            version = read_version()
+            if version != last_version:
+                last_version = version
+                yield f"event: changed\ndata: {json.dumps({'version': version})}\n\n"
+            else:
+                yield ": keepalive\n\n"
+            # Änderungen anderer Prozesse erkennt spätestens der Timeout
+            seen = wait_for_data_change(db_path, seen, SSE_KEEPALIVE_SECONDS)
+
+    response = app.response_class(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @app.route('/display/<game_name>')
 def display_home(game_name):
     """Display Startseite"""
@@ -3742,21 +5339,11 @@ def display_groups(game_name):
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     
     conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    
-    groups = {}
-    for group_num in range(1, 11):
-        cursor.execute("""
-            SELECT r.*, t.is_ghost
-            FROM rankings r
-            LEFT JOIN teams t ON r.team = t.name
-            WHERE r.group_number = ?
-            ORDER BY r.points DESC, r.goal_difference DESC, r.goals_for DESC
-        """, (group_num,))
-        groups[group_num] = cursor.fetchall()
-    
+    snap = get_ranking_snapshot(conn)
     conn.close()
     
+    groups = {group_num: snap['groups'].get(group_num, []) for group_num in range(1, 11)}
+    
     return render_template("display/display_groups.html",
                          game_name=game_name,
                          groups=groups)
@@ -3769,150 +5356,131 @@ def display_round_robin(game_name):
 
 
 @app.route('/api/display/<game_name>/groups_json')
+@cached_display_json
 def api_groups_json(game_name):
     """JSON API: Aktuelle Gruppentabellen mit Phase-Feld fuer Live-Polling"""
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     if not os.path.exists(db_path):
         return jsonify({})
     conn = get_db_connection(db_path)
+    snap = get_ranking_snapshot(conn)
+    conn.close()
 
-    # Phasenzuteilung berechnen
-    try:
-        de_teams, fc_teams, plz_teams, best2, rest8 = get_phase_assignment(conn)
-        wc_teams = set(f['team'] for f in best2)
-    except Exception:
-        de_teams = fc_teams = plz_teams = wc_teams = set()
-
-    def get_phase(team):
-        if team in wc_teams:  return 'DE*'
-        if team in de_teams:  return 'DE'
-        if team in fc_teams:  return 'FC'
-        return 'PLZ'
-
-    cursor = conn.cursor()
+    fields = ('team', 'points', 'goal_difference', 'goals_for',
+              'matches_played', 'wins', 'losses')
     groups = {}
     for group_num in range(1, 11):
-        cursor.execute("""
-            SELECT r.team, r.points, r.goal_difference, r.goals_for,
-                   r.matches_played, r.wins, r.losses
-            FROM rankings r
-            LEFT JOIN teams t ON r.team = t.name
-            WHERE r.group_number = ? AND (t.is_ghost IS NULL OR t.is_ghost = 0)
-            ORDER BY r.points DESC, r.goal_difference DESC, r.goals_for DESC
-        """, (group_num,))
-        rows = cursor.fetchall()
-        result = []
-        for row in rows:
-            d = dict(row)
-            d['phase'] = get_phase(d['team'])
-            result.append(d)
-        groups[group_num] = result
-
-    conn.close()
+        groups[group_num] = [
+            dict({f: t[f] for f in fields}, phase=snap['phase'].get(t['team'], 'PLZ'))
+            for t in snap['real_groups'].get(group_num, [])
+        ]
     return jsonify(groups)
 
 
 @app.route('/api/display/<game_name>/bracket_standings_json')
+@cached_display_json
 def api_bracket_standings_json(game_name):
     """JSON API: Bracket Standings fuer Live-Polling"""
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     if not os.path.exists(db_path):
         return jsonify({'A': [], 'B': []})
     conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    result = {}
-    for bracket, table in [('A', 'double_elim_matches_a'), ('B', 'double_elim_matches_b')]:
-        cursor.execute(f"""
-            SELECT DISTINCT team1 as team FROM {table} WHERE team1 IS NOT NULL AND team1 != ''
-            UNION
-            SELECT DISTINCT team2 as team FROM {table} WHERE team2 IS NOT NULL AND team2 != ''
-        """)
-        all_teams = set(row['team'] for row in cursor.fetchall())
-        cursor.execute(f"""
-            SELECT DISTINCT loser as team FROM {table}
-            WHERE bracket = 'Losers' AND loser IS NOT NULL AND loser != ''
-        """)
-        eliminated = set(row['team'] for row in cursor.fetchall())
-        team_status = {}
-        for team in all_teams:
-            cursor.execute(f"""
-                SELECT MAX(round) as max_round, bracket
-                FROM {table}
-                WHERE (team1 = ? OR team2 = ?) AND winner IS NOT NULL
-                GROUP BY bracket
-                ORDER BY MAX(round) DESC
-                LIMIT 1
-            """, (team, team))
-            row = cursor.fetchone()
-            if team in eliminated:
-                status = "Ausgeschieden"
-            elif row:
-                b = "WB" if row['bracket'] == 'Winners' else "LB"
-                status = f"{b} R{row['max_round']}"
-            else:
-                status = "WB R1"
-            team_status[team] = {'team': team, 'status': status, 'eliminated': team in eliminated}
-        def sort_key(t):
-            if not t['eliminated']:
-                return (0, -int(t['status'].split('R')[-1]) if 'R' in t['status'] else 0)
-            return (1, 0)
-        result[bracket] = sorted(team_status.values(), key=sort_key)
+    bracket_status = get_bracket_status(conn)
     conn.close()
+    result = {
+        bracket_id: [{'team': t.team, 'status': t.status, 'eliminated': t.eliminated,
+                      'side': t.side, 'round': t.round} for t in statuses]
+        for bracket_id, statuses in bracket_status.items()
+    }
     return jsonify(result)
 
 
+@app.route('/api/display/<game_name>/qualification_scenarios_json')
+@cached_display_json
+def api_qualification_scenarios_json(game_name):
+    """JSON API: sicher/möglich/ausgeschlossen pro Phase, Teams in Tabellenreihenfolge"""
+    db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
+    if not os.path.exists(db_path):
+        return jsonify({'available': False, 'open_matches': 0, 'groups': {}})
+    conn = get_db_connection(db_path)
+    scenarios = get_qualification_scenarios(conn)
+    snap = get_ranking_snapshot(conn)
+    conn.close()
+
+    groups = {}
+    for group_num, teams in snap['real_groups'].items():
+        groups[group_num] = [
+            dict({phase: scenarios['teams'][t['team']][phase] for phase in QUALIFICATION_PHASES},
+                 team=t['team'])
+            for t in teams if t['team'] in scenarios['teams']
+        ]
+    return jsonify({'available': True, 'open_matches': scenarios['open_matches'],
+                    'exact': scenarios['exact'], 'groups': groups})
+
+
+@app.route('/api/display/<game_name>/win_probabilities_json')
+@cached_display_json
+def api_win_probabilities_json(game_name):
+    """JSON API: Siegwahrscheinlichkeiten (Monte-Carlo) je K.o.-Phase, absteigend sortiert"""
+    db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
+    if not os.path.exists(db_path):
+        return jsonify({'runs': 0, 'probabilities': {}})
+    conn = get_db_connection(db_path)
+    try:
+        result = get_win_probabilities(conn)
+    except ImportError:
+        response = jsonify({'error': 'numpy ist nicht installiert'})
+        response.status_code = 503
+        return response
+    finally:
+        conn.close()
+    return jsonify({
+        'runs': result['runs'],
+        'probabilities': {
+            name: [{'team': team, 'probability': round(p, 4)}
+                   for team, p in sorted(teams.items(), key=lambda x: (-x[1], x[0]))]
+            for name, teams in result['probabilities'].items()
+        },
+    })
+
+
+@app.route('/api/display/<game_name>/next_up_json')
+@cached_display_json
+def api_next_up_json(game_name):
+    """JSON API: Ansage-Warteschlange der K.o.-Phasen (Feld, Startzeit, Teams)"""
+    db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
+    if not os.path.exists(db_path):
+        return jsonify([])
+    conn = get_db_connection(db_path)
+    queue = get_next_up(conn)
+    conn.close()
+    fields = ('table', 'match_number', 'team1', 'team2', 'court', 'time')
+    return jsonify([{f: m[f] for f in fields} for m in queue])
+
+
 @app.route('/display/<game_name>/qualification_tree')
 def display_qualification_tree(game_name):
     """Qualifikationsbaum für Beamer"""
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     
     conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    
-    groups_a = {}
-    for group_num in range(1, 6):
-        cursor.execute("""
-            SELECT team FROM rankings 
-            WHERE group_number = ?
-            AND team NOT IN (SELECT name FROM teams WHERE is_ghost = 1)
-            ORDER BY points DESC, goal_difference DESC, goals_for DESC
-            LIMIT 3
-        """, (group_num,))
-        groups_a[group_num] = [row['team'] for row in cursor.fetchall()]
-    
-    groups_b = {}
-    for group_num in range(6, 11):
-        cursor.execute("""
-            SELECT team FROM rankings 
-            WHERE group_number = ?
-            AND team NOT IN (SELECT name FROM teams WHERE is_ghost = 1)
-            ORDER BY points DESC, goal_difference DESC, goals_for DESC
-            LIMIT 3
-        """, (group_num,))
-        groups_b[group_num] = [row['team'] for row in cursor.fetchall()]
-    
-    cursor.execute("""
-        SELECT r.team, r.group_number
-        FROM rankings r
-        WHERE (SELECT COUNT(*) FROM rankings r2 
-               WHERE r2.group_number = r.group_number 
-               AND (r2.points > r.points 
-                    OR (r2.points = r.points AND r2.goal_difference > r.goal_difference)
-                    OR (r2.points = r.points AND r2.goal_difference = r.goal_difference 
-                        AND r2.goals_for > r.goals_for))) = 3
-        AND r.team NOT IN (SELECT name FROM teams WHERE is_ghost = 1)
-        ORDER BY r.points DESC, r.goal_difference DESC, r.goals_for DESC
-        LIMIT 2
-    """)
-    best_4th = cursor.fetchall()
-    
+    snap = get_ranking_snapshot(conn)
+    bracket_status = get_bracket_status(conn)
     conn.close()
+
+    def top3(group_num):
+        return [t['team'] for t in snap['real_groups'].get(group_num, [])[:3]]
+
+    groups_a = {group_num: top3(group_num) for group_num in range(1, 6)}
+    groups_b = {group_num: top3(group_num) for group_num in range(6, 11)}
+    best_4th = [{'team': f['team'], 'group_number': f['group']} for f in snap['best2']]
     
     return render_template("display/display_qualification_tree.html",
                          game_name=game_name,
                          groups_a=groups_a,
                          groups_b=groups_b,
-                         best_4th=best_4th)
+                         best_4th=best_4th,
+                         bracket_status=bracket_status)
 
 
 @app.route('/display/<game_name>/brackets')
@@ -3921,26 +5489,13 @@ def display_brackets(game_name):
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     
     conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT * FROM double_elim_matches_a 
-        ORDER BY round, bracket DESC, match_index
-    """)
-    matches_a = cursor.fetchall()
-    
-    cursor.execute("""
-        SELECT * FROM double_elim_matches_b 
-        ORDER BY round, bracket DESC, match_index
-    """)
-    matches_b = cursor.fetchall()
-    
+    brackets = get_double_elim_matches(conn)
     conn.close()
     
     return render_template("display/display_brackets.html",
                          game_name=game_name,
-                         matches_a=matches_a,
-                         matches_b=matches_b)
+                         matches_a=brackets['A'],
+                         matches_b=brackets['B'])
 
 
 @app.route('/display/<game_name>/super_finals')
@@ -3978,19 +5533,9 @@ def display_follower_cup(game_name):
     conn = get_db_connection(db_path)
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT * FROM follower_cup_matches 
-        ORDER BY 
-            CASE round 
-                WHEN 'eighth' THEN 1 
-                WHEN 'quarter' THEN 2 
-                WHEN 'semi' THEN 3 
-                WHEN 'final' THEN 4 
-                WHEN 'third' THEN 5 
-            END,
-            match_index
-    """)
-    matches = cursor.fetchall()
+    cursor.execute("SELECT * FROM follower_cup_matches")
+    rounds = get_single_elim_rounds(conn, 'follower_cup_matches', cursor.fetchall())
+    matches = [m for r in rounds for m in r['matches']]
     
     conn.close()
     
@@ -4553,16 +6098,11 @@ def export_rankings(game_name):
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     
     conn = get_db_connection(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT * FROM rankings 
-        ORDER BY group_number, points DESC, goal_difference DESC
-    """)
-    rankings = cursor.fetchall()
-    
+    snap = get_ranking_snapshot(conn)
     conn.close()
     
+    rankings = [rank for group_num in sorted(snap['groups']) for rank in snap['groups'][group_num]]
+    
     output = io.StringIO()
     writer = csv.writer(output)
     
@@ -4605,20 +6145,13 @@ def export_complete(game_name):
     writer.writerow(['GRUPPENTABELLEN'])
     writer.writerow([])
     
+    snap = get_ranking_snapshot(conn)
     for group_num in range(1, 11):
         writer.writerow([f'Gruppe {group_num}'])
         writer.writerow(['Platz', 'Team', 'Spiele', 'S', 'U', 'N', 'Tore+', 'Tore-', 'Diff', 'Punkte'])
         
-        cursor.execute("""
-            SELECT r.*, t.is_ghost
-            FROM rankings r
-            LEFT JOIN teams t ON r.team = t.name
-            WHERE r.group_number = ?
-            ORDER BY r.points DESC, r.goal_difference DESC, r.goals_for DESC
-        """, (group_num,))
-        
         position = 1
-        for rank in cursor.fetchall():
+        for rank in snap['groups'].get(group_num, []):
             ghost_marker = ' (Ghost)' if rank['is_ghost'] else ''
             writer.writerow([
                 position, 
@@ -4636,33 +6169,25 @@ def export_complete(game_name):
         
         writer.writerow([])
     
-    writer.writerow(['BRACKET A - DOUBLE ELIMINATION'])
-    writer.writerow(['Spiel#', 'Runde', 'Bracket', 'Team 1', 'Score 1', 'Score 2', 'Team 2', 'Gewinner'])
-    
-    cursor.execute("SELECT * FROM double_elim_matches_a ORDER BY round, bracket DESC, match_index")
-    for match in cursor.fetchall():
-        writer.writerow([
-            match['match_number'] or '',
-            match['round'],
-            match['bracket'],
-            match['team1'] or 'TBD',
-            match['score1'] or '',
-            match['score2'] or '',
-            match['team2'] or 'TBD',
-            match['winner'] or ''
-        ])
-    
-    writer.writerow([])
-    
-    writer.writerow(['BRACKET B - DOUBLE ELIMINATION'])
-    writer.writerow(['Spiel#', 'Runde', 'Bracket', 'Team 1', 'Score 1', 'Score 2', 'Team 2', 'Gewinner'])
-    
-    cursor.execute("SELECT * FROM double_elim_matches_b ORDER BY round, bracket DESC, match_index")
+    # Alle K.o.-Phasen in einer Abfrage; Double Elimination nach Runde, Rest nach Spielnummer
+    cursor.execute("""
+        SELECT * FROM all_matches WHERE source != 'matches'
+        ORDER BY phase_order, bracket_id,
+                 CASE WHEN bracket_id IS NULL THEN match_number ELSE round END,
+                 bracket DESC, match_index
+    """)
+    phase = None
     for match in cursor.fetchall():
+        if match['phase'] != phase:
+            if phase is not None:
+                writer.writerow([])
+            phase = match['phase']
+            writer.writerow([phase.upper()])
+            writer.writerow(['Spiel#', 'Runde', 'Bracket', 'Team 1', 'Score 1', 'Score 2', 'Team 2', 'Gewinner'])
         writer.writerow([
             match['match_number'] or '',
-            match['round'],
-            match['bracket'],
+            match['round'] or '',
+            match['bracket'] or '',
             match['team1'] or 'TBD',
             match['score1'] or '',
             match['score2'] or '',
@@ -4694,9 +6219,10 @@ def debug_bracket(game_name, bracket_id):
     conn = get_db_connection(db_path)
     cursor = conn.cursor()
     
-    table = f"double_elim_matches_{bracket_id.lower()}"
-    
-    cursor.execute(f"SELECT * FROM {table} ORDER BY round, bracket DESC, match_index")
+    cursor.execute("""
+        SELECT * FROM double_elim_matches WHERE bracket_id = ?
+        ORDER BY round, bracket DESC, match_index
+    """, (bracket_id.upper(),))
     matches = cursor.fetchall()
     
     conn.close()
@@ -4810,34 +6336,75 @@ def debug_follower_cup(game_name):
 # STATISTIKEN & SCHLUSSRANGLISTE
 # ============================================================================
 
-def _get_total_stats(cursor, team):
-    """Gesamte Goals + Differenz über ALLE Phasen"""
-    gf = gd = 0
-    for table, t1f, s1f, t2f, s2f in [
-        ('matches','team1','score1','team2','score2'),
-        ('double_elim_matches','team1','score1','team2','score2'),
-        ('follower_cup_matches','team1','score1','team2','score2'),
-        ('placement_matches','team1','score1','team2','score2'),
-    ]:
-        try:
-            cursor.execute(f"SELECT {s1f},{s2f} FROM {table} WHERE {t1f}=? AND {s1f} IS NOT NULL",(team,))
-            for r in cursor.fetchall(): gf+=r[0]; gd+=(r[0]-r[1])
-            cursor.execute(f"SELECT {s1f},{s2f} FROM {table} WHERE {t2f}=? AND {s1f} IS NOT NULL",(team,))
-            for r in cursor.fetchall(): gf+=r[1]; gd+=(r[1]-r[0])
-        except Exception: pass
-    return gf, gd
+# Alle gespielten Matches aller Phasen
+SCORED_MATCHES_SQL = """
+    SELECT team1, team2, score1, score2, phase FROM all_matches
+    WHERE score1 IS NOT NULL AND score2 IS NOT NULL
+"""
+
+
+def rebuild_team_totals(cursor):
+    """team_totals in einem Durchgang über alle Match-Tabellen neu aufbauen"""
+    cursor.execute("DELETE FROM team_totals")
+    cursor.execute(f"""
+        INSERT INTO team_totals (team, games, wins, goals_for, goals_against)
+        SELECT team, COUNT(*), SUM(gf > ga), SUM(gf), SUM(ga)
+        FROM (
+            SELECT team1 AS team, score1 AS gf, score2 AS ga FROM ({SCORED_MATCHES_SQL})
+            UNION ALL
+            SELECT team2, score2, score1 FROM ({SCORED_MATCHES_SQL})
+        )
+        WHERE team IS NOT NULL
+        GROUP BY team
+    """)
+
+
+def get_team_matches(conn, team):
+    """
+    Alle Spiele eines Teams über alle Phasen aus Sicht des Teams
+    (score1 = eigene Punkte), nach Spielnummer sortiert
+    """
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT * FROM (
+            SELECT source, phase, round, id, match_number, court, time, start_min,
+                   team2 AS opponent, score1, score2
+            FROM all_matches WHERE team1 = ?
+            UNION ALL
+            SELECT source, phase, round, id, match_number, court, time, start_min,
+                   team1, score2, score1
+            FROM all_matches WHERE team2 = ?
+        )
+        ORDER BY match_number IS NULL, match_number, start_min
+    """, (team, team))
+    return [dict(r) for r in cursor.fetchall()]
+
+
+def get_team_totals(conn):
+    """Gesamtstatistik aller Teams: {team: {'games','wins','goals_for','goal_difference'}}"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT team, games, wins, goals_for, goals_for - goals_against AS goal_difference
+        FROM team_totals
+    """)
+    return {r['team']: dict(r) for r in cursor.fetchall()}
 
 
 def _compute_final_rankings(conn):
     """Vollständige Schlussrangliste P1-P60 — robust gegen fehlende Ergebnisse"""
-    import functools
     cursor = conn.cursor()
     rankings = []
     placed = set()
+    totals = get_team_totals(conn)
+
+    def total_stats(team):
+        """Gesamte Goals + Differenz über ALLE Phasen"""
+        t = totals.get(team)
+        return (t['goals_for'], t['goal_difference']) if t else (0, 0)
 
     def add(place, team, phase):
         if team and team not in placed:
-            gf, gd = _get_total_stats(cursor, team)
+            gf, gd = total_stats(team)
             rankings.append({'place': place, 'team': team, 'phase': phase,
                              'total_goals': gf, 'goal_diff': gd})
             placed.add(team)
@@ -4846,7 +6413,7 @@ def _compute_final_rankings(conn):
         enriched = []
         for t in teams:
             if t and t not in placed:
-                gf, gd = _get_total_stats(cursor, t)
+                gf, gd = total_stats(t)
                 enriched.append((t, gf, gd))
         enriched.sort(key=lambda x: (-x[1], -x[2]))
         for i, (t, gf, gd) in enumerate(enriched):
@@ -4873,11 +6440,13 @@ def _compute_final_rankings(conn):
     else:
         # Fallback: WB Sieger + LB Final Sieger
         # WB Final Sieger (WB R4) aus beiden Brackets
-        for tbl in ['double_elim_matches_a', 'double_elim_matches_b']:
-            cursor.execute(f"SELECT winner FROM {tbl} WHERE bracket='Winners' AND round=4 AND winner IS NOT NULL LIMIT 1")
+        for bracket_id, layout in get_bracket_layouts(conn).items():
+            cursor.execute("SELECT winner FROM double_elim_matches WHERE bracket_id=? AND bracket='Winners' AND round=? AND winner IS NOT NULL LIMIT 1",
+                           (bracket_id, layout.wb_rounds))
             r = cursor.fetchone()
             if r: add(1, r['winner'], 'WB Sieger')
-            cursor.execute(f"SELECT winner FROM {tbl} WHERE bracket='Losers' AND round=8 AND winner IS NOT NULL LIMIT 1")
+            cursor.execute("SELECT winner FROM double_elim_matches WHERE bracket_id=? AND bracket='Losers' AND round=? AND winner IS NOT NULL LIMIT 1",
+                           (bracket_id, layout.lb_rounds))
             r = cursor.fetchone()
             if r: add(2, r['winner'], 'LB Sieger')
 
@@ -4891,35 +6460,27 @@ def _compute_final_rankings(conn):
         if hf_loser: add(3, hf_loser, 'HF Verlierer')
 
     # ── P5-P32: DE Verlierer — LB Runden von hinten ──────────────────────────
-    # Korrekte Plätze für 32-Team DE:
-    # LB R9 Final Verlierer → P3 (schon oben), Sieger → P2 (schon oben)
-    # LB R8 Verlierer (1 Team) → P5
-    # LB R7 Verlierer (1 Team) → P6
-    # LB R6 Verlierer (2 Teams) → P7-8
-    # LB R5 Verlierer (2 Teams) → P9-10
-    # LB R4 Verlierer (4 Teams) → P11-14
-    # LB R3 Verlierer (4 Teams) → P15-18
-    # LB R2 Verlierer (8 Teams) → P19-26
-    # LB R1 Verlierer (8 Teams) → P27-34 → aber nur bis P32
-    # LB: R8=LB Final Verlierer→P5, R7→P6, R6(2)→P7-8, R5(2)→P9-10,
-    #       R4(4)→P11-14, R3(4)→P15-18, R2(8)→P19-26, R1(8)→P27-34
-    lb_placement = [(8, 5, 1), (7, 6, 1), (6, 7, 2), (5, 9, 2),
-                    (4, 11, 4), (3, 15, 4), (2, 19, 8), (1, 27, 8)]
-    for lb_rnd, start, count in lb_placement:
-        losers = []
-        for tbl in ['double_elim_matches_a', 'double_elim_matches_b']:
-            cursor.execute(f"""SELECT loser FROM {tbl}
-                WHERE bracket='Losers' AND round=? AND loser IS NOT NULL
-                ORDER BY match_index""", (lb_rnd,))
-            losers += [r['loser'] for r in cursor.fetchall()]
+    # LB Final Sieger → P2 (schon oben), danach die Verlierer jeder LB-Runde
+    # von hinten nach vorne, je Runde so viele Plätze wie Spiele aller Brackets.
+    # 16er-Brackets: R6→P5-6, R5→P7-8, R4→P9-12, R3→P13-16, R2→P17-24, R1→P25-32
+    de_layouts = (list(get_bracket_layouts(conn).values())
+                  or [get_double_elim_layout(DE_BRACKET_SIZE)])
+    lb_rounds = max(l.lb_rounds for l in de_layouts)
+    wb_rounds = max(l.wb_rounds for l in de_layouts)
+    start = 5
+    for lb_rnd in range(lb_rounds, 0, -1):
+        cursor.execute("""SELECT loser FROM double_elim_matches
+            WHERE bracket='Losers' AND round=? AND loser IS NOT NULL
+            ORDER BY bracket_id, match_index""", (lb_rnd,))
+        losers = [r['loser'] for r in cursor.fetchall()]
         add_sorted(start, losers, f'DE P{start}+')
+        start += sum(l.lb_matches[lb_rnd] for l in de_layouts if lb_rnd <= l.lb_rounds)
 
     # WB Verlierer aus früheren Runden (die nicht via LB weitergekommen sind)
-    for wb_rnd in range(1, 5):
-        for tbl in ['double_elim_matches_a', 'double_elim_matches_b']:
-            cursor.execute(f"""SELECT loser FROM {tbl}
-                WHERE bracket='Winners' AND round=? AND loser IS NOT NULL
-                ORDER BY match_index""", (wb_rnd,))
+    for wb_rnd in range(1, wb_rounds + 1):
+        cursor.execute("""SELECT loser FROM double_elim_matches
+            WHERE bracket='Winners' AND round=? AND loser IS NOT NULL
+            ORDER BY bracket_id, match_index""", (wb_rnd,))
         losers = [r['loser'] for r in cursor.fetchall()]
         # Nur jene die noch nicht platziert sind (= durch LB ausgeschieden)
         unplaced_losers = [l for l in losers if l not in placed]
@@ -4963,9 +6524,13 @@ def _compute_final_rankings(conn):
         add_sorted(next_p, unplaced_fc, 'FC (nicht gespielt)')
 
     # ── P49-P60: Platzierungsrunde ────────────────────────────────────────────
+    # Platzierungsleiter: nur Spiele, die zwei Plätze direkt entscheiden
+    # (placement = 'P53'); Zwischenrunden tragen einen Bereich ('P49-56')
     cursor.execute("SELECT * FROM placement_matches ORDER BY placement")
     for m in cursor.fetchall():
         plz_str = m['placement'] or 'P49'
+        if '-' in plz_str:
+            continue
         plz_num = int(plz_str[1:]) if plz_str.startswith('P') and plz_str[1:].isdigit() else 49
         if m['winner'] and m['team1'] and m['team2']:
             loser_plz = m['team2'] if m['winner'] == m['team1'] else m['team1']
@@ -5007,55 +6572,39 @@ def _compute_tournament_facts(conn):
     """Interessante Turnier-Statistiken"""
     cursor = conn.cursor()
     facts = []
-    all_matches = []
-    for table, phase in [
-        ('matches','Round Robin'),
-        ('double_elim_matches_a','Double Elimination A'),
-        ('double_elim_matches_b','Double Elimination B'),
-        ('follower_cup_matches','Follower Cup'),
-        ('placement_matches','Platzierungsrunde'),
-    ]:
-        try:
-            cursor.execute(f"SELECT team1,team2,score1,score2 FROM {table} WHERE score1 IS NOT NULL AND score2 IS NOT NULL")
-            for r in cursor.fetchall():
-                all_matches.append({'team1':r['team1'],'team2':r['team2'],
-                                    'score1':r['score1'],'score2':r['score2'],'phase':phase})
-        except Exception: pass
+    scored = SCORED_MATCHES_SQL
 
-    if not all_matches:
+    cursor.execute(f"SELECT COUNT(*) AS games, SUM(score1 + score2) AS points FROM ({scored})")
+    summary = cursor.fetchone()
+    if not summary['games']:
         return facts
 
-    total_g = len(all_matches)
-    total_pts = sum(m['score1']+m['score2'] for m in all_matches)
+    total_g = summary['games']
+    total_pts = summary['points']
     avg = round(total_pts/total_g, 1)
     facts.append({'label':'Total Spiele gespielt','value':str(total_g)})
     facts.append({'label':'Total geworfene Punkte','value':str(total_pts)})
     facts.append({'label':'Ø Punkte pro Spiel','value':str(avg)})
 
-    best = max(all_matches, key=lambda m: abs(m['score1']-m['score2']))
+    cursor.execute(f"SELECT * FROM ({scored}) ORDER BY ABS(score1 - score2) DESC LIMIT 1")
+    best = cursor.fetchone()
     bw = best['team1'] if best['score1']>best['score2'] else best['team2']
     bl = best['team2'] if best['score1']>best['score2'] else best['team1']
     bws,bls = (best['score1'],best['score2']) if best['score1']>best['score2'] else (best['score2'],best['score1'])
     facts.append({'label':'Höchster Sieg','value':f"{bw} {bws}:{bls} gegen {bl} ({best['phase']})"})
 
-    close = min(all_matches, key=lambda m: abs(m['score1']-m['score2']))
+    cursor.execute(f"SELECT * FROM ({scored}) ORDER BY ABS(score1 - score2) LIMIT 1")
+    close = cursor.fetchone()
     facts.append({'label':'Engster Match','value':f"{close['team1']} {close['score1']}:{close['score2']} {close['team2']} ({close['phase']})"})
 
-    tg = {}; tw = {}; tgames = {}
-    for m in all_matches:
-        tg[m['team1']] = tg.get(m['team1'],0)+m['score1']
-        tg[m['team2']] = tg.get(m['team2'],0)+m['score2']
-        w = m['team1'] if m['score1']>m['score2'] else m['team2']
-        tw[w] = tw.get(w,0)+1
-        tgames[m['team1']] = tgames.get(m['team1'],0)+1
-        tgames[m['team2']] = tgames.get(m['team2'],0)+1
-
-    if tg:
-        top_tg = max(tg, key=tg.get)
-        facts.append({'label':'Meiste Punkte gesamt','value':f"{top_tg} — {tg[top_tg]} Punkte"})
-    if tw:
-        top_tw = max(tw, key=tw.get)
-        facts.append({'label':'Meiste Siege gesamt','value':f"{top_tw} — {tw[top_tw]} Siege"})
+    cursor.execute("SELECT team, goals_for FROM team_totals WHERE games > 0 ORDER BY goals_for DESC LIMIT 1")
+    top_tg = cursor.fetchone()
+    if top_tg:
+        facts.append({'label':'Meiste Punkte gesamt','value':f"{top_tg['team']} — {top_tg['goals_for']} Punkte"})
+    cursor.execute("SELECT team, wins FROM team_totals WHERE wins > 0 ORDER BY wins DESC LIMIT 1")
+    top_tw = cursor.fetchone()
+    if top_tw:
+        facts.append({'label':'Meiste Siege gesamt','value':f"{top_tw['team']} — {top_tw['wins']} Siege"})
     return facts
 
 
@@ -5186,18 +6735,41 @@ def recalculate_all_times(game_name):
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     conn = get_db_connection(db_path)
     cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) as c FROM double_elim_matches_a WHERE time IS NOT NULL")
+    cursor.execute("SELECT COUNT(*) as c FROM double_elim_matches WHERE time IS NOT NULL")
     if cursor.fetchone()['c'] > 0:
-        calculate_double_elim_times(conn, 'double_elim_matches_a')
-        calculate_double_elim_times(conn, 'double_elim_matches_b')
-    cursor.execute("SELECT COUNT(*) as c FROM super_finals_matches")
-    if cursor.fetchone()['c'] > 0:
-        calculate_super_finals_times(conn)
+        calculate_knockout_times(conn)
     conn.close()
     return redirect(url_for('game_overview', game_name=game_name))
 
 
+@app.route('/reschedule_delay/<game_name>', methods=['POST'])
+def reschedule_delay(game_name):
+    """
+    Verspätung melden, nur abhängige Spiele verschieben.
+    Formular: court + finished_at ('HH:MM') oder round + minutes [+ table]
+    """
+    db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
+    if not os.path.exists(db_path):
+        return jsonify({'ok': False, 'error': 'Turnier nicht gefunden'}), 404
+
+    conn = get_db_connection(db_path)
+    try:
+        if request.form.get('court'):
+            result = reschedule_court_finished(conn, int(request.form['court']),
+                                               request.form['finished_at'])
+        else:
+            result = reschedule_round_delay(conn, request.form['round'],
+                                            int(request.form['minutes']),
+                                            request.form.get('table', 'matches'))
+    except (KeyError, ValueError) as e:
+        return jsonify({'ok': False, 'error': f"Ungültige Angabe: {e}"}), 400
+    finally:
+        conn.close()
+    return jsonify(dict(result, ok=True))
+
+
 @app.route('/api/display/<game_name>/final_rankings_json')
+@cached_display_json
 def api_display_final_rankings(game_name):
     """JSON API: Schlussrangliste für Display"""
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
@@ -5217,31 +6789,43 @@ def api_display_final_rankings(game_name):
     return jsonify({'winner': winner, 'rankings': rankings})
 
 
+@app.route('/api/court/<game_name>/<int:court>')
+def api_court_status(game_name, court):
+    """JSON API: was läuft auf Feld X jetzt und als Nächstes (?now=HH:MM optional)"""
+    db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
+    if not os.path.exists(db_path):
+        return jsonify({'error': 'Turnier nicht gefunden'}), 404
+    try:
+        now = time_to_minutes(request.args['now']) if 'now' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'Ungültige Uhrzeit'}), 400
+    conn = get_db_connection(db_path)
+    status = get_court_status(conn, court, now)
+    conn.close()
+    return jsonify(status)
+
+
 @app.route('/api/de_matches/<game_name>')
 def api_de_matches(game_name):
-    """JSON API: Alle DE-Matches beider Brackets (A+B) fuer enter_double_elim_results"""
+    """JSON API: Alle DE-Matches aller Brackets fuer enter_double_elim_results"""
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
     if not os.path.exists(db_path):
         return jsonify([])
     conn = get_db_connection(db_path)
     cursor = conn.cursor()
-    matches = []
-    for table in ['double_elim_matches_a', 'double_elim_matches_b']:
-        cursor.execute(f"""
-            SELECT id, round, bracket, match_index, match_number,
-                   team1, team2, score1, score2, winner, loser, court, time
-            FROM {table}
-            ORDER BY round, bracket DESC, match_index
-        """)
-        for r in cursor.fetchall():
-            d = dict(r)
-            d['bracket_table'] = table
-            matches.append(d)
+    cursor.execute("""
+        SELECT id, bracket_id, round, bracket, match_index, match_number,
+               team1, team2, score1, score2, winner, loser, court, time
+        FROM double_elim_matches
+        ORDER BY bracket_id, round, bracket DESC, match_index
+    """)
+    matches = [dict(r) for r in cursor.fetchall()]
     conn.close()
     return jsonify(matches)
 
 
 @app.route('/api/display/<game_name>/brackets_full_json')
+@cached_display_json
 def api_brackets_full_json(game_name):
     """JSON API: Vollständige DE + FC + PLZ Daten für Display"""
     db_path = os.path.join(TOURNAMENT_FOLDER, f"{game_name}.db")
@@ -5249,18 +6833,20 @@ def api_brackets_full_json(game_name):
         return jsonify({})
     conn = get_db_connection(db_path)
     cursor = conn.cursor()
+    cursor.execute("SELECT bracket_id,bracket,round,match_index,match_number,team1,team2,score1,score2,winner,loser,court,time FROM double_elim_matches ORDER BY bracket_id,round,match_index")
     wb, lb = [], []
-    for tbl in ['double_elim_matches_a', 'double_elim_matches_b']:
-        cursor.execute(f"SELECT round,match_index,match_number,team1,team2,score1,score2,winner,loser,court,time FROM {tbl} WHERE bracket='Winners' ORDER BY round,match_index")
-        wb += [dict(r) for r in cursor.fetchall()]
-        cursor.execute(f"SELECT round,match_index,match_number,team1,team2,score1,score2,winner,loser,court,time FROM {tbl} WHERE bracket='Losers' ORDER BY round,match_index")
-        lb += [dict(r) for r in cursor.fetchall()]
-    cursor.execute("SELECT round,match_index,match_number,team1,team2,score1,score2,winner,court,time FROM follower_cup_matches ORDER BY CASE round WHEN 'eighth' THEN 1 WHEN 'quarter' THEN 2 WHEN 'semi' THEN 3 WHEN 'final' THEN 4 WHEN 'third' THEN 5 END,match_index")
-    fc = [dict(r) for r in cursor.fetchall()]
+    for r in cursor.fetchall():
+        m = dict(r)
+        (wb if m.pop('bracket') == 'Winners' else lb).append(m)
+    lb_rounds = {bracket_id: layout.lb_rounds for bracket_id, layout in get_bracket_layouts(conn).items()}
+    cursor.execute("SELECT round,match_index,match_number,team1,team2,score1,score2,winner,court,time FROM follower_cup_matches")
+    fc_rounds = get_single_elim_rounds(conn, 'follower_cup_matches', [dict(r) for r in cursor.fetchall()])
+    fc = [m for r in fc_rounds for m in r['matches']]
     cursor.execute("SELECT placement,match_number,team1,team2,score1,score2,winner,court,time FROM placement_matches ORDER BY match_number")
     plz = [dict(r) for r in cursor.fetchall()]
     conn.close()
-    return jsonify({'wb':wb,'lb':lb,'fc':fc,'plz':plz})
+    return jsonify({'wb':wb,'lb':lb,'fc':fc,'plz':plz,'lb_rounds':lb_rounds,
+                    'fc_rounds':[{'round':r['round'],'label':r['label']} for r in fc_rounds]})
 
 
 @app.route('/team_schedules_pdf/<game_name>')
@@ -5279,26 +6865,10 @@ def team_schedules_pdf(game_name):
     cursor = conn.cursor()
     cursor.execute("SELECT name, group_number FROM teams WHERE is_ghost=0 ORDER BY group_number, name")
     teams = cursor.fetchall()
-    cursor.execute("SELECT match_number, round, team1, team2, field, time, score1, score2 FROM matches ORDER BY match_number")
-    all_matches = cursor.fetchall()
+    # Alle Phasen: vor dem Turnier nur Round Robin, danach auch die K.o.-Spiele
+    team_matches = {t['name']: get_team_matches(conn, t['name']) for t in teams}
     conn.close()
 
-    # Matches pro Team indexieren
-    team_matches = {t['name']: [] for t in teams}
-    for m in all_matches:
-        for side, opp, s1, s2 in [(m['team1'], m['team2'], m['score1'], m['score2']),
-                                   (m['team2'], m['team1'], m['score2'], m['score1'])]:
-            if side in team_matches:
-                team_matches[side].append({
-                    'match_number': m['match_number'],
-                    'time':  m['time'],
-                    'field': m['field'],
-                    'opponent': opp,
-                    'score1': s1, 'score2': s2
-                })
-    for name in team_matches:
-        team_matches[name].sort(key=lambda x: (x['match_number'] or 0))
-
     buf = io.BytesIO()
     W, H = A4
     mg   = 10*mm
@@ -5317,7 +6887,9 @@ def team_schedules_pdf(game_name):
         group   = team['group_number']
         matches = team_matches.get(name, [])
 
-        hdr_h = 16*mm; thdr_h = 7*mm; row_h = 8*mm
+        hdr_h = 16*mm; thdr_h = 7*mm
+        # Mit K.o.-Spielen werden es mehr Zeilen: kleiner, damit alles in die halbe Seite passt
+        row_h = min(8*mm, (HALF - mg - 4*mm - hdr_h - thdr_h) / max(len(matches), 1))
         col_x = [mg, mg+15*mm, mg+32*mm, mg+50*mm, mg+98*mm]
 
         c.setFillColor(COL_HEADER)
@@ -5326,7 +6898,7 @@ def team_schedules_pdf(game_name):
         c.setFont('Helvetica-Bold', 14)
         c.drawString(mg + 4*mm, top_y - 10*mm, name)
         c.setFont('Helvetica', 8)
-        c.drawString(mg + 4*mm, top_y - 14*mm, f'Gruppe {group}  —  Round Robin Spielplan')
+        c.drawString(mg + 4*mm, top_y - 14*mm, f'Gruppe {group}  —  Spielplan')
         c.setFont('Helvetica', 7)
         c.drawRightString(W - mg - 2*mm, top_y - 8*mm, game_name)
 
@@ -5355,7 +6927,7 @@ def team_schedules_pdf(game_name):
             c.drawString(col_x[0] + 1.5*mm, y + 2.5*mm, f"#{m['match_number']}")
             c.setFont('Helvetica', 8)
             c.drawString(col_x[1] + 1.5*mm, y + 2.5*mm, m['time'] or '—')
-            c.drawString(col_x[2] + 1.5*mm, y + 2.5*mm, f"Feld {m['field']}" if m['field'] else '—')
+            c.drawString(col_x[2] + 1.5*mm, y + 2.5*mm, f"Feld {m['court']}" if m['court'] else '—')
             c.setFont('Helvetica-Bold', 8)
             c.drawString(col_x[3] + 1.5*mm, y + 2.5*mm, (m['opponent'] or '—')[:30])
             if has:
@@ -0,0 +1,112 @@
+"""
+Benchmark: Rankings-Neuberechnung
+Vergleicht die frühere Python-Schleife (2 UPDATEs pro Match) mit dem
+set-basierten Rebuild (RANKINGS_REBUILD_SQL) bei 60, 240 und 1000 Teams.
+
+Aufruf:  python benchmark_rankings.py
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from app import initialize_db, get_db_connection, close_db_pool, recalculate_rankings_internal
+
+TEAM_COUNTS = [60, 240, 1000]
+GROUP_SIZE = 6
+REPEATS = 5
+
+
+def recalculate_rankings_loop(conn):
+    """Bisherige Implementierung: zurücksetzen, dann jedes Match einzeln addieren"""
+    cursor = conn.cursor()
+    cursor.execute("""
+        UPDATE rankings
+        SET matches_played=0, wins=0, draws=0, losses=0,
+            goals_for=0, goals_against=0, goal_difference=0, points=0
+    """)
+    cursor.execute("SELECT * FROM matches WHERE score1 IS NOT NULL AND score2 IS NOT NULL")
+    for match in cursor.fetchall():
+        team1, team2 = match['team1'], match['team2']
+        score1, score2 = match['score1'], match['score2']
+        if score1 > score2:
+            w1, d1, l1, p1 = 1, 0, 0, 3; w2, d2, l2, p2 = 0, 0, 1, 0
+        elif score1 < score2:
+            w1, d1, l1, p1 = 0, 0, 1, 0; w2, d2, l2, p2 = 1, 0, 0, 3
+        else:
+            w1, d1, l1, p1 = 0, 1, 0, 1; w2, d2, l2, p2 = 0, 1, 0, 1
+        for team, w, d, l, gf, ga, p in ((team1, w1, d1, l1, score1, score2, p1),
+                                         (team2, w2, d2, l2, score2, score1, p2)):
+            conn.execute("""
+                UPDATE rankings
+                SET matches_played=matches_played+1, wins=wins+?, draws=draws+?,
+                    losses=losses+?, goals_for=goals_for+?, goals_against=goals_against+?,
+                    goal_difference=goal_difference+(?-?), points=points+?
+                WHERE team=?
+            """, (w, d, l, gf, ga, gf, ga, p, team))
+    conn.commit()
+
+
+def build_tournament(db_path, team_count):
+    """Gruppen à 6 Teams, jeder gegen jeden, alle Spiele gespielt"""
+    rng = random.Random(team_count)
+    initialize_db(db_path)
+    conn = get_db_connection(db_path)
+    groups = team_count // GROUP_SIZE
+    matches = []
+    for g in range(1, groups + 1):
+        names = [f"Team {g}-{i}" for i in range(1, GROUP_SIZE + 1)]
+        conn.executemany("INSERT INTO teams (name, group_number) VALUES (?, ?)",
+                         [(n, g) for n in names])
+        conn.executemany("INSERT INTO rankings (team, group_number) VALUES (?, ?)",
+                         [(n, g) for n in names])
+        for i in range(GROUP_SIZE):
+            for j in range(i + 1, GROUP_SIZE):
+                matches.append((1, names[i], names[j], g, rng.randint(0, 42), rng.randint(0, 42)))
+    conn.executemany("""
+        INSERT INTO matches (round, team1, team2, group_number, score1, score2)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, matches)
+    conn.commit()
+    return conn, len(matches)
+
+
+def snapshot(conn):
+    return conn.execute("SELECT * FROM rankings ORDER BY team").fetchall()
+
+
+def timed(fn, conn):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(conn)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    test_dir = tempfile.mkdtemp()
+    try:
+        print(f"{'Teams':>6} {'Matches':>8} {'Schleife':>12} {'Set-basiert':>12} {'Faktor':>8}")
+        for team_count in TEAM_COUNTS:
+            db_path = os.path.join(test_dir, f"bench_{team_count}.db")
+            conn, match_count = build_tournament(db_path, team_count)
+
+            loop_time = timed(recalculate_rankings_loop, conn)
+            expected = [tuple(r) for r in snapshot(conn)]
+            set_time = timed(recalculate_rankings_internal, conn)
+            assert [tuple(r) for r in snapshot(conn)] == expected, "Ergebnisse weichen ab!"
+
+            conn.close()
+            print(f"{team_count:>6} {match_count:>8} {loop_time * 1000:>10.1f}ms "
+                  f"{set_time * 1000:>10.1f}ms {loop_time / set_time:>7.1f}x")
+    finally:
+        close_db_pool()
+        shutil.rmtree(test_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,33 @@
-// Reload every 30 seconds
-setInterval(function () {
-    location.reload();
-}, 30000);
+// Live-Updates für Display-Seiten über Server-Sent Events (/api/display/<game>/events).
+// subscribeDisplayEvents(game, onChange) ruft onChange(version) nach jeder Datenänderung auf.
+function subscribeDisplayEvents(game, onChange) {
+    if (!window.EventSource) {
+        // Fallback für Browser ohne SSE: langsames Polling
+        setInterval(function () { onChange(null); }, 30000);
+        return null;
+    }
+    var lastVersion = null;
+    var source = new EventSource('/api/display/' + encodeURIComponent(game) + '/events');
+    source.addEventListener('changed', function (e) {
+        var version = JSON.parse(e.data).version;
+        if (version !== lastVersion) {
+            lastVersion = version;
+            onChange(version);
+        }
+    });
+    return source;
+}
+
+// Seiten ohne eigenes Live-Rendering (<body data-live-reload="<game>">): bei Änderung neu laden
+document.addEventListener('DOMContentLoaded', function () {
+    var game = document.body.dataset.liveReload;
+    if (!game) return;
+    var initial = true;
+    subscribeDisplayEvents(game, function () {
+        if (initial) { initial = false; return; }   // erstes Event = aktueller Stand
+        location.reload();
+    });
+});
 
 document.addEventListener('keydown', function (e) {
     if (e.key === 'F11') {
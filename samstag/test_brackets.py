@@ -0,0 +1,419 @@
+import os
+import random
+import unittest
+import tempfile
+import shutil
+import app as app_module
+from app import (
+    app, initialize_db, get_db_connection, close_db_pool,
+    get_double_elim_layout, seeding_order, get_bracket_layout,
+    process_double_elim_forwarding, propagate_bracket_result, FOLLOWER_CUP_GRAPH,
+    get_single_elim_layout, build_bracket_program, get_win_probabilities,
+    reserve_match_numbers, write_knockout_result, set_placement_ladder, MATCH_TABLES,
+    insert_single_elim
+)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def simulate_layout(layout, rng):
+    """Spielt ein Bracket nur über die Lookup-Arrays durch → (Niederlagen je Team, Slots)"""
+    slots = {key: [None, None] for key in layout.slots}
+    for i, (s1, s2) in enumerate(layout.pairings):
+        slots[('Winners', 1, i)] = [s1, s2]
+    losses = {seed: 0 for seed in range(layout.size)}
+    played = set()
+
+    while True:
+        ready = [k for k, (t1, t2) in slots.items()
+                 if k not in played and t1 is not None and t2 is not None]
+        if not ready:
+            break
+        for key in ready:
+            bracket, r, i = key
+            winner, loser = slots[key] if rng.random() < 0.5 else slots[key][::-1]
+            played.add(key)
+            losses[loser] += 1
+            if bracket == 'Winners':
+                targets = [('Winners', layout.winner_mapping.get((r, i)), winner),
+                           ('Losers', layout.loser_mapping.get((r, i)), loser)]
+            else:
+                targets = [('Losers', layout.loser_winner_mapping.get((r, i)), winner)]
+            for side, target, team in targets:
+                if target is None:
+                    continue
+                next_round, next_index, slot = target
+                pos = 0 if slot == 'team1' else 1
+                assert slots[(side, next_round, next_index)][pos] is None, "Slot doppelt belegt"
+                slots[(side, next_round, next_index)][pos] = team
+    return losses, played
+
+
+class TestDoubleElimLayout(unittest.TestCase):
+
+    def test_every_size_plays_out(self):
+        rng = random.Random(1)
+        for size in (4, 8, 16, 32, 64, 128):
+            layout = get_double_elim_layout(size)
+            self.assertEqual(layout.lb_rounds, 2 * (layout.wb_rounds - 1))
+            self.assertEqual(layout.match_count, 2 * size - 3)
+            losses, played = simulate_layout(layout, rng)
+            self.assertEqual(len(played), layout.match_count)
+            # WB-Sieger ungeschlagen, LB-Sieger einmal verloren, alle anderen zweimal
+            self.assertEqual(sorted(losses.values()), [0, 1] + [2] * (size - 2))
+
+    def test_seeding_matches_standard_order(self):
+        self.assertEqual(seeding_order(8), [1, 8, 4, 5, 2, 7, 3, 6])
+        self.assertEqual(get_double_elim_layout(16).pairings[:2], ((0, 15), (7, 8)))
+        self.assertIs(get_double_elim_layout(16), get_double_elim_layout(16))
+
+    def test_invalid_size_rejected(self):
+        for size in (2, 12, 256):
+            with self.assertRaises(ValueError):
+                get_double_elim_layout(size)
+
+
+def simulate_single_elim(layout, rng):
+    """Spielt ein K.o.-Layout über den Weiterleitungsindex durch → {setzplatz: platz}"""
+    slots = {(m.round, m.match_index): [None, None] for m in layout.matches}
+    for key, seeded in layout.seeds.items():
+        for slot, seed in seeded.items():
+            slots[key][0 if slot == 'team1' else 1] = seed
+    places = {}
+    for m in layout.matches:   # Spielreihenfolge = topologische Reihenfolge
+        key = (m.round, m.match_index)
+        t1, t2 = slots[key]
+        assert t1 is not None and t2 is not None, f"{key} nicht besetzt"
+        winner, loser = (t1, t2) if rng.random() < 0.5 else (t2, t1)
+        if m.decides_places:
+            places[winner], places[loser] = m.first_place, m.first_place + 1
+        for outcome, target, slot in layout.graph.edges.get(key, ()):
+            slots[target][0 if slot == 'team1' else 1] = winner if outcome == 'winner' else loser
+    return places
+
+
+class TestSingleElimLayout(unittest.TestCase):
+
+    def test_sizes_with_byes_play_out(self):
+        rng = random.Random(2)
+        for entrants in (2, 3, 5, 12, 16, 37, 64, 100):
+            layout = get_single_elim_layout(entrants, third_place=entrants >= 4)
+            self.assertEqual(len(layout.matches), entrants - 1 + (entrants >= 4))
+            places = simulate_single_elim(layout, rng)
+            self.assertEqual(sorted(places.values())[:2], [1, 2])
+
+    def test_consolation_ladder_decides_every_place(self):
+        rng = random.Random(3)
+        for entrants in (4, 6, 12, 16):
+            layout = get_single_elim_layout(entrants, consolation=True)
+            places = simulate_single_elim(layout, rng)
+            self.assertEqual(sorted(places), list(range(entrants)))
+            self.assertEqual(sorted(places.values()), list(range(1, entrants + 1)))
+
+    def test_follower_cup_rounds_unchanged(self):
+        layout = get_single_elim_layout(16, third_place=True)
+        self.assertEqual(layout.rounds, ('eighth', 'quarter', 'semi', 'third', 'final'))
+        self.assertEqual(layout.seeds[('eighth', 0)], {'team1': 0, 'team2': 15})
+        self.assertIs(layout.graph, FOLLOWER_CUP_GRAPH)
+
+
+class TestDoubleElimGeneration(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.game_name = 'test_brackets'
+        self.db_path = os.path.join(self.test_dir, f'{self.game_name}.db')
+        self.original_folder = app_module.TOURNAMENT_FOLDER
+        app_module.TOURNAMENT_FOLDER = self.test_dir
+        initialize_db(self.db_path)
+
+        conn = get_db_connection(self.db_path)
+        for g in range(1, 11):
+            for i in range(1, 7):
+                name = f"Team {g}-{i}"
+                conn.execute("INSERT INTO teams (name, group_number) VALUES (?, ?)", (name, g))
+                conn.execute("INSERT INTO rankings (team, group_number, goals_for) VALUES (?, ?, ?)",
+                             (name, g, 100 - i))
+        conn.commit()
+        conn.close()
+
+        self.client = app.test_client()
+        self.client.get(f'/generate_matches/{self.game_name}')
+
+    def tearDown(self):
+        app_module.TOURNAMENT_FOLDER = self.original_folder
+        close_db_pool()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_generate_double_elim_uses_layout(self):
+        self.client.get(f'/generate_double_elim/{self.game_name}')
+        conn = get_db_connection(self.db_path)
+        layout = get_double_elim_layout(16)
+        for bracket_id in ('A', 'B'):
+            rows = conn.execute("""
+                SELECT bracket, round, COUNT(*) AS n, COUNT(match_number) AS numbered,
+                       COUNT(time) AS timed
+                FROM double_elim_matches WHERE bracket_id = ?
+                GROUP BY bracket, round""", (bracket_id,)).fetchall()
+            counts = {(r['bracket'], r['round']): r['n'] for r in rows}
+            expected = {(b, r): n for b, matches in (('Winners', layout.wb_matches),
+                                                     ('Losers', layout.lb_matches))
+                        for r, n in enumerate(matches) if r}
+            self.assertEqual(counts, expected)
+            self.assertTrue(all(r['numbered'] == r['n'] == r['timed'] for r in rows))
+            self.assertIs(get_bracket_layout(conn, bracket_id), layout)
+        conn.close()
+
+        # Display leitet LB-Finale und Filter aus der Rundenzahl des Layouts ab
+        data = self.client.get(f'/api/display/{self.game_name}/brackets_full_json').get_json()
+        self.assertEqual(data['lb_rounds'], {'A': layout.lb_rounds, 'B': layout.lb_rounds})
+
+    def _play(self, conn, bracket_id, bracket, rnd, idx, score1, score2):
+        """Ergebnis setzen und weiterleiten wie update_double_elim_result"""
+        row = self._slot(conn, bracket_id, bracket, rnd, idx)
+        row.update({'score1': score1, 'score2': score2,
+                    'winner': row['team1'] if score1 > score2 else row['team2'],
+                    'loser': row['team2'] if score1 > score2 else row['team1']})
+        layout = get_bracket_layout(conn, bracket_id)
+        return process_double_elim_forwarding(conn, row, 'double_elim_matches', layout.winner_mapping,
+                                              layout.loser_mapping, layout.loser_winner_mapping)
+
+    def _slot(self, conn, bracket_id, bracket, rnd, idx):
+        return dict(conn.execute("""SELECT * FROM double_elim_matches
+                                    WHERE bracket_id=? AND bracket=? AND round=? AND match_index=?""",
+                                 (bracket_id, bracket, rnd, idx)).fetchone())
+
+    def test_corrected_result_repropagates_subtree(self):
+        self.client.get(f'/generate_double_elim/{self.game_name}')
+        bracket_id = 'A'
+        conn = get_db_connection(self.db_path)
+        first = self._slot(conn, bracket_id, 'Winners', 1, 0)
+        for idx in range(4):
+            self._play(conn, bracket_id, 'Winners', 1, idx, 21, 10)
+        self._play(conn, bracket_id, 'Winners', 2, 0, 21, 10)
+        self._play(conn, bracket_id, 'Losers', 1, 0, 21, 10)
+        self.assertEqual(self._slot(conn, bracket_id, 'Winners', 2, 0)['winner'], first['team1'])
+
+        # Tippfehler ohne Siegerwechsel: nur das Spiel selbst ändert sich
+        changes = self._play(conn, bracket_id, 'Winners', 1, 0, 21, 12)
+        self.assertEqual(list(changes.values()), [{'score2': 12}])
+
+        # Siegerwechsel in WB R1: WB R2 und LB R1 neu besetzt, deren Ergebnisse verworfen
+        changes = self._play(conn, bracket_id, 'Winners', 1, 0, 5, 21)
+        wb2 = self._slot(conn, bracket_id, 'Winners', 2, 0)
+        lb1 = self._slot(conn, bracket_id, 'Losers', 1, 0)
+        self.assertEqual((wb2['team1'], wb2['winner'], wb2['score1']), (first['team2'], None, None))
+        self.assertEqual((lb1['team1'], lb1['winner']), (first['team1'], None))
+        self.assertIsNone(self._slot(conn, bracket_id, 'Winners', 3, 0)['team1'])
+        self.assertIsNone(self._slot(conn, bracket_id, 'Losers', 2, 0)['team1'])
+        self.assertEqual(len(changes), 6)
+        conn.close()
+
+    @unittest.skipUnless(numpy, "numpy nicht installiert")
+    def test_win_probabilities_follow_bracket_state(self):
+        self.client.get(f'/generate_double_elim/{self.game_name}')
+        bracket_id = 'A'
+        conn = get_db_connection(self.db_path)
+        wb1 = self._slot(conn, bracket_id, 'Winners', 1, 0)
+        conn.execute("UPDATE rankings SET matches_played = 5, goal_difference = 60 WHERE team = ?",
+                     (wb1['team2'],))
+        conn.commit()
+        for idx in range(2):
+            self._play(conn, bracket_id, 'Winners', 1, idx, 21, 10)
+        self._play(conn, bracket_id, 'Losers', 1, 0, 21, 10)
+        eliminated = self._slot(conn, bracket_id, 'Losers', 1, 0)['loser']
+
+        program = build_bracket_program(conn)
+        self.assertEqual(len(program.ops), 2 * get_double_elim_layout(16).match_count + 4)
+        result = get_win_probabilities(conn)
+        self.assertIs(get_win_probabilities(conn), result)
+        conn.close()
+
+        probabilities = result['probabilities']
+        self.assertAlmostEqual(sum(probabilities['title'].values()), 1.0)
+        self.assertAlmostEqual(sum(probabilities['super_finals'].values()), 4.0)
+        self.assertNotIn(eliminated, probabilities['super_finals'])
+        # Starkes Team aus dem LB gegen ein durchschnittliches
+        self.assertGreater(probabilities['title'][wb1['team2']],
+                           probabilities['title'][wb1['team1']])
+
+        data = self.client.get(f'/api/display/{self.game_name}/win_probabilities_json').get_json()
+        self.assertEqual(data['runs'], result['runs'])
+        self.assertEqual(data['probabilities']['title'][0]['team'], wb1['team2'])
+
+    def test_follower_cup_correction_clears_final(self):
+        conn = get_db_connection(self.db_path)
+        conn.executemany("""
+            INSERT INTO follower_cup_matches (round, match_index, team1, team2, score1, score2, winner)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [('semi', 0, 'S1', 'S2', 21, 5, 'S1'), ('semi', 1, 'S3', 'S4', 21, 5, 'S3'),
+              ('final', 0, 'S1', 'S3', 21, 9, 'S1'), ('third', 0, 'S2', 'S4', None, None, None)])
+        conn.commit()
+        semi = dict(conn.execute("SELECT * FROM follower_cup_matches WHERE round='semi' AND match_index=0").fetchone())
+        semi.update({'score1': 3, 'score2': 21, 'winner': 'S2'})
+        propagate_bracket_result(conn, 'follower_cup_matches', FOLLOWER_CUP_GRAPH, semi)
+        final = conn.execute("SELECT * FROM follower_cup_matches WHERE round='final'").fetchone()
+        third = conn.execute("SELECT * FROM follower_cup_matches WHERE round='third'").fetchone()
+        conn.close()
+        self.assertEqual((final['team1'], final['team2'], final['winner']), ('S2', 'S3', None))
+        self.assertEqual((third['team1'], third['team2']), ('S1', 'S4'))
+
+    def test_knockout_routes_share_write_path(self):
+        self.client.get(f'/generate_double_elim/{self.game_name}')
+        conn = get_db_connection(self.db_path)
+        match = conn.execute("""SELECT * FROM double_elim_matches
+            WHERE bracket_id='B' AND bracket='Winners' AND round=1 AND match_index=1""").fetchone()
+        conn.executemany("INSERT INTO super_finals_matches (match_id, team1, team2) VALUES (?, ?, ?)",
+                         [('HF1', 'A1', 'B2'), ('HF2', 'B1', 'A2'), ('FINAL', None, None),
+                          ('THIRD', None, None)])
+        conn.commit()
+        hf1 = conn.execute("SELECT id FROM super_finals_matches WHERE match_id='HF1'").fetchone()['id']
+        conn.close()
+        ajax = {'X-Requested-With': 'XMLHttpRequest'}
+
+        # IDs sind über alle Brackets eindeutig — kein bracket_id-Feld nötig
+        data = self.client.post(f'/update_double_elim_result/{self.game_name}/{match["id"]}',
+                                data={'score1': '9', 'score2': '21'}, headers=ajax).get_json()
+        self.assertTrue(data['ok'])
+        by_slot = {(m['bracket'], m['round'], m['match_index']): m for m in data['matches']}
+        self.assertEqual(by_slot[('Winners', 2, 0)]['team2'], match['team2'])
+        self.assertEqual(by_slot[('Losers', 1, 0)]['team2'], match['team1'])
+        self.assertTrue(all(m['bracket_id'] == 'B' for m in data['matches']))
+
+        data = self.client.post(f'/save_super_finals_result/{self.game_name}/{hf1}',
+                                data={'score1': '21', 'score2': '3'}, headers=ajax).get_json()
+        final = {m['match_id']: m for m in data['matches']}
+        self.assertEqual((final['FINAL']['team1'], final['THIRD']['team1']), ('A1', 'B2'))
+
+    def _insert_bracket(self, conn, bracket_id, wb_matches, lb_matches):
+        rows = [(bracket_id, bracket, r, i) for bracket, matches in (('Winners', wb_matches),
+                                                                    ('Losers', lb_matches))
+                for r, n in enumerate(matches, 1) for i in range(n)]
+        conn.executemany("INSERT INTO double_elim_matches (bracket_id, bracket, round, match_index) "
+                         "VALUES (?, ?, ?, ?)", rows)
+        conn.executemany("UPDATE double_elim_matches SET team1 = ?, team2 = ? "
+                         "WHERE bracket_id = ? AND bracket = 'Winners' AND round = 1 AND match_index = ?",
+                         [(f"{bracket_id}{2 * i}", f"{bracket_id}{2 * i + 1}", bracket_id, i)
+                          for i in range(wb_matches[0])])
+        conn.commit()
+
+    def test_old_layouts_keep_their_forwarding(self):
+        conn = get_db_connection(self.db_path)
+        # Altes 16er-Layout (LB 8/8/4/4/2/2/1/1) und eine unbekannte Struktur
+        self._insert_bracket(conn, 'A', (8, 4, 2, 1), (8, 8, 4, 4, 2, 2, 1, 1))
+        self._insert_bracket(conn, 'B', (16, 8, 4, 2, 1), (8, 8, 4, 4, 2, 2, 1, 1, 1))
+        layout = get_bracket_layout(conn, 'A')
+        self.assertEqual(layout.lb_rounds, 8)
+        for idx in range(2):
+            write_knockout_result(conn, 'double_elim_matches',
+                                  self._slot(conn, 'A', 'Winners', 1, idx)['id'], 21, 10)
+        write_knockout_result(conn, 'double_elim_matches',
+                              self._slot(conn, 'A', 'Winners', 2, 0)['id'], 10, 21)
+        # WB-R2-Verlierer geht wie früher nach LB R3 (neues Layout: LB R2, Index 3)
+        self.assertEqual(self._slot(conn, 'A', 'Losers', 3, 0)['team2'], 'A0')
+        self.assertIsNone(self._slot(conn, 'A', 'Losers', 2, 3)['team2'])
+
+        with self.assertRaises(ValueError):
+            write_knockout_result(conn, 'double_elim_matches',
+                                  self._slot(conn, 'B', 'Winners', 1, 0)['id'], 21, 10)
+        self.assertIsNone(self._slot(conn, 'B', 'Winners', 1, 0)['winner'])
+        conn.close()
+
+    def test_follower_cup_and_placement_run_on_engine(self):
+        self.client.get(f'/generate_follower_cup/{self.game_name}')
+        self.client.get(f'/generate_placement_round/{self.game_name}')
+        conn = get_db_connection(self.db_path)
+        fc = conn.execute("SELECT * FROM follower_cup_matches ORDER BY match_number").fetchall()
+        plz = conn.execute("SELECT * FROM placement_matches ORDER BY match_number").fetchall()
+        config = {r['phase']: dict(r) for r in conn.execute("SELECT * FROM bracket_config")}
+        conn.close()
+
+        self.assertEqual(len(fc), 16)
+        self.assertEqual(fc[0]['match_number'], 151)
+        self.assertEqual((config['follower_cup']['entrants'], config['follower_cup']['first_place']), (16, 33))
+        # Standard: eine Runde, Bester gegen Schlechtesten, ohne Weiterleitung
+        self.assertEqual([m['placement'] for m in plz], [f"P{p}" for p in range(49, 61, 2)])
+        self.assertEqual(plz[0]['match_number'], 167)
+        self.assertNotIn('placement', config)
+
+        # Leiter als Option in bracket_config: jeder Platz wird ausgespielt
+        self.client.post(f'/reset_placement/{self.game_name}')
+        conn = get_db_connection(self.db_path)
+        set_placement_ladder(conn, True)
+        conn.commit()
+        conn.close()
+        self.client.get(f'/generate_placement_round/{self.game_name}')
+        conn = get_db_connection(self.db_path)
+        plz = conn.execute("SELECT * FROM placement_matches ORDER BY match_number").fetchall()
+        conn.close()
+        self.assertEqual(len(plz), len(get_single_elim_layout(12, consolation=True).matches))
+        deciding = sorted(int(m['placement'][1:]) for m in plz if '-' not in m['placement'])
+        self.assertEqual(deciding, list(range(49, 61, 2)))
+
+        # Ergebnis im Platzierungs-Bracket wird weitergeleitet
+        first = plz[0]
+        data = self.client.post(f'/save_placement_result/{self.game_name}/{first["id"]}',
+                                data={'score1': '21', 'score2': '4'},
+                                headers={'X-Requested-With': 'XMLHttpRequest'}).get_json()
+        seated = {m['round']: {m['team1'], m['team2']} for m in data['matches'] if m['id'] != first['id']}
+        self.assertEqual(first['round'], 'eighth')
+        self.assertIn(first['team1'], seated['quarter'])
+        self.assertIn(first['team2'], seated['p9_semi'])
+
+    def test_follower_cup_rounds_come_from_layout(self):
+        conn = get_db_connection(self.db_path)
+        conn.execute("INSERT INTO tournament_config (game_name, courts) VALUES (?, 4)", (self.game_name,))
+        layout = get_single_elim_layout(20, third_place=True, consolation=True)
+        teams = [f"Team {g}-{i}" for g in range(1, 11) for i in (3, 4)]
+        insert_single_elim(conn.cursor(), 'follower_cup_matches', 'follower_cup', layout, teams,
+                           reserve_match_numbers(conn.cursor(), len(layout.matches)), first_place=33)
+        conn.commit()
+        courts = {r['court'] for r in conn.execute("SELECT court FROM follower_cup_matches")}
+        conn.close()
+        self.assertEqual(courts, {1, 2, 3, 4})
+
+        data = self.client.get(f'/api/display/{self.game_name}/brackets_full_json').get_json()
+        rounds = [r['round'] for r in data['fc_rounds']]
+        labels = {r['round']: r['label'] for r in data['fc_rounds']}
+        self.assertEqual(rounds, list(layout.rounds))
+        self.assertEqual((labels['sixteenth'], labels['p5_semi'], labels['p5_final']),
+                         ('1/16-Finale', 'Platz 5–8: Halbfinale', 'Spiel um Platz 5'))
+        # Spiele in Rundenfolge des Layouts, alle Runden dabei
+        order = [rounds.index(m['round']) for m in data['fc']]
+        self.assertEqual(len(order), len(layout.matches))
+        self.assertEqual(order, sorted(order))
+
+    def test_number_blocks_never_collide_and_renumber_is_contiguous(self):
+        self.client.get(f'/generate_double_elim/{self.game_name}')
+        self.client.get(f'/generate_follower_cup/{self.game_name}')
+        self.client.get(f'/generate_placement_round/{self.game_name}')
+
+        def numbers(conn):
+            return {(table, r['id']): r['match_number'] for table, _ in MATCH_TABLES
+                    for r in conn.execute(f"SELECT id, match_number FROM {table}")}
+
+        conn = get_db_connection(self.db_path)
+        before = numbers(conn)
+        self.assertEqual(sorted(before.values()), list(range(1, len(before) + 1)))
+        conn.close()
+
+        stats = self.client.post(f'/renumber_all_matches/{self.game_name}').get_json()['stats']
+        self.assertEqual(stats['bracket_a']['start'], 151)
+        conn = get_db_connection(self.db_path)
+        after = numbers(conn)
+        self.assertEqual(sorted(after.values()), list(range(1, len(after) + 1)))
+        # Gruppenphase und Brackets werden in gleicher Reihenfolge nummeriert wie bei der Generierung
+        for key, number in before.items():
+            if key[0] in ('matches', 'double_elim_matches'):
+                self.assertEqual(after[key], number, key)
+        self.assertEqual(reserve_match_numbers(conn.cursor(), 3), len(after) + 1)
+        self.assertEqual(reserve_match_numbers(conn.cursor(), 1), len(after) + 4)
+        conn.rollback()
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
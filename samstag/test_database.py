@@ -0,0 +1,162 @@
+import os
+import unittest
+import tempfile
+import shutil
+import sqlite3
+from app import (
+    app, initialize_db, get_db_connection, close_db_pool,
+    migrate_database, get_schema_version, SCHEMA_VERSION, SCHEMA_MIGRATIONS
+)
+
+
+class TestDatabaseLayer(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, 'test_db_layer.db')
+        initialize_db(self.db_path)
+
+    def tearDown(self):
+        close_db_pool()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_connection_uses_wal(self):
+        conn = get_db_connection(self.db_path)
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        conn.close()
+        self.assertEqual(mode.lower(), 'wal')
+
+    def test_connection_is_reused_from_pool(self):
+        conn = get_db_connection(self.db_path)
+        conn.close()
+        again = get_db_connection(self.db_path)
+        self.assertIs(conn, again)
+        again.close()
+
+    def test_one_connection_per_app_context(self):
+        with app.app_context():
+            first = get_db_connection(self.db_path)
+            first.close()   # no-op im App-Context
+            second = get_db_connection(self.db_path)
+            self.assertIs(first, second)
+            second.execute("INSERT INTO teams (name, group_number) VALUES ('X', 1)")
+        # Teardown verwirft die nicht committete Transaktion
+        conn = get_db_connection(self.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM teams").fetchone()[0]
+        conn.close()
+        self.assertEqual(count, 0)
+
+    def test_new_database_is_current(self):
+        conn = get_db_connection(self.db_path)
+        indexes = {r['name'] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='index'")}
+        self.assertEqual(get_schema_version(conn), SCHEMA_VERSION)
+        self.assertIn('idx_matches_round_group', indexes)
+        self.assertIn('idx_rankings_team', indexes)
+        conn.close()
+
+    def test_legacy_database_is_migrated(self):
+        legacy_path = os.path.join(self.test_dir, 'legacy.db')
+        raw = sqlite3.connect(legacy_path)
+        raw.execute("CREATE TABLE teams (id INTEGER PRIMARY KEY, name TEXT, group_number INTEGER)")
+        raw.execute("CREATE TABLE matches (id INTEGER PRIMARY KEY, round INTEGER, team1 TEXT, team2 TEXT, "
+                    "group_number INTEGER, field INTEGER, score1 INTEGER, score2 INTEGER, time TEXT)")
+        raw.execute("CREATE TABLE tournament_config (id INTEGER PRIMARY KEY, game_name TEXT, "
+                    "match_duration INTEGER, break_between_games INTEGER, start_time TEXT)")
+        raw.commit()
+        raw.close()
+
+        conn = get_db_connection(legacy_path)
+        team_cols = [r[1] for r in conn.execute("PRAGMA table_info(teams)")]
+        config_cols = [r[1] for r in conn.execute("PRAGMA table_info(tournament_config)")]
+        self.assertEqual(get_schema_version(conn), SCHEMA_VERSION)
+        self.assertIn('is_ghost', team_cols)
+        self.assertIn('break_between_rounds', config_cols)
+        self.assertEqual(migrate_database(conn), SCHEMA_VERSION)
+        conn.close()
+
+    def test_split_double_elim_tables_are_merged(self):
+        split_path = os.path.join(self.test_dir, 'split.db')
+        raw = sqlite3.connect(split_path)
+        for version, migration in SCHEMA_MIGRATIONS:
+            if version > 10:
+                break
+            migration(raw.cursor())
+        raw.execute("PRAGMA user_version = 10")
+        for table, winner, number in (('double_elim_matches_a', 'A1', 151),
+                                      ('double_elim_matches_b', 'B1', 152)):
+            raw.executemany(f"""
+                INSERT INTO {table} (match_number, round, bracket, match_index, team1, team2,
+                                     score1, score2, winner, loser)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [(number, 1, 'Winners', 0, winner, 'X', 21, 3, winner, 'X'),
+                  (None, 1, 'Losers', 0, 'X', None, None, None, None, None)])
+        raw.commit()
+        totals = dict(raw.execute("SELECT team, games FROM team_totals").fetchall())
+        raw.close()
+
+        conn = get_db_connection(split_path)
+        rows = conn.execute("SELECT bracket_id, bracket, team1 FROM double_elim_matches ORDER BY id").fetchall()
+        tables = {r['name'] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        plan = " ".join(r['detail'] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM double_elim_matches "
+            "WHERE bracket_id = ? AND bracket = ? AND round = ? AND match_index = ?", ('A', 'Winners', 1, 0)))
+        phases = [r['phase'] for r in conn.execute(
+            "SELECT phase FROM all_matches WHERE winner IS NOT NULL ORDER BY match_number")]
+        self.assertEqual([tuple(r) for r in rows], [('A', 'Winners', 'A1'), ('A', 'Losers', 'X'),
+                                                    ('B', 'Winners', 'B1'), ('B', 'Losers', 'X')])
+        self.assertNotIn('double_elim_matches_a', tables)
+        self.assertIn('idx_double_elim_slot', plan)
+        self.assertEqual(phases, ['Double Elimination A', 'Double Elimination B'])
+        self.assertEqual(dict(conn.execute("SELECT team, games FROM team_totals").fetchall()), totals)
+
+        # Trigger hängen an der neuen Tabelle
+        conn.execute("UPDATE double_elim_matches SET team2 = 'B1', score1 = 21, score2 = 5 "
+                     "WHERE bracket_id = 'B' AND bracket = 'Losers'")
+        conn.commit()
+        self.assertEqual(conn.execute("SELECT games FROM team_totals WHERE team = 'B1'").fetchone()[0], 2)
+        conn.close()
+
+    def test_legacy_single_double_elim_table_is_migrated(self):
+        # Alte Dateien: ein einziges DE-Bracket ohne bracket_id, Schema-Version 0
+        legacy_path = os.path.join(self.test_dir, 'legacy.db')
+        raw = sqlite3.connect(legacy_path)
+        raw.executescript("""
+            CREATE TABLE teams (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL,
+                                group_number INTEGER, is_ghost INTEGER DEFAULT 0);
+            CREATE TABLE double_elim_matches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                match_number INTEGER UNIQUE,
+                round INTEGER NOT NULL,
+                bracket TEXT NOT NULL,
+                match_index INTEGER NOT NULL,
+                team1 TEXT, team2 TEXT,
+                score1 INTEGER, score2 INTEGER,
+                winner TEXT, loser TEXT,
+                court INTEGER, time TEXT
+            );
+            INSERT INTO double_elim_matches (match_number, round, bracket, match_index, team1, team2,
+                                             score1, score2, winner, loser, court, time)
+            VALUES (201, 1, 'Winners', 0, 'L1', 'L2', 21, 10, 'L1', 'L2', 3, '14:30'),
+                   (202, 1, 'Losers', 0, 'L2', NULL, NULL, NULL, NULL, NULL, NULL, NULL);
+        """)
+        raw.commit()
+        raw.close()
+
+        conn = get_db_connection(legacy_path)
+        rows = conn.execute("SELECT bracket_id, bracket, match_number, start_min FROM double_elim_matches "
+                            "ORDER BY id").fetchall()
+        tables = {r['name'] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        self.assertEqual(get_schema_version(conn), SCHEMA_VERSION)
+        self.assertEqual([tuple(r) for r in rows], [('A', 'Winners', 201, 870), ('A', 'Losers', 202, None)])
+        self.assertNotIn('double_elim_matches_legacy', tables)
+        self.assertEqual(conn.execute("SELECT phase FROM all_matches WHERE winner = 'L1'").fetchone()[0],
+                         'Double Elimination A')
+        self.assertEqual(dict(conn.execute("SELECT team, games FROM team_totals").fetchall()),
+                         {'L1': 1, 'L2': 1})
+        self.assertEqual(conn.execute("SELECT next_number FROM match_number_sequence").fetchone()[0], 203)
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import unittest
+import tempfile
+import shutil
+import app as app_module
+from app import app, initialize_db, get_db_connection, close_db_pool
+
+
+class TestDisplayApi(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.game_name = 'test_display'
+        self.db_path = os.path.join(self.test_dir, f'{self.game_name}.db')
+        self.original_folder = app_module.TOURNAMENT_FOLDER
+        app_module.TOURNAMENT_FOLDER = self.test_dir
+        initialize_db(self.db_path)
+
+        conn = get_db_connection(self.db_path)
+        for g in range(1, 11):
+            for i in range(1, 7):
+                name = f"Team {g}-{i}"
+                conn.execute("INSERT INTO teams (name, group_number) VALUES (?, ?)", (name, g))
+                conn.execute("INSERT INTO rankings (team, group_number) VALUES (?, ?)", (name, g))
+        conn.commit()
+        conn.close()
+
+        self.client = app.test_client()
+        self.client.get(f'/generate_matches/{self.game_name}')
+
+    def tearDown(self):
+        app_module.TOURNAMENT_FOLDER = self.original_folder
+        close_db_pool()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_unchanged_poll_returns_304(self):
+        url = f'/api/display/{self.game_name}/groups_json'
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers['ETag']
+
+        again = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(again.status_code, 304)
+
+        conn = get_db_connection(self.db_path)
+        match_id = conn.execute("SELECT id FROM matches ORDER BY id LIMIT 1").fetchone()[0]
+        conn.close()
+        self.client.post(f'/save_result/{self.game_name}/{match_id}',
+                         data={'score1': '21', 'score2': '7'})
+
+        changed = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+        played = sum(t['matches_played'] for teams in changed.get_json().values() for t in teams)
+        self.assertEqual(played, 2)
+
+    def test_event_stream_pushes_changes(self):
+        resp = self.client.get(f'/api/display/{self.game_name}/events', buffered=False)
+        self.assertEqual(resp.mimetype, 'text/event-stream')
+        events = iter(resp.response)
+        self.assertIn(b'retry:', next(events))
+        first = next(events)
+        self.assertIn(b'event: changed', first)
+
+        conn = get_db_connection(self.db_path)
+        match_id = conn.execute("SELECT id FROM matches ORDER BY id LIMIT 1").fetchone()[0]
+        conn.close()
+        self.client.post(f'/save_result/{self.game_name}/{match_id}',
+                         data={'score1': '21', 'score2': '7'})
+
+        second = next(events)
+        self.assertIn(b'event: changed', second)
+        self.assertNotEqual(first, second)
+        resp.close()
+
+    def test_bracket_standings(self):
+        conn = get_db_connection(self.db_path)
+        conn.executemany("""
+            INSERT INTO double_elim_matches (bracket_id, round, bracket, match_index, team1, team2, winner, loser)
+            VALUES ('A', ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (1, 'Winners', 0, 'W1', 'L1', 'W1', 'L1'),
+            (2, 'Winners', 0, 'W1', 'X', None, None),
+            (1, 'Losers', 0, 'L1', 'L2', 'L2', 'L1'),
+        ])
+        conn.commit()
+        conn.close()
+
+        data = self.client.get(f'/api/display/{self.game_name}/bracket_standings_json').get_json()
+        status = {t['team']: t['status'] for t in data['A']}
+        self.assertEqual(status, {'W1': 'WB R1', 'X': 'WB R1', 'L2': 'LB R1', 'L1': 'Ausgeschieden'})
+        self.assertEqual(data['A'][-1]['team'], 'L1')
+        self.assertEqual(data['B'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,271 @@
+import os
+import random
+import time
+import unittest
+import tempfile
+import shutil
+import app as app_module
+from app import (
+    app, initialize_db, get_db_connection, close_db_pool,
+    rebuild_and_verify_rankings, rebuild_team_totals, get_team_totals,
+    order_with_head_to_head, sort_all_groups_with_head_to_head,
+    sort_group_with_head_to_head, get_ranking_snapshot, get_phase_assignment,
+    get_data_version, solve_qualification_scenarios, get_team_matches
+)
+
+
+class TestRankings(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.game_name = 'test_rankings'
+        self.db_path = os.path.join(self.test_dir, f'{self.game_name}.db')
+        self.original_folder = app_module.TOURNAMENT_FOLDER
+        app_module.TOURNAMENT_FOLDER = self.test_dir
+        initialize_db(self.db_path)
+
+        conn = get_db_connection(self.db_path)
+        for g in range(1, 11):
+            for i in range(1, 7):
+                name = f"Team {g}-{i}"
+                conn.execute("INSERT INTO teams (name, group_number) VALUES (?, ?)", (name, g))
+                conn.execute("INSERT INTO rankings (team, group_number) VALUES (?, ?)", (name, g))
+        conn.commit()
+        conn.close()
+
+        self.client = app.test_client()
+        self.client.get(f'/generate_matches/{self.game_name}')
+
+    def tearDown(self):
+        app_module.TOURNAMENT_FOLDER = self.original_folder
+        close_db_pool()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _match_ids(self):
+        conn = get_db_connection(self.db_path)
+        ids = [r['id'] for r in conn.execute(
+            "SELECT m.id FROM matches m JOIN teams t1 ON t1.name = m.team1 "
+            "JOIN teams t2 ON t2.name = m.team2 ORDER BY m.id")]
+        conn.close()
+        return ids
+
+    def _save(self, match_id, s1, s2):
+        resp = self.client.post(f'/save_result/{self.game_name}/{match_id}',
+                                data={'score1': str(s1), 'score2': str(s2)},
+                                headers={'X-Requested-With': 'XMLHttpRequest'})
+        self.assertTrue(resp.get_json()['ok'])
+
+    def test_incremental_save_matches_full_rebuild(self):
+        rng = random.Random(7)
+        ids = self._match_ids()
+        self.assertEqual(len(ids), 150)
+
+        for match_id in ids:
+            self._save(match_id, rng.randint(0, 42), rng.randint(0, 42))
+        # Korrekturen und gelöschte Resultate
+        for match_id in rng.sample(ids, 30):
+            self._save(match_id, rng.randint(0, 42), rng.randint(0, 42))
+        for match_id in rng.sample(ids, 10):
+            self.client.post(f'/delete_result/{self.game_name}/{match_id}',
+                             headers={'X-Requested-With': 'XMLHttpRequest'})
+
+        conn = get_db_connection(self.db_path)
+        drift = rebuild_and_verify_rankings(conn)
+        conn.close()
+        self.assertEqual(drift, [])
+
+    def test_rebuild_reports_drift(self):
+        conn = get_db_connection(self.db_path)
+        conn.execute("UPDATE rankings SET points = points + 5 WHERE team = 'Team 1-1'")
+        conn.commit()
+        drift = rebuild_and_verify_rankings(conn)
+        conn.close()
+        self.assertEqual([(d['team'], d['column']) for d in drift], [('Team 1-1', 'points')])
+
+    def test_team_totals_follow_result_writes(self):
+        rng = random.Random(11)
+        ids = self._match_ids()
+        for match_id in ids[:40]:
+            self._save(match_id, rng.randint(0, 42), rng.randint(0, 42))
+        for match_id in ids[:5]:
+            self._save(match_id, 42, 0)
+        self.client.post(f'/delete_result/{self.game_name}/{ids[6]}')
+
+        conn = get_db_connection(self.db_path)
+        maintained = get_team_totals(conn)
+        rebuild_team_totals(conn.cursor())
+        conn.commit()
+        rebuilt = get_team_totals(conn)
+        conn.close()
+
+        self.assertEqual({t: v for t, v in maintained.items() if v['games']}, rebuilt)
+        self.assertEqual(sum(v['games'] for v in rebuilt.values()), 2 * 39)
+
+    def test_all_matches_view_spans_phases(self):
+        ids = self._match_ids()
+        self._save(ids[0], 21, 9)
+        conn = get_db_connection(self.db_path)
+        first = conn.execute("SELECT team1, team2 FROM matches WHERE id = ?", (ids[0],)).fetchone()
+        conn.execute("""
+            INSERT INTO double_elim_matches (bracket_id, match_number, round, bracket, match_index,
+                                             team1, team2, score1, score2, court, time)
+            VALUES ('A', 500, 1, 'Winners', 0, ?, 'Team 9-9', 4, 21, 3, '13:00')
+        """, (first['team2'],))
+        conn.commit()
+
+        matches = get_team_matches(conn, first['team2'])
+        self.assertEqual([m['phase'] for m in matches], ['Round Robin'] * 5 + ['Double Elimination A'])
+        self.assertEqual((matches[0]['opponent'], matches[0]['score1'], matches[0]['score2']),
+                         (first['team1'], 9, 21))
+        self.assertEqual((matches[-1]['court'], matches[-1]['score1']), (3, 4))
+        self.assertEqual(get_team_totals(conn)[first['team2']]['games'], 2)
+
+        plan = " ".join(r['detail'] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM all_matches WHERE team2 = ?", ('x',)))
+        conn.close()
+        self.assertIn('idx_double_elim_matches_team2', plan)
+        self.assertIn('idx_placement_matches_team2', plan)
+
+    def test_head_to_head_breaks_ties(self):
+        teams = [
+            {'team': 'A', 'goals_for': 50, 'goal_difference': 5},
+            {'team': 'B', 'goals_for': 60, 'goal_difference': 0},
+            {'team': 'C', 'goals_for': 50, 'goal_difference': 5},
+            {'team': 'D', 'goals_for': 50, 'goal_difference': 5},
+        ]
+        # C schlägt A und D, D schlägt A
+        h2h = {('C', 'A'): 3, ('A', 'C'): 0, ('C', 'D'): 3, ('D', 'C'): 0,
+               ('D', 'A'): 3, ('A', 'D'): 0}
+        order = [t['team'] for t in order_with_head_to_head(teams, h2h)]
+        self.assertEqual(order, ['B', 'C', 'D', 'A'])
+
+    def test_all_groups_match_single_group_sort(self):
+        rng = random.Random(3)
+        for match_id in self._match_ids():
+            self._save(match_id, rng.randint(0, 3), rng.randint(0, 3))
+
+        conn = get_db_connection(self.db_path)
+        all_groups = sort_all_groups_with_head_to_head(conn)
+        for g in range(1, 11):
+            single = [r['team'] for r in sort_group_with_head_to_head(conn, g)]
+            self.assertEqual([r['team'] for r in all_groups[g]], single)
+        conn.close()
+
+    def test_snapshot_is_cached_per_data_version(self):
+        ids = self._match_ids()
+        conn = get_db_connection(self.db_path)
+        version = get_data_version(conn)
+        first = get_ranking_snapshot(conn)
+        self.assertIs(get_ranking_snapshot(conn), first)
+        conn.close()
+
+        self._save(ids[0], 42, 0)
+        conn = get_db_connection(self.db_path)
+        self.assertGreater(get_data_version(conn), version)
+        second = get_ranking_snapshot(conn)
+        conn.close()
+        self.assertIsNot(second, first)
+        self.assertEqual(second['stats']['Team 1-1']['matches_played'], 1)
+
+    def test_qualification_scenarios_cover_final_phase(self):
+        rng = random.Random(9)
+        conn = get_db_connection(self.db_path)
+        last_round = [r['id'] for r in conn.execute("SELECT id FROM matches WHERE round = 5")]
+        conn.close()
+        for match_id in self._match_ids():
+            if match_id not in last_round:
+                self._save(match_id, rng.randint(0, 42), rng.randint(0, 42))
+
+        conn = get_db_connection(self.db_path)
+        scenarios = solve_qualification_scenarios(conn)
+        conn.close()
+        self.assertEqual(scenarios['open_matches'], 30)
+        self.assertTrue(any('possible' in s.values() for s in scenarios['teams'].values()))
+
+        for match_id in last_round:
+            self._save(match_id, rng.choice((0, 21, 42)), rng.choice((0, 21, 42)))
+        conn = get_db_connection(self.db_path)
+        phase = get_ranking_snapshot(conn)['phase']
+        final = solve_qualification_scenarios(conn)
+        conn.close()
+
+        for team, status in scenarios['teams'].items():
+            actual = phase[team].rstrip('*')
+            self.assertNotEqual(status[actual], 'eliminated', team)
+            self.assertEqual(final['teams'][team][actual], 'guaranteed', team)
+
+        data = self.client.get(f'/api/display/{self.game_name}/qualification_scenarios_json').get_json()
+        self.assertEqual(data['open_matches'], 0)
+        self.assertEqual(len(data['groups']['1']), 6)
+
+    def test_qualification_scenarios_use_every_score_for_one_open_match(self):
+        rng = random.Random(11)
+        ids = self._match_ids()
+        conn = get_db_connection(self.db_path)
+        open_id = ids[rng.randrange(len(ids))]
+        conn.executemany("UPDATE matches SET score1 = ?, score2 = ? WHERE id = ?",
+                         [(rng.randint(0, 42), rng.randint(0, 42), i) for i in ids if i != open_id])
+        conn.commit()
+        rebuild_and_verify_rankings(conn)
+        scenarios = solve_qualification_scenarios(conn)
+        self.assertEqual((scenarios['open_matches'], scenarios['exact']), (1, True))
+
+        # Kein erreichter Ausgang darf als ausgeschlossen gelten — auch mit Zwischenwerten
+        outcomes = [(s1, s2) for s1 in range(0, 43, 6) for s2 in range(3, 43, 6)]
+        for s1, s2 in outcomes:
+            conn.execute("UPDATE matches SET score1 = ?, score2 = ? WHERE id = ?", (s1, s2, open_id))
+            rebuild_and_verify_rankings(conn)
+            for team, phase in get_ranking_snapshot(conn)['phase'].items():
+                self.assertNotEqual(scenarios['teams'][team][phase.rstrip('*')], 'eliminated',
+                                    (team, s1, s2))
+        conn.rollback()
+        conn.close()
+
+    def test_qualification_scenarios_last_round_under_a_second(self):
+        rng = random.Random(13)
+        conn = get_db_connection(self.db_path)
+        conn.executemany("UPDATE matches SET score1 = ?, score2 = ? WHERE id = ?",
+                         [(rng.randint(0, 42), rng.randint(0, 42), r['id'])
+                          for r in conn.execute("SELECT id FROM matches WHERE round != 5").fetchall()])
+        conn.commit()
+        rebuild_and_verify_rankings(conn)
+        started = time.perf_counter()
+        scenarios = solve_qualification_scenarios(conn)
+        elapsed = time.perf_counter() - started
+        conn.close()
+        self.assertEqual(scenarios['open_matches'], 30)
+        self.assertLess(elapsed, 1.0)
+
+    def test_qualification_scenarios_degrade_with_many_open_matches(self):
+        conn = get_db_connection(self.db_path)
+        scenarios = solve_qualification_scenarios(conn)
+        conn.close()
+        self.assertEqual((scenarios['open_matches'], scenarios['exact']), (150, False))
+        for status in scenarios['teams'].values():
+            self.assertEqual({status[p] for p in ('DE', 'FC', 'PLZ')}, {'possible'})
+
+    def test_ghost_teams_rank_last_and_get_no_position(self):
+        conn = get_db_connection(self.db_path)
+        conn.execute("UPDATE teams SET is_ghost = 1 WHERE name = 'Team 2-1'")
+        conn.execute("UPDATE rankings SET goals_for = 99 WHERE team = 'Team 2-1'")
+        conn.commit()
+        group = get_ranking_snapshot(conn)['groups'][2]
+        conn.close()
+        self.assertEqual(group[-1]['team'], 'Team 2-1')
+        self.assertNotIn('position', group[-1])
+        self.assertEqual([t['position'] for t in group[:-1]], [1, 2, 3, 4, 5])
+
+    def test_phase_assignment_sizes(self):
+        rng = random.Random(5)
+        for match_id in self._match_ids():
+            self._save(match_id, rng.randint(0, 42), rng.randint(0, 42))
+        conn = get_db_connection(self.db_path)
+        de_teams, fc_teams, plz_teams, best2, rest8 = get_phase_assignment(conn)
+        phase = get_ranking_snapshot(conn)['phase']
+        conn.close()
+        self.assertEqual((len(de_teams), len(fc_teams), len(plz_teams)), (32, 16, 12))
+        self.assertEqual(sorted(phase.values()).count('DE*'), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
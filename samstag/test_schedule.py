@@ -0,0 +1,231 @@
+import os
+import time
+import unittest
+import tempfile
+import shutil
+from collections import Counter
+import app as app_module
+from app import (
+    app, initialize_db, get_db_connection, close_db_pool,
+    ScheduleJob, ScheduleParams, schedule_jobs, time_to_minutes, calculate_all_match_times,
+    get_knockout_graph, KNOCKOUT_TABLES, write_knockout_result, dispatch_knockout_courts,
+    reschedule_round_delay, get_court_status, parse_court_count
+)
+
+
+def assert_no_overlaps(test, slots, duration):
+    """slots: [(start, court, teams)] — kein Feld und kein Team doppelt belegt"""
+    by_court, by_team = {}, {}
+    for start, court, teams in slots:
+        by_court.setdefault(court, []).append(start)
+        for team in teams:
+            by_team.setdefault(team, []).append(start)
+    for starts in list(by_court.values()) + list(by_team.values()):
+        starts.sort()
+        for a, b in zip(starts, starts[1:]):
+            test.assertGreaterEqual(b - a, duration)
+
+
+class TestScheduleEngine(unittest.TestCase):
+
+    def test_respects_dependencies_and_lunch(self):
+        params = ScheduleParams(courts=2, duration=10, court_gap=2, team_gap=5, lunch=(60, 90))
+        jobs = [ScheduleJob(('m', i), (f"T{i}", f"U{i}"), (), 0, None, i) for i in range(8)]
+        jobs.append(ScheduleJob(('m', 'final'), (), ((('m', 0), 20), (('m', 1), 20)), 0, None, 8))
+        result = schedule_jobs(jobs, params)
+
+        assert_no_overlaps(self, [(s, c, j.teams) for j in jobs for s, c in [result[j.key]]], 10)
+        for start, _ in result.values():
+            self.assertFalse(start < 90 and start + 10 > 60)
+        self.assertGreaterEqual(result[('m', 'final')][0],
+                                max(result[('m', 0)][0], result[('m', 1)][0]) + 30)
+
+    def test_three_hundred_matches_under_a_second(self):
+        params = ScheduleParams(courts=15, duration=12, court_gap=3, team_gap=5, lunch=None)
+        jobs, previous = [], {}
+        for n in range(360):
+            teams = (f"T{n % 120}", f"T{(n * 7 + 1) % 120}")
+            key = ('m', n)
+            jobs.append(ScheduleJob(key, teams, tuple((previous[t], 0) for t in teams if t in previous),
+                                    0, None, n))
+            previous.update({t: key for t in teams})
+        started = time.perf_counter()
+        result = schedule_jobs(jobs, params)
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(len(result), 360)
+        assert_no_overlaps(self, [(s, c, j.teams) for j in jobs for s, c in [result[j.key]]], 12)
+
+
+class TestTournamentSchedule(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.game_name = 'test_schedule'
+        self.db_path = os.path.join(self.test_dir, f'{self.game_name}.db')
+        self.original_folder = app_module.TOURNAMENT_FOLDER
+        app_module.TOURNAMENT_FOLDER = self.test_dir
+        initialize_db(self.db_path)
+
+        conn = get_db_connection(self.db_path)
+        for g in range(1, 11):
+            for i in range(1, 7):
+                name = f"Team {g}-{i}"
+                conn.execute("INSERT INTO teams (name, group_number) VALUES (?, ?)", (name, g))
+                conn.execute("INSERT INTO rankings (team, group_number, goals_for) VALUES (?, ?, ?)",
+                             (name, g, 100 - i))
+        conn.execute("""
+            INSERT INTO tournament_config (game_name, match_duration, break_between_games,
+                                           break_between_rounds, start_time, courts)
+            VALUES (?, 12, 3, 5, '09:00', 15)
+        """, (self.game_name,))
+        conn.commit()
+        conn.close()
+
+        self.client = app.test_client()
+        self.client.get(f'/generate_matches/{self.game_name}')
+
+    def tearDown(self):
+        app_module.TOURNAMENT_FOLDER = self.original_folder
+        close_db_pool()
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_court_count_must_be_positive_integer(self):
+        self.assertEqual(parse_court_count('4'), 4)
+        for value in ('', 'vier', '2.5', '0', '-3', None):
+            with self.assertRaises(ValueError):
+                parse_court_count(value)
+
+    def test_round_robin_waves_on_all_courts(self):
+        conn = get_db_connection(self.db_path)
+        rows = conn.execute("SELECT round, team1, team2, field, time FROM matches").fetchall()
+        conn.close()
+        # 30 Spiele pro Runde auf 15 Feldern → zwei Wellen pro Runde
+        waves = Counter((r['round'], r['time']) for r in rows)
+        self.assertEqual(sorted(waves.values()), [15] * 10)
+        self.assertEqual(min(r['time'] for r in rows), '09:00')
+        self.assertEqual(max(r['time'] for r in rows), '11:15')
+        assert_no_overlaps(self, [(time_to_minutes(r['time']), r['field'], (r['team1'], r['team2']))
+                                  for r in rows], 12)
+
+    def test_knockout_phases_share_courts(self):
+        self.client.get(f'/generate_double_elim/{self.game_name}')
+        self.client.get(f'/generate_follower_cup/{self.game_name}')
+        conn = get_db_connection(self.db_path)
+        stats = calculate_all_match_times(conn)
+        self.assertGreater(time_to_minutes(stats['bracket_a']['start']),
+                           time_to_minutes(stats['round_robin']['end']))
+
+        slots = []
+        for table in KNOCKOUT_TABLES:
+            graph = get_knockout_graph(conn, table)
+            rows = {graph.key(r): r for r in conn.execute(f"SELECT * FROM {table}")}
+            for node, edges in graph.edges.items():
+                for _, target, _ in edges:
+                    if node in rows and target in rows:
+                        self.assertGreaterEqual(time_to_minutes(rows[target]['time']),
+                                                time_to_minutes(rows[node]['time']) + 12)
+            slots += [(time_to_minutes(r['time']), r['court'], ()) for r in rows.values()]
+        conn.close()
+        assert_no_overlaps(self, slots, 12)
+
+    def test_dispatcher_calls_ready_matches_on_free_courts(self):
+        self.client.get(f'/generate_double_elim/{self.game_name}')
+        conn = get_db_connection(self.db_path)
+        # 16 Spiele WB Runde 1 auf 15 Feldern: eines wartet
+        queue = dispatch_knockout_courts(conn, now=time_to_minutes('11:00'))
+        called = [m for m in queue if m['called']]
+        self.assertEqual(len(queue), 16)
+        self.assertEqual(sorted(m['court'] for m in called), list(range(1, 16)))
+        self.assertEqual({m['time'] for m in called}, {'11:00'})
+        waiting = next(m for m in queue if not m['called'])
+        self.assertEqual(waiting['time'], '11:15')
+
+        # Frühes Ende auf Feld 4 → wartendes Spiel rückt nach der Umstellzeit nach
+        early = next(m for m in called if m['court'] == 4)
+        write_knockout_result(conn, early['table'], early['id'], 21, 5)
+        queue = dispatch_knockout_courts(conn, finished=(early['table'], early['id']),
+                                         now=time_to_minutes('11:08'))
+        moved = next(m for m in queue if m['id'] == waiting['id'] and m['table'] == waiting['table'])
+        self.assertEqual((moved['court'], moved['time'], moved['called']), (4, '11:11', False))
+        conn.close()
+
+        data = self.client.get(f'/api/display/{self.game_name}/next_up_json').get_json()
+        self.assertEqual(len(data), 15)
+        self.assertEqual(data[0]['time'], '11:00')
+
+    def test_round_delay_shifts_only_dependent_matches(self):
+        conn = get_db_connection(self.db_path)
+        query = "SELECT id, round, team1, team2, field, time FROM matches ORDER BY id"
+        before = {r['id']: dict(r) for r in conn.execute(query)}
+        result = reschedule_round_delay(conn, 3, 10)
+        after = {r['id']: dict(r) for r in conn.execute(query)}
+        conn.close()
+
+        shifted = {i for i in after if after[i]['time'] != before[i]['time']}
+        self.assertEqual(result['changed'], len(shifted))
+        self.assertEqual(result['projected_end'], '11:37')
+        self.assertTrue(all(before[i]['round'] >= 3 for i in shifted))
+        for i in shifted:
+            self.assertGreaterEqual(time_to_minutes(after[i]['time']),
+                                    time_to_minutes(before[i]['time']) + 10)
+        assert_no_overlaps(self, [(time_to_minutes(r['time']), r['field'], (r['team1'], r['team2']))
+                                  for r in after.values()], 12)
+
+        # Zweites Spiel auf Feld 1 (09:15) ist erst um 09:40 fertig
+        conn = get_db_connection(self.db_path)
+        first = conn.execute("SELECT id FROM matches WHERE field = 1 ORDER BY time").fetchone()['id']
+        conn.close()
+        self.client.post(f'/save_result/{self.game_name}/{first}', data={'score1': '21', 'score2': '7'})
+        resp = self.client.post(f'/reschedule_delay/{self.game_name}',
+                                data={'court': '1', 'finished_at': '09:40'})
+        self.assertGreaterEqual(resp.get_json()['projected_end'], '11:37')
+        conn = get_db_connection(self.db_path)
+        court_one = [r['time'] for r in conn.execute(
+            "SELECT time FROM matches WHERE field = 1 ORDER BY time")]
+        conn.close()
+        self.assertEqual(court_one[:2], ['09:00', '09:15'])
+        self.assertGreaterEqual(court_one[2], '09:43')
+
+    def test_round_delay_skips_untimed_bracket_matches(self):
+        self.client.get(f'/generate_double_elim/{self.game_name}')
+        self.client.get(f'/generate_follower_cup/{self.game_name}')
+        conn = get_db_connection(self.db_path)
+        calculate_all_match_times(conn)
+        # Superfinals-Spiele ohne Startzeit hängen an den DE-Finals
+        conn.executemany("INSERT INTO super_finals_matches (match_number, match_id) VALUES (?, ?)",
+                         [(900 + i, mid) for i, mid in enumerate(('HF1', 'HF2', 'FINAL', 'THIRD'))])
+        conn.commit()
+        result = reschedule_round_delay(conn, 1, 10, 'double_elim_matches')
+        self.assertGreater(result['changed'], 0)
+        first_round = conn.execute(
+            "SELECT round FROM follower_cup_matches ORDER BY start_min LIMIT 1").fetchone()['round']
+        conn.close()
+
+        resp = self.client.post(f'/reschedule_delay/{self.game_name}',
+                                data={'round': first_round, 'minutes': '5', 'table': 'follower_cup_matches'})
+        self.assertTrue(resp.get_json()['ok'])
+        self.assertGreater(resp.get_json()['changed'], 0)
+        resp = self.client.post(f'/reschedule_delay/{self.game_name}',
+                                data={'round': '1', 'minutes': '5', 'table': 'follower_cup_matches'})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_court_now_and_next_use_index(self):
+        conn = get_db_connection(self.db_path)
+        status = get_court_status(conn, 1, now=time_to_minutes('09:05'))
+        self.assertEqual((status['current']['time'], status['next']['time']), ('09:00', '09:15'))
+        self.assertEqual(status['current']['end_min'], time_to_minutes('09:12'))
+        between = get_court_status(conn, 1, now=time_to_minutes('09:13'))
+        self.assertIsNone(between['current'])
+
+        plan = " ".join(r['detail'] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM matches WHERE field = ? AND start_min > ? "
+            "ORDER BY start_min LIMIT 1", (1, 0)))
+        conn.close()
+        self.assertIn('idx_matches_court_start', plan)
+
+        data = self.client.get(f'/api/court/{self.game_name}/1?now=09:13').get_json()
+        self.assertEqual(data['next']['time'], '09:15')
+
+
+if __name__ == '__main__':
+    unittest.main()